@@ -2,26 +2,43 @@
 Henry Spink, 2/5/24
 game for applied computing 1/2
 """
-# pylint: disable=line-too-long
+# pylint: disable=line-too-long,wrong-import-position
 #* imports
+import time as timer
+STARTED: float = timer.perf_counter()                                       # when the game started, for --profile-startup
 import os
 import turtle
 import sys
-import time as timer
-from datetime import datetime as time
+import argparse
+from racing_game_profile import StartupProfile
 from racing_game_classes import Player, SpriteAttributes, Util
-from racing_game_constants import SCR
+from racing_game_constants import SCR, process_events
+from racing_game_sim import FixedTimestep, TICK_RATE, RENDER_RATE
+from racing_game_track import TRACK, resolve_track
+from racing_game_render import SCREENS, POOL
 
-if not os.getcwd().endswith("final game"):                                  # check if the user is in the correct directory
+parser = argparse.ArgumentParser(description='"omega race"')
+parser.add_argument("--tick-rate", type=int, default=TICK_RATE, help=f"number of physics ticks per second (default: {TICK_RATE})")
+parser.add_argument("--render-rate", type=int, default=RENDER_RATE, help=f"maximum number of frames drawn per second (default: {RENDER_RATE})")
+parser.add_argument("--profile-startup", action="store_true", help="time each phase of starting the game, save the report and quit at the first menu frame")
+parser.add_argument("--profile-report", default="startup_profile.json", help="where --profile-startup saves its report (default: startup_profile.json)")
+parser.add_argument("--draw-costs", action="store_true", help="print how long each screen took to draw and how many canvas items are alive when the game closes")
+args = parser.parse_args()
+profile = StartupProfile(STARTED)                                           # how long each phase of starting the game takes
+profile.add("imports", STARTED)
+
+if not os.getcwd().endswith("final game") and os.path.isdir("final game"): # check if the user is in the correct directory
     os.chdir("final game")                                                  # switch to the correct directory if not
 
 #* setups
+with profile.phase("load_track"):
+    resolve_track(TRACK)                                                    # loads the track, compiling it if it isn't in the cache
 PLAYER_ONE = Player(                                                        # create player one
                 name="PLAYER ONE",
                 num=1,
-                x=-45,
-                y=330,
-                heading=90,
+                x=TRACK.start_grid[0][0],                                   # first spot on the start grid
+                y=TRACK.start_grid[0][1],
+                heading=TRACK.start_grid[0][2],
                 attributes=SpriteAttributes(
                                 size=2.0,
                                 color="blue",
@@ -33,9 +50,9 @@ PLAYER_ONE = Player(                                                        # cr
 PLAYER_TWO = Player(                                                        # create player two
                 name="PLAYER TWO",
                 num=2,
-                x=-45,
-                y=270,
-                heading=90,
+                x=TRACK.start_grid[1][0],                                   # second spot on the start grid
+                y=TRACK.start_grid[1][1],
+                heading=TRACK.start_grid[1][2],
                 attributes=SpriteAttributes(
                                 size=2.0,
                                 color="orange",
@@ -47,25 +64,33 @@ PLAYER_TWO = Player(                                                        # cr
 SPRITES = [PLAYER_ONE, PLAYER_TWO]                                              # iterable list of all the sprites
 util = Util(PLAYER_ONE, PLAYER_TWO, SCR)                                        # utility class, also includes many subclasses
 util.game_state = "init"                                                        # start running the game
+loop = FixedTimestep(args.tick_rate)                                            # runs the physics at a fixed rate no matter the frame rate
+next_frame: float = 0                                                           # time the next game frame is due to be drawn
 #* game loop
 while util.game_state != "quit":                                                # game is running
     try:
         match util.game_state:
             case "init":                                                        # initialisation of the game
-                util.setup_screen()                                             # create the screen
+                with profile.phase("setup_screen"):
+                    util.setup_screen()                                         # create the screen
                 util.handle_keybinds()                                          # register keybindings
                 total_laps: int = 10                                            # default to 10 laps needed to win
-                util.sub.data.load()                                            # load the database, ready for any new entries
+                with profile.phase("database_load"):
+                    util.sub.data.load()                                        # load the database, ready for any new entries
+                with profile.phase("construct"):
+                    for sprite in SPRITES:
+                        sprite.construct()                                      # register the sprites
                 for sprite in SPRITES:
-                    sprite.construct()                                          # register the sprites
+                    util.sub.data.check_exist(sprite)                           # first time playing (or a fresh database)
                     sprite.score.coins = util.sub.data.db[sprite.name]["coins"]
-                util.sub.draw.menu()                                            # draw the menu
+                with profile.phase("main_menu"):
+                    util.sub.draw.menu()                                        # draw the menu
                 util.game_state = "menu"
             case "menu":
                 util.sub.update.menu()                                          # update the menu cars
             case "options menu":
                 util.sub.draw.options()                                         # draw the options menu
-                laps_input = turtle.numinput("Input", "Number of laps to win:") # the total number laps needed to win
+                laps_input = SCR.numinput("Input", "Number of laps to win:")    # the total number laps needed to win
                 total_laps = int(laps_input) if laps_input is not None else 10  # default to 10 laps if no input is given
                 PLAYER_ONE.score.total_laps = total_laps                        # pass in total laps needed to win
                 PLAYER_TWO.score.total_laps = total_laps                        # pass in total laps needed to win
@@ -73,7 +98,7 @@ while util.game_state != "quit":
                 util.game_state = "menu"
             case "options":
                 util.sub.draw.options()
-                laps_input = turtle.numinput("Input", "Number of laps to win:") # the total number laps needed to win
+                laps_input = SCR.numinput("Input", "Number of laps to win:")    # the total number laps needed to win
                 total_laps = int(laps_input) if laps_input is not None else 10  # default to 10 laps if no input is given
                 PLAYER_ONE.score.total_laps = total_laps                        # pass in total laps needed to win
                 PLAYER_TWO.score.total_laps = total_laps                        # pass in total laps needed to win
@@ -117,25 +142,38 @@ while util.game_state != "quit":
                 util.sub.draw.countdown("clear")                                # clear
                 util.game_state = "start"                                       # game now running
             case "start":
+                util.clock.reset()                                              # start the main game timer
                 for sprite in SPRITES:
                     sprite.construct()                                          # register the sprites
-                    sprite.timer.start_time = time.now()                        # start the timer
-                util.game_start_time = time.now()                               # start the main game timer
-                util.sub.update.game_start_time = time.now()                    # start the main game timer
-                util.sub.draw.game_start_time = time.now()                      # start the main game timer
+                    sprite.timer.start_time = util.clock.ns                     # start the timer
                 util.spawn_coins()                                              # spawn the coins
+                loop.reset()                                                    # dont count the countdown as game time
                 util.game_state = "game"
             case "game":                                                        # main game is in progress
-                for sprite in SPRITES:                                          # update and render each of the players
-                    sprite.update()
-                    sprite.render()
-                util.sub.update.update()                                        # spedo, timer, score, and collision checking
-                util.coins()                                                    # update the coins
-                util.check_end()                                                # check if game should end for any reason
+                now = timer.perf_counter()
+                for _ in range(loop.ticks(now)):                                # run the fixed length physics ticks that are due
+                    util.clock.advance(loop.dt)                                 # game time only moves while the physics is running
+                    for sprite in SPRITES:                                      # update each of the players
+                        sprite.update(loop.dt)
+                    util.sub.update.player_collision()                          # collision checking
+                    util.coins(loop.dt)                                         # spawn and collect the coins
+                    if util.check_end():                                        # check if game should end for any reason
+                        break
+                if util.game_state == "game" and now >= next_frame:             # draw at most `render_rate` frames per second
+                    next_frame = now + 1 / args.render_rate
+                    alpha = loop.alpha()                                        # draw the players part way between the last two ticks
+                    for sprite in SPRITES:                                      # render each of the players
+                        sprite.render(alpha)
+                    util.sub.update.update()                                    # spedo, timer and score
+                    util.update_coins()                                         # hide collected coins
+                    SCR.update()                                                # only redraw the window when there is a new frame
+                else:
+                    process_events()                                            # keep handling the keys without redrawing
+                    timer.sleep(min(loop.wait_time(), max(0, next_frame - now)))    # wait for the next tick or frame
             case "paused":
-                pass
+                loop.reset()                                                    # dont catch up on the time spent paused
             case "end win":
-                util.sub.data.save()                                            # save the database to a json file
+                util.sub.data.save()                                            # save the players that changed
                 timer.sleep(5)
                 util.sub.draw.stats()                                           # after 5 seconds of showing to the winner move the to game statistics
                 util.game_state = "stats"
@@ -143,9 +181,19 @@ while util.game_state != "quit":
                 pass
             case _:
                 pass
-        SCR.update()
+        if util.game_state != "game":                                           # the game redraws only when it draws a frame
+            SCR.update()
+        if args.profile_startup and util.game_state == "menu":                  # first menu frame is on screen
+            profile.mark("first_menu_frame")
+            print(profile.table())
+            profile.save(args.profile_report)
+            util.game_state = "quit"
     except (KeyboardInterrupt, turtle.Terminator):
         util.game_state = "quit"
 
 util.sub.data.save()
+util.sub.data.close()
+if args.draw_costs:
+    print(SCREENS.report())
+    print(POOL.report())
 sys.exit(0)
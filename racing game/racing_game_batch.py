@@ -0,0 +1,276 @@
+"""
+Henry Spink, 2/5/24
+Batch race file for game for applied computing 1/2
+
+Runs lots of headless races between bots (or scripted drivers) across every core with a process pool
+and collects the lap times, collisions and coins into one table, for tuning the handling of the cars.
+
+e.g. `py racing_game_batch.py --races 500 --accel 2 3 4 --grass-drag 10 20 30 --out results.csv`
+"""
+# pylint: disable=line-too-long
+#* imports
+import os
+import csv
+import json
+import math
+import random
+import argparse
+import itertools
+import dataclasses
+from concurrent.futures import ProcessPoolExecutor
+from racing_game_sim import Car, Race, Handling, SpriteAttributes, REFERENCE_DT
+from racing_game_track import TRACK, CompiledTrack
+
+#* constants
+TURN_RATE: float = math.radians(2)  # how far a car turns per reference frame (radians)
+SPEED_SCALE: float = 0.75 * 0.02    # pixels moved per reference frame for each unit of `time_accel`
+COLUMNS: list[str] = [              # columns of the result table, in order
+    "race", "setting", "seed", "car", "driver",
+    "accel", "fast_accel", "fast_after", "grass_accel", "grass_drag", "grass_depth",
+    "laps", "won", "finish_ms", "best_lap_ms", "mean_lap_ms", "lap_times_ms",
+    "collisions", "coins", "ticks",
+]
+
+#* classes
+class Bot:
+    """
+    Bot Class
+
+    A driver for `Race` that follows the centreline of the track.
+    It steers towards a point a little way ahead on the centreline and lifts off (or brakes) before corners
+    that are too tight to get round at its current speed
+    """
+    def __init__(self, track: CompiledTrack = TRACK, look_ahead: float = 100, caution: float = 0.9, spacing: float = 10) -> None:
+        """
+        Parameters:
+            track (CompiledTrack): the track to drive around. Defaults to the main race track
+            look_ahead (float): distance ahead on the centreline to steer towards in pixels
+            caution (float): fraction of the fastest possible corner speed the bot will take corners at
+            spacing (float): distance between the points on the centreline the bot follows
+        """
+        self.path = track.shape.path(spacing)
+        self.look_ahead = max(1, round(look_ahead / spacing))       # look ahead in path points
+        self.index: int|None = None                                 # nearest path point last tick
+        count = len(self.path)
+        # fastest `time_accel` the car can take each point of the path at, from how sharply the path bends there
+        self.safe: list[float] = []
+        for i in range(count):
+            (x0, y0), (x1, y1), (x2, y2) = self.path[i - 1], self.path[i], self.path[(i + 1) % count]
+            bend = abs((math.atan2(y2 - y1, x2 - x1) - math.atan2(y1 - y0, x1 - x0) + math.pi) % (2 * math.pi) - math.pi)
+            curvature = bend / (math.hypot(x2 - x1, y2 - y1) or 1)
+            self.safe.append(caution * TURN_RATE / (curvature * SPEED_SCALE) if curvature > 1e-6 else math.inf)
+        self.brake_points = self.look_ahead * 3                     # how far ahead to check for corners in path points
+
+    def _nearest(self, x: float, y: float) -> int:
+        """
+        The index of the path point nearest the car, only searching near the last one after the first tick.
+
+        Parameters:
+            x (float): x coordinate of the car
+            y (float): y coordinate of the car
+
+        Returns:
+            int: the index of the point
+        """
+        count = len(self.path)
+        if self.index is None:
+            candidates = range(count)
+        else:
+            candidates = [(self.index + i) % count for i in range(-5, 30)]
+        return min(candidates, key=lambda i: (self.path[i][0] - x) ** 2 + (self.path[i][1] - y) ** 2)
+
+    def __call__(self, car: Car, race: Race) -> None:
+        """
+        Set the car's inputs for the next tick.
+
+        Parameters:
+            car (Car): the car being driven
+            race (Race): the race (unused)
+
+        Returns:
+            None
+        """
+        count = len(self.path)
+        self.index = self._nearest(car.x, car.y)
+        tx, ty = self.path[(self.index + self.look_ahead) % count]
+        desired = math.degrees(math.atan2(tx - car.x, -(ty - car.y)))     # headings point along (sin, -cos)
+        error = (desired - car.heading + 180) % 360 - 180
+        car.movement.rotating_left = error > 3
+        car.movement.rotating_right = error < -3
+        limit = min(self.safe[(self.index + i) % count] for i in range(self.brake_points))
+        speed = car.movement.time_accel
+        car.movement.accelerating = speed < limit
+        car.movement.decel = speed > limit + 150                    # much too fast, brake
+
+def scripted(events: list[tuple[float, str, bool]]):
+    """
+    Makes a driver for `Race` that replays a list of inputs at set times, e.g. `[(0, "accelerating", True), (2.5, "rotating_left", True)]`
+
+    Parameters:
+        events (list[tuple[float, str, bool]]): (time in seconds, `_Movement` input, pressed) in time order
+
+    Returns:
+        Callable[[Car, Race], None]: the driver
+    """
+    pending = list(events)
+
+    def driver(car: Car, race: Race) -> None:
+        while pending and pending[0][0] <= race.clock.ns / 1_000_000_000:
+            _, name, pressed = pending.pop(0)
+            setattr(car.movement, name, pressed)
+    return driver
+
+#* functions
+def run_race(config: dict) -> list[dict]:
+    """
+    Runs one race between bots. Made to be run in a worker process, so it takes and returns plain data.
+
+    Parameters:
+        config (dict): race number, setting number, seed, handling values, laps, tick rate, time limit
+            and optionally a script of inputs for the first car (see `scripted()`)
+
+    Returns:
+        list[dict]: one result row per car (see `COLUMNS`)
+    """
+    rng = random.Random(config["seed"])
+    handling = Handling(**config["handling"])
+    cars, drivers, kinds = [], {}, {}
+    for num, (x, y, heading) in enumerate(TRACK.start_grid, start=1):
+        car = Car(
+                x=x,
+                y=y,
+                heading=heading,
+                attributes=SpriteAttributes(size=2.0, color="white", shape="f1car", sprite="f1car", collision=True),
+                name=f"BOT {num}",
+                num=num,
+                handling=handling
+            )
+        cars.append(car)
+        if num == 1 and config.get("script"):
+            drivers[car.name] = scripted([tuple(event) for event in config["script"]])
+            kinds[car.name] = "script"
+        else:
+            drivers[car.name] = Bot(look_ahead=rng.uniform(80, 140), caution=rng.uniform(0.75, 1.5))     # some bots take corners too fast and run onto the grass
+            kinds[car.name] = "bot"
+    race = Race(cars, total_laps=config["laps"], drivers=drivers, tick_rate=config["tick_rate"])
+    race.run(round(config["max_time"] * config["tick_rate"]))
+    rows = []
+    for car in cars:
+        laps = [lap // 1_000_000 for lap in car.timer.laps]
+        rows.append({
+            "race": config["race"],
+            "setting": config["setting"],
+            "seed": config["seed"],
+            "car": car.name,
+            "driver": kinds[car.name],
+            **dataclasses.asdict(handling),
+            "laps": car.score.laps,
+            "won": car.score.won,
+            "finish_ms": car.timer.end_time // 1_000_000 if car.score.won else "",
+            "best_lap_ms": min(laps) if laps else "",
+            "mean_lap_ms": round(sum(laps) / len(laps)) if laps else "",
+            "lap_times_ms": ";".join(str(lap) for lap in laps),
+            "collisions": car.score.collisions,
+            "coins": car.score.coins,
+            "ticks": race.ticks,
+        })
+    return rows
+
+def run_batch(configs: list[dict], workers: int|None = None) -> list[dict]:
+    """
+    Runs every race across a pool of processes, one per core by default.
+
+    Parameters:
+        configs (list[dict]): the races to run (see `run_race()`)
+        workers (int|None): number of processes. Defaults to the number of cores
+
+    Returns:
+        list[dict]: the result rows of every race, in the same order as the configs
+    """
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(configs) // (workers * 8))      # big enough chunks that sending the work around doesn't dominate
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return [row for rows in pool.map(run_race, configs, chunksize=chunksize) for row in rows]
+
+def write_table(rows: list[dict], path: str) -> None:
+    """
+    Saves the result rows as a CSV file.
+
+    Parameters:
+        rows (list[dict]): the result rows
+        path (str): where to save it
+
+    Returns:
+        None
+    """
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.DictWriter(file, fieldnames=COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+def summarise(rows: list[dict]) -> None:
+    """
+    Prints the average results for each handling setting.
+
+    Parameters:
+        rows (list[dict]): the result rows
+
+    Returns:
+        None
+    """
+    print(f"{'setting':<44} {'cars':>5} {'laps':>6} {'best lap':>9} {'finished':>9} {'collisions':>11} {'coins':>6}")
+    for setting, group in itertools.groupby(sorted(rows, key=lambda row: row["setting"]), key=lambda row: row["setting"]):
+        group = list(group)
+        name = " ".join(f"{key}={group[0][key]}" for key in ("accel", "fast_accel", "grass_drag", "grass_depth"))
+        best = [row["best_lap_ms"] for row in group if row["best_lap_ms"] != ""]
+        print(
+            f"{name:<44} {len(group):>5} {sum(row['laps'] for row in group) / len(group):>6.2f}"
+            f" {(sum(best) / len(best) / 1000 if best else math.nan):>8.3f}s"
+            f" {sum(row['won'] for row in group) / len(group):>8.0%}"
+            f" {sum(row['collisions'] for row in group) / len(group):>11.2f}"
+            f" {sum(row['coins'] for row in group) / len(group):>6.2f}"
+            f"  (setting {setting})"
+        )
+
+def main() -> None:
+    """
+    Command line entry point, runs every combination of the handling values given for `--races` races each.
+    """
+    default = Handling()
+    parser = argparse.ArgumentParser(description='batch races for "omega race"')
+    parser.add_argument("--races", type=int, default=100, help="number of races for each handling setting (default: 100)")
+    parser.add_argument("--laps", type=int, default=3, help="laps needed to win each race (default: 3)")
+    parser.add_argument("--tick-rate", type=int, default=round(1 / REFERENCE_DT), help="physics ticks per second, lower is faster but less accurate (default: 60)")
+    parser.add_argument("--max-time", type=float, default=300, help="longest a race can go on for in simulated seconds (default: 300)")
+    parser.add_argument("--workers", type=int, default=None, help="number of processes (default: one per core)")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the bots (default: 0)")
+    parser.add_argument("--accel", type=int, nargs="+", default=[default.accel], help="acceleration factors on the track to try")
+    parser.add_argument("--fast-accel", type=int, nargs="+", default=[default.fast_accel], help="acceleration factors once going fast to try")
+    parser.add_argument("--grass-accel", type=int, nargs="+", default=[default.grass_accel], help="acceleration factors on the grass to try")
+    parser.add_argument("--grass-drag", type=float, nargs="+", default=[default.grass_drag], help="grass drags to try")
+    parser.add_argument("--grass-depth", type=float, nargs="+", default=[default.grass_depth], help="grass depths to try")
+    parser.add_argument("--script", default=None, help="JSON file of [time, input, pressed] events to drive the first car with instead of a bot")
+    parser.add_argument("--out", default="batch_results.csv", help="CSV file to save the results to (default: batch_results.csv)")
+    args = parser.parse_args()
+    script = None
+    if args.script is not None:
+        with open(args.script, encoding="utf-8") as file:
+            script = json.load(file)
+
+    settings = [
+        {"accel": accel, "fast_accel": fast_accel, "fast_after": default.fast_after, "grass_accel": grass_accel, "grass_drag": grass_drag, "grass_depth": grass_depth}
+        for accel, fast_accel, grass_accel, grass_drag, grass_depth in itertools.product(args.accel, args.fast_accel, args.grass_accel, args.grass_drag, args.grass_depth)
+    ]
+    configs = [
+        {"race": setting_num * args.races + race, "setting": setting_num, "seed": args.seed + race, "handling": handling,
+         "laps": args.laps, "tick_rate": args.tick_rate, "max_time": args.max_time, "script": script}
+        for setting_num, handling in enumerate(settings)
+        for race in range(args.races)                       # the same seeds for every setting, so they race the same bots
+    ]
+    rows = run_batch(configs, args.workers)
+    write_table(rows, args.out)
+    summarise(rows)
+    print(f"{len(configs)} races saved to {args.out}")
+
+if __name__ == "__main__":
+    main()
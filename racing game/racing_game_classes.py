@@ -4,86 +4,49 @@ Classes file for game for applied computing 1/2
 """
 # pylint: disable=line-too-long,too-many-lines
 #* imports
-import os
-# install pandas if not already installed
-try:
-    import pandas as pd
-except ImportError:
-    os.system("py -m pip install pandas")
-    os.system("py -m pip install pandas-stubs")
-finally:
-    import pandas as pd
 import turtle
 import dataclasses
-import math
 import random
-import json
-import datetime
-from datetime import datetime as time
-from racing_game_constants import SCR, TURTLES, d_trtl, s_trtl, t_trtl, ll_trtl, lr_trtl, p_trtl, m_trtl, n1_trtl, n2_trtl, c_trtl, WrongFileError
+from racing_game_sim import SpriteAttributes, Body, Car, SimClock, positions, format_time, parse_duration, REFERENCE_DT, COIN_RESPAWN
+from racing_game_track import TRACK
+from racing_game_render import SpriteItems, Hud, HudText, Needle, SCREENS, POOL
+from racing_game_database import JsonStore, SqliteStore, Journal, ENGINE, SHARED, KINDS, open_store, best_ms, best_text, category_key
+from racing_game_constants import SCR, TURTLES, d_trtl, p_trtl, m_trtl, c_trtl, WrongFileError
 
 #* classes
-#?   dataclasses
-@dataclasses.dataclass
-class SpriteAttributes:
-    """
-    defines some visual properties of the sprite
-    """
-    size: float         # size of the sprite
-    color: str          # colour of the sprite
-    shape: str          # shape of the sprite
-    sprite: str         # the sprite of the sprite
-    collision: bool     # whether collision is enabled for the sprite
-
-@dataclasses.dataclass
-class _PlayerScore:
-    """
-    timer and lap counter for the player
+#?   object classes
+def _sim_attribute(name: str) -> property:
     """
-    total_laps: int             # amount of laps required for a player to win
-    timer: int                  # unused
-    laps: int                   # number of laps completed
-    won: bool                   # whether the player has won or not
-    pos: str                    # position (1st, 2nd, draw)
-    collisions: int             # number of collisions with the other player
-    colliding: bool             # if the player is currently colliding with the other player
-    coins: int                  # number of coins collected
-    lap_marker_top: bool        # top fnish line marker
-    lap_marker_bottom: bool     # bottom finish line
-    lap_marker_left: bool       # left finish line
-    lap_marker_right: bool      # right finish line
+    Creates a property that reads and writes an attribute of the headless simulation state (`self.sim`),
+    so the turtle classes can be used as if they still owned the state
 
-@dataclasses.dataclass
-class _Movement:
-    """
-    movement properties for the player
-    """
-    rotating_left: bool     # ----------
-    rotating_right: bool    # keybind properties
-    accelerating: bool      # to define where the player should move
-    decel: bool             # ----------
-    timer: int              # unused
-    time_accel: int         # amount of time the player has been accelerating for (pos direction)
-    time_decel: int         # amount of time the player has been decelerating for (neg direction)
-    accel: int              # acceleration factor
+    Parameters:
+        name (str): the name of the attribute in the simulation state
 
-@dataclasses.dataclass
-class _Timer:
+    Returns:
+        property: the property to put on the class
     """
-    extra timing properties
-    """
-    start_time: time                # timestamp of the lap start time
-    end_time: time                  # timestamp of the lap end time
-    lap_time: datetime.timedelta    # time taken to complete a lap
-    laps: list                      # list of all the lap times (index is lap number)
+    return property(
+        lambda self: getattr(self.sim, name),
+        lambda self, value: setattr(self.sim, name, value),
+        doc=f"`{name}` of the simulation state"
+    )
 
-#?   object classes
 class Sprite:
     """
     Sprite Class
 
-    Parent class for all sprites used in the game
+    Parent class for all sprites used in the game.
+    The sprite is only a view, all of its state is kept in a headless `Body` from `racing_game_sim`
     """
+    x = _sim_attribute("x")
+    y = _sim_attribute("y")
+    dx = _sim_attribute("dx")
+    dy = _sim_attribute("dy")
+    heading = _sim_attribute("heading")
+    attr = _sim_attribute("attr")
+    active = _sim_attribute("active")
+
     def __init__(
             self,
             x: float = 0,
@@ -95,25 +58,21 @@ class Sprite:
                                                 shape="square",
                                                 sprite="square",
                                                 collision=True
-                                                )
+                                                ),
+            sim: Body|None = None
         ):
         """
         define variables - does not make sprite, use `construct()`
         """
-        self.x = x
-        self.y = y
-        self.dx = 0
-        self.dy = 0
-        self.heading = heading
-        self.attr = attributes
-        self.active = True
-        self.turtle = turtle.Turtle()
+        self.sim: Body = sim if sim is not None else Body(x=x, y=y, heading=heading, attributes=attributes)
+        self._turtle: turtle.RawTurtle|None = None  # borrowed from the pool the first time it is used
+        self.items = SpriteItems()                  # canvas polygons the sprite is drawn with during the game
 
     def construct(self) -> None:
         """
         Constructs the sprite and registers it
 
-        This method creates a test sprite object and registers it with the name "hi".
+        This method creates a test sprite object and registers it with the name "hi", only the first time it is called.
         
         Parameters:
         None
@@ -121,87 +80,86 @@ class Sprite:
         Returns:
         None
         """
+        if "hi" in SCR._shapes:     # pylint: disable=protected-access
+            return
         # HI sprite
         sprite_obj = turtle.Shape("compound")
         sprite_obj.addcomponent([(0,0),(-5,0),(-5,5),(-5,-5),(-5,0),(0,0),(0,5),(0,-5)], "", "white")
         sprite_obj.addcomponent([(5,-5),(5,5)], "", "white")
-        turtle.register_shape("hi", sprite_obj)
+        SCR.register_shape("hi", sprite_obj)
 
-    def update(self) -> None:
+    def update(self, dt: float = REFERENCE_DT) -> None:
         """
         Updates the location and speed of the sprite.
 
-        This method is responsible for updating the position of the sprite based on its current speed (dx, dy).
-        It also performs collision detection and handles collisions with the edges of the screen.
+        The screen size is passed on to the simulation state so it can handle collisions with the edges of the screen.
+
+        Parameters:
+            dt (float): length of the simulation tick in seconds. Defaults to `REFERENCE_DT`
 
         Returns:
             None
         """
-        # movement
-        self.x += self.dx
-        self.y += self.dy
-        # collision detection
-        collided, where = self._check_collision()
-        if collided:
-            match where:
-                case "top":         # collision with top of screen
-                    self.y = 450
-                case "bottom":      # collision with bottom of screen
-                    self.y = -450
-                case "right":       # collision with right side of screen
-                    self.x = 900
-                case "left":        # collision with left side of screen
-                    self.x = -900
-                case _:
-                    pass
-
-    def _check_collision(self) -> tuple[bool, str|None]:
-        """
-        check if sprite is off the screen
-
-        returns a tuple of (True, "top"|"bottom"|"left"|"right") if colliding
-        or a tuple of (False, "nowhere") if not colliding
-        or a tuple of (False, None) if collision is not enabled for the sprite
-        """
-        if self.attr.collision:
-            if self.x > (SCR.window_width()/2) - (22*self.attr.size):   # right border
-                return (True, "right")
-            if self.x < (SCR.window_width()/-2) + (22*self.attr.size):  # left border
-                return (True, "left")
-            if self.y > (SCR.window_height()/2) - (22*self.attr.size):  # top border
-                return (True, "top")
-            if self.y < (SCR.window_height()/-2) + (22*self.attr.size): # bottom border
-                return (True, "bottom")
-            return (False, "nowhere")
-        return (False, None)
-
-    def render(self) -> None:
-        """
-        Updates the location and visuals of the sprite on the screen
+        self.sim.bounds = (SCR.window_width(), SCR.window_height())
+        self.sim.update(dt)
+
+    def render(self, alpha: float = 1.0) -> None:
+        """
+        Updates the location and visuals of the sprite on the screen.
+        The sprite's canvas polygons are only moved (see `SpriteItems`), they aren't deleted and stamped again every frame.
 
         Parameters:
-            None
+            alpha (float): how far between the previous simulation tick (0) and the latest one (1) to draw the sprite. Defaults to 1
 
         Returns:
             None
         """
         if self.active:
-            self.turtle.hideturtle()
-            self.turtle.clear()
-            self.turtle.penup()
-            self.turtle.goto(self.x, self.y)
-            self.turtle.seth(self.heading)
-            self.turtle.shapesize(self.attr.size)
-            self.turtle.shape(self.attr.shape)
-            self.turtle.color(self.attr.color)
-            self.turtle.stamp()
+            x, y, heading = self.sim.pose(alpha)
+            self.items.draw(self.attr.shape, self.attr.color, self.attr.size, x, y, heading)
+
+    @property
+    def turtle(self) -> turtle.RawTurtle:
+        """
+        The sprite's turtle, only used for the big previews in the menus.
+        It is borrowed from the pool the first time it is needed, so sprites that are never previewed (like coins) don't make one.
+        """
+        if self._turtle is None:
+            self._turtle = POOL.borrow()
+        return self._turtle
+
+    def release(self) -> None:
+        """
+        Gives the sprite's turtle and canvas polygons back to the pool when it leaves the screen.
+        They are borrowed again the next time the sprite is drawn, so changing screens never adds to the canvas.
+
+        Returns:
+            None
+        """
+        if self._turtle is not None:
+            POOL.give_back(self._turtle)
+            self._turtle = None
+        self.items.clear()
 
 class Player(Sprite):
     """
     Player Class
 
-    Child class of 'Sprite', controllable by the player
+    Child class of 'Sprite', controllable by the player.
+    The physics, track checks and lap scoring are done by a headless `Car` from `racing_game_sim`
     """
+    score = _sim_attribute("score")
+    movement = _sim_attribute("movement")
+    timer = _sim_attribute("timer")
+    clock = _sim_attribute("clock")
+    name = _sim_attribute("name")
+    ax = _sim_attribute("ax")
+    ay = _sim_attribute("ay")
+    speed = _sim_attribute("speed")
+    player_num = _sim_attribute("player_num")
+    num = _sim_attribute("num")
+    shapes: dict[tuple[str, str, str], turtle.Shape] = {}     # built car shapes by (sprite, colour, orientation), shared by both players
+
     def __init__(
             self,
             x: float = 0,
@@ -217,43 +175,8 @@ class Player(Sprite):
             name: str = "PLAYER ONE",
             num: int = 1
             ) -> None:
-        super().__init__(x=x, y=y, heading=heading, attributes=attributes)
-        self.score = _PlayerScore(
-                        timer=0,
-                        total_laps=10,
-                        laps=0,
-                        won=False,
-                        pos="Draw",
-                        collisions=0,
-                        colliding=False,
-                        coins=0,
-                        lap_marker_bottom=False,
-                        lap_marker_top=False,
-                        lap_marker_right=False,
-                        lap_marker_left=False
-                    )
-        self.movement = _Movement(
-                            rotating_left=False,
-                            rotating_right=False,
-                            accelerating=False,
-                            decel=False,
-                            timer=0,
-                            time_accel=0,
-                            time_decel=0,
-                            accel=2
-                        )
-        self.timer = _Timer(
-                        start_time=time.now(),
-                        end_time=time.now(),
-                        lap_time=datetime.timedelta(seconds=0),
-                        laps=[]
-                    )
-        self.name = name            # name of the player
-        self.ax: float = 0          # acceleration delta in the x directio
-        self.ay: float = 0          # accleration delta in the y direction
-        self.speed: float = 0       # speed of the player in "kmph"
-        self.player_num: int = 2    # total number of players playing
-        self.num: int = num         # the player id of this player instance (either 1 or 2)
+        super().__init__(sim=Car(x=x, y=y, heading=heading, attributes=attributes, name=name, num=num))
+        self.sim: Car
 
     def _main_f1(self) -> turtle.Shape:
         """
@@ -603,271 +526,67 @@ class Player(Sprite):
         )
         return obj
 
-    def _move(self) -> None:
-        """
-        Handles all movement of the player:
-        - turning left/right
-        - moving forwards and backwards
-        - stopping
-
-        Parameters:
-        None
-
-        Returns:
-        None
-        """
-
-        # respond to keypresses
-        if self.movement.rotating_left:                                                 # turn left
-            self.heading += 2
-            self.attr.shape = f"{self.attr.sprite}{self.name}left"
-
-        if self.movement.rotating_right:                                                # turn right
-            self.heading -= 2
-            self.attr.shape = f"{self.attr.sprite}{self.name}right"
-
-        if self.movement.accelerating:                                                  # forwards
-            if self.movement.time_decel < 0:                                            # start accel from reversing
-                self.movement.time_accel = 0                                            # ensure no forwards slipping through
-                self.movement.time_decel += self.movement.accel * 5
-                self.ax = (self.ax + 0.75 * math.sin(math.radians(self.heading)) * self.movement.time_decel)/2
-                self.ay = (self.ay - 0.75 * math.cos(math.radians(self.heading)) * self.movement.time_decel)/2
-                self.x += self.ax * 0.02
-                self.y += self.ay * 0.02
-            else:                                                                       # just accel from stopped
-                self.attr.shape = f"{self.attr.sprite}{self.name}"
-                self.movement.time_decel = 0                                            # ensure no backward slipping through
-                if self.movement.time_accel < 1500:                                     # forward speed capped to 1500
-                    self.movement.time_accel += self.movement.accel
-                self.ax = (self.ax + 0.75 * math.sin(math.radians(self.heading)) * self.movement.time_accel)/2
-                self.ay = (self.ay - 0.75 * math.cos(math.radians(self.heading)) * self.movement.time_accel)/2
-                self.x += self.ax * 0.02
-                self.y += self.ay * 0.02
-
-        elif self.movement.decel:                                                       # backwards
-            if self.movement.time_accel > 0:                                            # finish moving forward
-                self.movement.time_decel = 0                                            # ensure no backward slipping through
-                self.movement.time_accel -= self.movement.accel * 5
-                self.ax = (self.ax + 0.75 * math.sin(math.radians(self.heading)) * self.movement.time_accel)/2
-                self.ay = (self.ay - 0.75 * math.cos(math.radians(self.heading)) * self.movement.time_accel)/2
-                self.x += self.ax * 0.02
-                self.y += self.ay * 0.02
-            else:                                                                       # start moving back
-                self.movement.time_accel = 0                                            # ensure no forward slipping through
-                if self.movement.time_decel > -500:                                     # reversing speed capped to 700
-                    self.movement.time_decel -= self.movement.accel
-                self.ax = (self.ax + 0.75 * math.sin(math.radians(self.heading)) * self.movement.time_decel)/2
-                self.ay = (self.ay - 0.75 * math.cos(math.radians(self.heading)) * self.movement.time_decel)/2
-                self.x += self.ax * 0.02
-                self.y += self.ay * 0.02
-
-        if self.movement.accelerating and self.movement.decel:                          # both forwards and backwards keys pressed
-            if self.movement.time_accel > 0 and self.movement.time_decel == 0:          # moving forward
-                self.movement.time_accel -= self.movement.accel * 5
-                if self.movement.time_accel < 5:
-                    self.movement.time_accel = 0                                        # catch edge case where it goes negative
-                self.ax = (self.ax + 0.75 * math.sin(math.radians(self.heading)) * self.movement.time_accel)/2
-                self.ay = (self.ay - 0.75 * math.cos(math.radians(self.heading)) * self.movement.time_accel)/2
-                self.x += self.ax * 0.02
-                self.y += self.ay * 0.02
-            elif self.movement.time_decel < 0 and self.movement.time_accel == 0:        # moving backward
-                self.movement.time_decel += self.movement.accel * 5
-                if self.movement.time_decel > -5:
-                    self.movement.time_decel = 0                                        # catch edge case where it goes positive
-                self.ax = (self.ax + 0.75 * math.sin(math.radians(self.heading)) * self.movement.time_decel)/2
-                self.ay = (self.ay - 0.75 * math.cos(math.radians(self.heading)) * self.movement.time_decel)/2
-                self.x += self.ax * 0.02
-                self.y += self.ay * 0.02
-
-        if not self.movement.accelerating and not self.movement.decel:                  # no forwards or backwards - stop movement
-            if self.movement.time_accel > 0 and self.movement.time_decel == 0:          # moving forward
-                self.movement.time_accel -= int(self.movement.accel * 2.5)
-                if self.movement.time_accel < 5:
-                    self.movement.time_accel = 0                                        # catch edge case where it goes negative
-                self.ax = (self.ax + 0.75 * math.sin(math.radians(self.heading)) * self.movement.time_accel)/2
-                self.ay = (self.ay - 0.75 * math.cos(math.radians(self.heading)) * self.movement.time_accel)/2
-                self.x += self.ax * 0.02
-                self.y += self.ay * 0.02
-            elif self.movement.time_decel < 0 and self.movement.time_accel == 0:        # moving backward
-                self.movement.time_decel += int(self.movement.accel * 2.5)
-                if self.movement.time_decel > -5:
-                    self.movement.time_decel = 0                                        # catch edge case where it goes positive
-                self.ax = (self.ax + 0.75 * math.sin(math.radians(self.heading)) * self.movement.time_decel)/2
-                self.ay = (self.ay - 0.75 * math.cos(math.radians(self.heading)) * self.movement.time_decel)/2
-                self.x += self.ax * 0.02
-                self.y += self.ay * 0.02
-
-    def _collision(self) -> None:
-        """
-        Handles all collision of the player with the screen and track.
-        Does not handle collision with other players.
-        """
-        # collision detection
-        #   with screen edge
-        collided, where = self._check_collision()
-        if collided:
-            self.movement.time_accel = 0
-            self.movement.time_decel = 0
-            match where:
-                case "top":         # collision with top of screen
-                    self.y = (SCR.window_height()/2) - (22*self.attr.size)
-                case "bottom":      # collision with bottom of screen
-                    self.y = (-SCR.window_height()/2) + (22*self.attr.size)
-                case "right":       # collision with right side of screen
-                    self.x = (SCR.window_width()/2) - (22*self.attr.size)
-                case "left":        # collision with left side of screen
-                    self.x = (-SCR.window_width()/2) + (22*self.attr.size)
-                case _:
-                    pass
-        #   with track
-        if self._off_track():
-            if self.movement.time_accel > 0 and self.movement.time_decel == 0:      # moving forwards
-                if self.movement.time_accel > 100:
-                    self.movement.time_accel -= 20
-                    self.movement.accel = 1
-                    self.heading += random.randint(-4,4)                            # makes it harder to control on grass
-            elif self.movement.time_decel < 0 and self.movement.time_accel == 0:    # moving backwards
-                if self.movement.time_decel < -100:
-                    self.movement.time_decel += 20
-                    self.movement.accel = 1
-                    self.heading += random.randint(-4,4)                            # makes it harder to control on grass
-            else:
-                pass
-        else:                                                                       # definitely on the track and will run every frame
-            if self.movement.time_accel > 500:                                      # slower acceleration after 100"kmph" (500 frames of accelerating)
-                self.movement.accel = 2
-            else:
-                self.movement.accel = 3
-
-    def _off_track(self) -> bool:
-        """
-        Checks if the player is on the track or not.
-        
-        Returns:
-            True if the player is off the track, else False.
-        """
-        x = round(self.x)
-        y = round(self.y)
-        dist_left = ((((x+450)**2)+((y-50)**2))**(1/2))
-        dist_right = ((((x-450)**2)+((y-50)**2))**(1/2))
-        # conditions
-        on_track_straight = ((200 < y < 400) and (-450 <= x <= 450)) or ((-300 < y < -100) and (-450 <= x <= 450))  # box encasing the straights of the track at the top and bottom
-        on_track_curve_left = (x <= -450) and (150 < dist_left < 350)                                               # checks whether the distance between the player and the origin of the left semi-circle is within the range of the track
-        on_track_curve_right = (x >= 450) and (150 < dist_right < 350)                                              # checks whether the distance between the player and the origin of the left semi-circle is within the range of the track
-        # returns
-        if not on_track_straight and not on_track_curve_left and not on_track_curve_right:
-            return True     # player is off the track
-        return False        # player is on the track
-
-    def _win_condition(self) -> None:
-        """
-        Checks if the player has won the game.
-
-        If the number of laps completed by the player is greater than or equal to the total number of laps,
-        sets the `won` attribute of the `score` object to True.
-
-        Returns:
-            None
-        """
-        if self.score.laps >= self.score.total_laps:
-            self.score.won = True
-            return
-
-    def _score(self) -> None:
-        """
-        Update the score/num of laps, and the times for each lap.
-.
-        It checks if the player has passed through the lap markers and the finish line, and updates the score accordingly.
-        It also calculates and stores the lap times for the stats screen.
+    BUILDERS = {            # functions that build each (sprite, orientation)
+        ("f1car", ""): _main_f1,
+        ("f1car", "left"): _left_f1,
+        ("f1car", "right"): _right_f1,
+        ("ute", ""): _main_ute,
+        ("ute", "left"): _left_ute,
+        ("ute", "right"): _right_ute,
+    }
 
-        Returns:
-            None
+    def _shape(self, orientation: str) -> turtle.Shape:
         """
-        if not self._off_track() and (-10 < round(self.x) < 10) and (round(self.y)>0):      # top marker
-            self.score.lap_marker_top = True
-        elif not self._off_track() and (-10 < round(self.x) < 10) and (round(self.y)<0):    # bottom marker
-            self.score.lap_marker_bottom = True
-        elif not self._off_track() and (-10 < round(self.y) < 10) and (round(self.x)<0):    # left marker
-            self.score.lap_marker_left = True
-        elif not self._off_track() and (-10 < round(self.y) < 10) and (round(self.x)>0):    # right marker
-            self.score.lap_marker_right = True
-        else:
-            pass
-        if ((sum([                                                                          # the sum function will return the number of True values in the list
-                self.score.lap_marker_top,
-                self.score.lap_marker_bottom,
-                self.score.lap_marker_left,
-                self.score.lap_marker_right
-                ]) >= 3)                                                                    # must get at least 3 of the 4 markers for a lap to be counted
-            and not self._off_track() and (-10 < round(self.x) < 10) and (round(self.y)>0)  # lap is only counted when on the track and passing through the finish line
-            ):
-            self.score.laps += 1
-            self.score.lap_marker_top = False                                               # reset all markers
-            self.score.lap_marker_bottom = False
-            self.score.lap_marker_left = False
-            self.score.lap_marker_right = False
-            self.timer.end_time = time.now()
-            lap_time = self.timer.end_time-self.timer.start_time
-            self.timer.laps.append(lap_time)                                                # update list of lap times for stats
-            self.timer.start_time = time.now()
-            self._win_condition()                                                           # check if the player won
-        self.timer.lap_time = time.now()-self.timer.start_time                              # running lap timer to display while game is running
-
-    def _spedo(self) -> None:
-        """
-        Constantly update the speed value to display on the speedometer.
-
-        This method calculates the speed based on the time acceleration and deceleration values
-        and updates the `speed` attribute of the player. The speed value is rounded to the nearest
-        integer and multiplied by 0.2 to get a psuedo "kilometers per hour" value
+        The shape of the player's car in its current colour, only built the first time each (sprite, colour, orientation) is needed.
 
-        Args:
-            None
+        Parameters:
+            orientation (str): "" for going straight, "left" or "right"
 
         Returns:
-            None
+            turtle.Shape: the shape
         """
-        self.speed = round(abs(self.movement.time_accel - self.movement.time_decel) * 0.2)
+        key = (self.attr.sprite, self.attr.color, orientation)
+        shape = self.shapes.get(key)
+        if shape is None:
+            shape = self.shapes[key] = self.BUILDERS[(self.attr.sprite, orientation)](self)
+        return shape
 
     def construct(self) -> None:
         """
-        Register all vehicle sprites.
+        Register the vehicle sprites.
 
-        This method registers the all the vehicle sprites for the player. It uses the `_main_<car name>()`,
-        `_left_<car name>()`, and `_right_<car name>()` methods to generate the shapes for the car sprites.
+        This method registers the straight, left and right sprites of the player's selected car in its current colour.
+        The shapes are built with the `_main_<car name>()`, `_left_<car name>()`, and `_right_<car name>()` methods
+        the first time each car and colour is used, and a shape is only registered again if it has changed.
         It also calls the `construct()` method of the super class to ensure that the "HI" sprite is also registered.
 
         Returns:
             None
         """
-        turtle.register_shape(f"f1car{self.name}", self._main_f1())
-        turtle.register_shape(f"f1car{self.name}left", self._left_f1())
-        turtle.register_shape(f"f1car{self.name}right", self._right_f1())
-        turtle.register_shape(f"ute{self.name}", self._main_ute())
-        turtle.register_shape(f"ute{self.name}left", self._left_ute())
-        turtle.register_shape(f"ute{self.name}right", self._right_ute())
+        for orientation in ("", "left", "right"):
+            if (self.attr.sprite, orientation) not in self.BUILDERS:   # one of turtle's own shapes
+                continue
+            name = f"{self.attr.sprite}{self.name}{orientation}"
+            shape = self._shape(orientation)
+            if SCR._shapes.get(name) is not shape:      # pylint: disable=protected-access
+                SCR.register_shape(name, shape)
         super().construct()     # make sure "HI" sprite is registered
 
-    def update(self) -> None:
+    def update(self, dt: float = REFERENCE_DT) -> None:
         """
         Update the Player to a new state.
 
         This method updates the state of the Player object. It does not change anything visually on the screen.
         To update the visual representation of the Player, use the `render()` method.
+        The movement, collision, scoring and speedometer are all handled by `Car.update()`
 
-        This method performs the following actions:
-        - Moves the player based on input.
-        - Checks if the player has collided with anything.
-        - Updates the score and lap times for the player.
-        - Updates the speedometer value internally.
+        Parameters:
+            dt (float): length of the simulation tick in seconds. Defaults to `REFERENCE_DT`
 
         Returns:
         None
         """
-        self._move()        # moved the player based off input
-        self._collision()   # checks if the player has collided with anything
-        self._score()       # updates the score and lap times for the player
-        self._spedo()       # updates the speedometer value (internally)
+        super().update(dt)
 
     def player_collision(self, player: Sprite) -> bool:
         """
@@ -879,68 +598,55 @@ class Player(Sprite):
         Returns:
             bool: True if the provided player is colliding with the player, False otherwise.
         """
-        x = round(self.x)
-        y = round(self.y)
-        px = round(player.x)
-        py = round(player.y)
-        valid_state = ((player.attr.collision) and (self.attr.collision)) and ((player.active) and (self.active))   # check if both players are active (rendered on the screen) and have collision enabled
-        if (px-50 <= x <= px+50) and (py-50 <= y <= py+50) and valid_state:                                         # collision with a box 50px by 50px around the other player
-            # need to make something happen when they collide - for now just says hi
-            self.attr.shape = "hi"
-            if not self.score.colliding: # allow for accurate collision count - only goes up by 1 for each collision, doesnt keep going up if they stay ontop of each other
-                self.score.collisions += 1
-            self.score.colliding = True
-            return True
-        self.score.colliding = False
-        return False
+        return self.sim.player_collision(player.sim)
 
     def rotate_left_start(self) -> None:
         """
         start turning left
         """
-        self.movement.rotating_left = True
+        self.sim.rotate_left_start()
 
     def rotate_left_stop(self) -> None:
         """
         stop turning left
         """
-        self.movement.rotating_left = False
+        self.sim.rotate_left_stop()
 
     def rotate_right_start(self) -> None:
         """
         start turning right
         """
-        self.movement.rotating_right = True
+        self.sim.rotate_right_start()
 
     def rotate_right_stop(self) -> None:
         """
         stop turning right
         """
-        self.movement.rotating_right = False
+        self.sim.rotate_right_stop()
 
     def accelerate_start(self) -> None:
         """
         start accelerating
         """
-        self.movement.accelerating = True
+        self.sim.accelerate_start()
 
     def accelerate_stop(self) -> None:
         """
         stop accelerating
         """
-        self.movement.accelerating = False
+        self.sim.accelerate_stop()
 
     def decel_start(self) -> None:
         """
         start deceling
         """
-        self.movement.decel = True
+        self.sim.decel_start()
 
     def decel_stop(self) -> None:
         """
         stop deceling
         """
-        self.movement.decel = False
+        self.sim.decel_stop()
 
     def best_lap(self) -> str:
         """
@@ -949,13 +655,10 @@ class Player(Sprite):
         This method is a helper function for the score area updater.
 
         Returns:
-            str: The time of the best lap in the format 'hh:mm:ss.mms'.
+            str: The time of the best lap in the format 'h:mm:ss.mmm'.
                  If no laps have been completed, returns '-         '.
         """
-        if not self.timer.laps:
-            return "-         "
-        lap_time = min(self.timer.laps)
-        return str(lap_time)[:-3] # cut off the last 3 digits of the time bc dont need microsecond accuracy - millisecond is fine
+        return self.sim.best_lap()
 
     def collect_coin(self, coin) -> None:
         """
@@ -976,14 +679,12 @@ class Player(Sprite):
         Returns:
             bool: whether the player is colliding with the sprite
         """
-        if sprite.attr.collision:                                                               # check that collision is enabled for the given sprite
-            if (self.x-50 <= sprite.x <= self.x+50) and (self.y-50 <= sprite.y <= self.y+50):   # collision with a box 50px by 50px around the sprite
-                return True
-        return False
+        return self.sim.check_collision(sprite.sim)
 
     def reset(self) -> None:
         """
         Reset all values to original state.
+        The turtle and canvas polygons are given back to the pool, so restarting doesn't make new ones.
 
         Parameters:
             None
@@ -991,43 +692,8 @@ class Player(Sprite):
         Returns:
             None
         """
-        if self.num == 1:
-            super().__init__(x=-45, y=330, heading=90, attributes=self.attr)
-        else:
-            super().__init__(x=-45, y=270, heading=90, attributes=self.attr)
-        self.score = _PlayerScore(
-                        timer=0,
-                        total_laps=self.score.total_laps,
-                        laps=0,
-                        won=False,
-                        pos="Draw",
-                        collisions=0,
-                        colliding=False,
-                        coins=self.score.coins,
-                        lap_marker_bottom=False,
-                        lap_marker_top=False,
-                        lap_marker_right=False,
-                        lap_marker_left=False
-                    )
-        self.movement = _Movement(
-                            rotating_left=False,
-                            rotating_right=False,
-                            accelerating=False,
-                            decel=False,
-                            timer=0,
-                            time_accel=0,
-                            time_decel=0,
-                            accel=2
-                        )
-        self.timer = _Timer(
-                        start_time=time.now(),
-                        end_time=time.now(),
-                        lap_time=datetime.timedelta(seconds=0),
-                        laps=[]
-                    )
-        self.ax = 0
-        self.ay = 0
-        self.speed = 0
+        self.release()
+        self.sim.reset()
 
 class Coin(Sprite):
     """
@@ -1071,7 +737,7 @@ class Coin(Sprite):
             None
         """
         self.active = False
-        self.turtle.clear()
+        self.items.hide()
 
 #?   util classes
 class Background:
@@ -1123,43 +789,38 @@ class Background:
         t.goto(x, y)
         t.pd()
 
-    def _red_dash_circle(self, rad: int, extent: int = 360, step: int = 5) -> None:
+    def _polygon(self, points: list[tuple[float, float]], colour: str) -> None:
         """
-        Helper function to create a red dashed circle around turns.
+        Helper function to draw a filled shape through a list of points.
 
         Parameters:
-        - rad (int): The radius of the circle.
-        - extent (int): The extent of the circle in degrees. Default is 360.
-        - step (int): The length of each colour segment. Default is 5.
+        - points (list[tuple[float, float]]): The corners of the shape in order.
+        - colour (str): The fill colour of the shape.
 
         Returns:
             None
         """
-        deg = 0
-        d_trtl.width(25)
-        while deg < extent:
-            deg += step
-            if (deg % (step*2)) == 0:   # only true on every second iteration
-                d_trtl.pencolor("red")
-            else:
-                d_trtl.pencolor("white")
-            d_trtl.circle(rad,step)     # continue the circle
-        d_trtl.pencolor("white")        # reset
-        d_trtl.width(4)
+        self._hgoto(*points[0])
+        d_trtl.fillcolor(colour)
+        d_trtl.begin_fill()
+        for point in points[1:]:
+            d_trtl.goto(point)
+        d_trtl.end_fill()
 
-    def _start_finish(self, sx: int = -450, gap: int = 4) -> None:
+    def _start_finish(self, sx: int = -450, gap: int = 4, sy: int = 204) -> None:
         """
         Draw the start/finish line.
 
         Parameters:
         - sx (int): starting x coordinate
         - gap (gap): gap between the lines, should be half of the width
+        - sy (int): starting y coordinate, just above the inside edge of the track
         
         Returns:
         None
         """
         d_trtl.width(8)
-        d_trtl.goto(sx, 204)
+        d_trtl.goto(sx, sy)
         d_trtl.pd()
 
                                                     # 192 is the width of the track
@@ -1210,7 +871,7 @@ class Background:
                                         # create tick sprite
         tick = turtle.Shape("compound")
         tick.addcomponent(((0,0),(-40,0),(-40,5),(0,5),(0,-5),(-40,-5),(-40,0),(0,0)), "white", "white")
-        turtle.register_shape("tick", tick)
+        SCR.register_shape("tick", tick)
         t.shape("tick")
         t.pd()                          # goto starting position
         t.goto(sx,-430)
@@ -1237,10 +898,6 @@ class Background:
         - None
         """
         d_trtl.pencolor("white")
-        n1_trtl.pencolor("red")
-        n1_trtl.width(4)
-        n2_trtl.pencolor("red")
-        n2_trtl.width(4)
         if p1.player_num == 2:
             # ---- Player 1 -----
             d_trtl.width(2)
@@ -1299,47 +956,31 @@ class Background:
 
     def _track(self) -> None:
         """
-        Draws the entire racetrack and colors it in.
+        Draws the entire racetrack and colors it in, using the render path of the compiled track (see `racing_game_track`).
 
         The track consists of three parts:
-        - The concrete middle: A grey-colored filled shape in the middle of the track.
-        - The outer edge: A black-colored filled shape that outlines the outer edge of the track.
-        - The inner edge: A black-colored filled shape that outlines the inner edge of the track.
+        - The track surface: A dark filled shape inside the outer edge of the track.
+        - The concrete middle: A grey-colored filled shape inside the inner edge of the track.
+        - The kerbs: Red and white dashes along both edges of every turn.
         
         Returns:
         None
         """
+        render = TRACK.render
         d_trtl.pd()
+        # track surface
+        self._polygon(render["outer"], render["colours"]["surface"])
         # concrete middle
-        self._hgoto(-450,200)
-        d_trtl.fillcolor("grey")
-        d_trtl.begin_fill()
-        d_trtl.goto(450,200)
-        d_trtl.circle(-145,180)
-        d_trtl.goto(-450,-90)
-        d_trtl.circle(-145,180)
-        d_trtl.end_fill()
-        # outer edge
-        self._hgoto(-450,400)
-        d_trtl.fillcolor("#222222")
-        d_trtl.begin_fill()
-        d_trtl.goto(450,400)
-        self._hgoto(450,410)
-        self._red_dash_circle(-360,180,5)
-        self._hgoto(450,-300)
-        d_trtl.goto(-450,-300)
-        self._hgoto(-450,-310)
-        self._red_dash_circle(-360,180,5)
-        # inner edge
-        self._hgoto(-450,200)
-        d_trtl.goto(450,200)
-        self._hgoto(450,190)
-        self._red_dash_circle(-135,180,10)
-        self._hgoto(450,-90)
-        d_trtl.goto(-450,-90)
-        self._hgoto(-450,-80)
-        self._red_dash_circle(-135,180,10)
-        d_trtl.end_fill()
+        self._polygon(render["inner"], render["colours"]["infield"])
+        # kerbs
+        d_trtl.width(render["kerb_width"])
+        for i, dash in enumerate(render["kerbs"]):
+            d_trtl.pencolor(render["kerb_colours"][i % len(render["kerb_colours"])])
+            self._hgoto(*dash[0])
+            for point in dash[1:]:
+                d_trtl.goto(point)
+        d_trtl.pencolor("white")        # reset
+        d_trtl.width(4)
         d_trtl.pu()
 
     def rounded_rectangle(self, t: turtle.Turtle, short: int, long: int, radius: int, colour: str = "grey", outline: str = "grey") -> None:
@@ -1462,6 +1103,22 @@ class Background:
     def race_track(self, p1: Player, p2: Player) -> None:
         """
         Draws racetrack background for improved game.
+        The background is only drawn with the turtle the first time for each set of players,
+        after that it is played back from a display list in one go, so restarting a race is instant.
+
+        Parameters:
+        - p1: Player 1 object
+        - p2: Player 2 object
+
+        Returns:
+        None
+        """
+        params = (TRACK.name, p1.player_num, p1.name, p1.attr.color, p2.name, p2.attr.color)     # everything the background depends on
+        SCREENS.draw("race track", params, d_trtl, lambda: self._race_track(p1, p2))
+
+    def _race_track(self, p1: Player, p2: Player) -> None:
+        """
+        Draws the racetrack background with the turtle.
 
         Parameters:
         - p1: Player 1 object
@@ -1477,13 +1134,14 @@ class Background:
         # draw elements
         self._score_area(p1, p2)
         self._track()
-        self._start_finish(0,8)
+        self._start_finish(round(TRACK.finish.ax), 8, round(min(TRACK.finish.ay, TRACK.finish.by)) + 4)
         self._title()
         self._spedo(p1)
 
     def win_screen(self, wp: Player, nwp: Player, db: dict) -> None:
         """
         Display the win screen when a player wins.
+        It is drawn with the turtle every time rather than cached, as it is only shown once at the end of a race.
 
         Args:
             wp (Player): The winning player.
@@ -1493,8 +1151,10 @@ class Background:
             None
         """
         SCR.bgcolor("black")
+        best = db[wp.name]["best"]
+        new_best = wp.player_num == 1 and bool(wp.timer.laps) and best != "None" and min(wp.timer.laps) // 1_000_000 <= parse_duration(best) // 1_000_000  # player has got a new best time (saved to the millisecond)
         if wp.player_num == 1:
-            if pd.to_timedelta(wp.best_lap()) <= pd.to_timedelta(db[wp.name]["best"]): # player has got a new best time
+            if new_best:
                 self._hgoto(0,100)
                 d_trtl.write("NEW BEST TIME!!!", False, "center", ("comic sans", 100, "bold"))
                 self._hgoto(0,0)
@@ -1512,37 +1172,38 @@ class Background:
             self._hgoto(0,-50)
             d_trtl.write(f"Better luck next time {nwp.name}", False, "center", ("comic sans", 20, "bold"))
 
-    def stats_screen(self, p1: Player, p2: Player, start_time: time) -> None:
+    def stats_screen(self, p1: Player, p2: Player, game_time: int) -> None:
         """
         Display the end statistics screen.
+        It is drawn with the turtle every time rather than cached, as the times on it are different for every race.
 
         Parameters:
         - p1 (Player): The first player object.
         - p2 (Player): The second player object.
-        - start_time: The start time of the game.
+        - game_time (int): How long the game ran for in nanoseconds (from the simulation clock).
 
         Returns:
         None
         """
+        d_trtl.clear()
         # get statistics
         # player 1
-        total_time = str(time.now()-start_time)[:-3]
-        p1laps = datetime.timedelta(seconds=0)
-        p1avgtime: datetime.timedelta|str = "-"
+        total_time = format_time(game_time)
+        p1laps = 0
+        p1avgtime = "-"
         for lap in p1.timer.laps:
             p1laps += lap
         if len(p1.timer.laps) != 0:
-            p1avgtime = p1laps/len(p1.timer.laps)
+            p1avgtime = format_time(p1laps // len(p1.timer.laps))
         # player 2
-        p2laps = datetime.timedelta(seconds=0)
-        p2avgtime: datetime.timedelta|str = "-"
+        p2laps = 0
+        p2avgtime = "-"
         for lap in p2.timer.laps:
             p2laps += lap
         if len(p2.timer.laps) != 0:
-            p2avgtime = p2laps/len(p2.timer.laps)
+            p2avgtime = format_time(p2laps // len(p2.timer.laps))
         # setup for drawing
         t = d_trtl
-        t.clear()
         t.width(4)
         # draw the stats screen
         self._hgoto(0,400)
@@ -1571,7 +1232,7 @@ class Background:
         for i, lap_time in enumerate(p1.timer.laps): # draw laps at bottom of stats screen
             if t.ycor() > -450:
                 self._hgoto(-900, t.ycor()-50)
-                t.write(f"Lap {i+1}: {str(lap_time)[:-3]}{star if str(lap_time) == p1.best_lap() else n}", False, "left", ("comic sans", 30, "normal"))
+                t.write(f"Lap {i+1}: {format_time(lap_time)}{star if format_time(lap_time) == p1.best_lap() else n}", False, "left", ("comic sans", 30, "normal"))
             else:
                 self._hgoto(-900, t.ycor()-50)
                 t.write("Too Many Laps to fit on screen", False, "left", ("comic sans", 30, "normal"))
@@ -1600,7 +1261,7 @@ class Background:
             for i, lap_time in enumerate(p2.timer.laps): # draw laps at bottom of stats screen
                 if t.ycor() > -450:
                     self._hgoto(20, t.ycor()-50)
-                    t.write(f"Lap {i+1}: {str(lap_time)[:-3]}{x if str(lap_time) == p2.best_lap() else n}", False, "left", ("comic sans", 30, "normal"))
+                    t.write(f"Lap {i+1}: {format_time(lap_time)}{x if format_time(lap_time) == p2.best_lap() else n}", False, "left", ("comic sans", 30, "normal"))
                 else:
                     self._hgoto(20, t.ycor()-50)
                     t.write("Too Many Laps to fit on screen", False, "left", ("comic sans", 30, "normal"))
@@ -1637,10 +1298,20 @@ class Background:
 
         This method is responsible for drawing the main menu of the racing game.
         It displays the game title, options for playing the game, the leaderboard, and credits.
+        The menu never changes, so after the first time it is played back from a display list.
 
         Parameters:
         - None
 
+        Returns:
+        - None
+        """
+        SCREENS.draw("main menu", (), d_trtl, self._main_menu)
+
+    def _main_menu(self) -> None:
+        """
+        Draws the main menu with the turtle.
+
         Returns:
         - None
         """
@@ -1682,18 +1353,39 @@ class Updates:
     """
     Functions that update various parts of the game
     """
-    def __init__(self, player1: Player, player2: Player, cars: dict) -> None:
+    def __init__(self, player1: Player, player2: Player, cars: dict, clock: SimClock, hud: Hud) -> None:
         self.player1 = player1
         self.player2 = player2
         self.cars: dict = cars
-        self.game_start_time = time.now()
+        self.clock = clock      # game time, only runs while the race is being simulated
         self.bg = Background()
+        self.hud = hud          # text on the heads up display, only redrawn when it changes
+        big = ("comic sans", 20, "normal")
+        small = ("comic sans", 15, "normal")
+        hud.add("timer", HudText(0, -75, "center", ("comic sans", 20, "bold"), interval=0.1))       # lap timers redraw at 10 Hz
+        hud.add("p1 laps", HudText(-740, -405, "right", big))
+        hud.add("p1 pos", HudText(-740, -485, "right", big))
+        hud.add("p1 lap time", HudText(-535, -415, "right", small, interval=0.1))
+        hud.add("p1 best", HudText(-535, -495, "right", small))
+        hud.add("p2 laps", HudText(680, -405, "right", big))
+        hud.add("p2 pos", HudText(680, -485, "right", big))
+        hud.add("p2 lap time", HudText(880, -415, "right", small, interval=0.1))
+        hud.add("p2 best", HudText(880, -495, "right", small))
+        hud.add("p1 speed", HudText(-140, -505, "center", ("arial", 50, "normal")))      # two players
+        hud.add("p2 speed", HudText(140, -505, "center", ("arial", 50, "normal")))
+        hud.add("speed", HudText(0, -505, "center", ("arial", 50, "normal")))            # one player
+        hud.add("p1 needle", Needle(-140, -430))
+        hud.add("p2 needle", Needle(140, -430))
+        hud.add("needle", Needle(0, -430))
+        hud.add("p1 coins", HudText(-800, 482.5, "center", big))
+        hud.add("p2 coins", HudText(800, 482.5, "center", big))
 
     def spedo(self) -> None:
         """
         Updates the speed on the spedo.
 
-        This method clears the spedo display and updates it with the current speed of the player(s).
+        This method updates the spedo display with the current speed of the player(s).
+        The number and needle are only redrawn when the whole number speed changes.
         If there are two players, it displays the speeds of both players side by side.
         If there is only one player, it displays the speed of that player in the center.
 
@@ -1703,42 +1395,23 @@ class Updates:
         Returns:
         None
         """
-        s_trtl.clear()
         if self.player1.player_num == 2:
-            n1_trtl.clear()
-            n2_trtl.clear()
-            s_trtl.goto(-140,-505)
-            s_trtl.write(self.player1.speed, True, "center", ("arial", 50, "normal"))
-            s_trtl.goto(140,-505)
-            s_trtl.write(self.player2.speed, True, "center", ("arial", 50, "normal"))
-            speed1 = self.player1.speed*0.6
-            speed2 = self.player2.speed*0.6
-            n1_trtl.pu()
-            n1_trtl.goto(-140,-430)
-            n1_trtl.pd()
-            n1_trtl.seth(180-speed1)
-            n1_trtl.fd(80)
-            n2_trtl.pu()
-            n2_trtl.goto(140,-430)
-            n2_trtl.pd()
-            n2_trtl.seth(180-speed2)
-            n2_trtl.fd(80)
+            speed1 = int(self.player1.speed)
+            speed2 = int(self.player2.speed)
+            self.hud["p1 speed"].set(speed1)
+            self.hud["p2 speed"].set(speed2)
+            self.hud["p1 needle"].set(speed1)
+            self.hud["p2 needle"].set(speed2)
         else:
-            s_trtl.goto(0,-505)
-            s_trtl.write(self.player1.speed, True, "center", ("arial", 50, "normal"))
-            speed = self.player1.speed*0.6
-            n1_trtl.clear()
-            n1_trtl.pu()
-            n1_trtl.goto(0,-430)
-            n1_trtl.pd()
-            n1_trtl.seth(180-speed)
-            n1_trtl.fd(80)
+            speed = int(self.player1.speed)
+            self.hud["speed"].set(speed)
+            self.hud["needle"].set(speed)
 
     def timer(self) -> None:
         """
         Updates the main timer.
-        It calculates the current time by subtracting the game start time from the current time,
-        and it writes the current time on the screen.
+        It writes the time on the simulation clock on the screen, so it doesn't count time spent paused.
+        The time is redrawn 10 times a second rather than every frame.
 
         Parameters:
         None
@@ -1746,17 +1419,15 @@ class Updates:
         Returns:
         None
         """
-        t_trtl.clear()
-        t_trtl.goto(0,-75)
-        current_time = time.now()-self.game_start_time
-        t_trtl.write(str(current_time)[:-3], False, "center", ("comic sans", 20, "bold"))
+        self.hud["timer"].set(lambda: format_time(self.clock.ns))
 
     def score_area(self) -> None:
         """
         Updates the score area with the latest statistics.
 
-        This method clears the score area and updates it with the current scores, positions, lap times, and best lap times
+        This method updates the score area with the current scores, positions, lap times, and best lap times
         for both players. It also determines the positions of the players based on the number of laps completed.
+        Each value is only redrawn when it changes, and the lap times 10 times a second at most.
 
         Parameters:
         None
@@ -1764,37 +1435,21 @@ class Updates:
         Returns:
         None
         """
-        ll = ll_trtl
-        lr = lr_trtl
-        ll.clear()
-        lr.clear()
-        self.player1.score.pos = "Draw"
-        self.player2.score.pos = "Draw"
-        if self.player1.score.laps > self.player2.score.laps:
-            self.player1.score.pos = "1st"
-            self.player2.score.pos = "2nd"
-        elif self.player2.score.laps > self.player1.score.laps:
-            self.player1.score.pos = "2nd"
-            self.player2.score.pos = "1st"
+        hud = self.hud
+        positions([self.player1.sim, self.player2.sim])
         # ---Player 1----
-        ll.goto(-740,-405)
-        ll.write(f"{int(self.player1.score.laps)}/{int(self.player1.score.total_laps)}", False, "right", ("comic sans", 20, "normal"))
-        ll.goto(-740,-485)
-        ll.write(self.player1.score.pos, False, "right", ("comic sans", 20, "normal"))
-        ll.goto(-535,-415)
-        ll.write(str(self.player1.timer.lap_time)[:-3], False, "right", ("comic sans", 15, "normal"))
-        ll.goto(-535,-495)
-        ll.write(self.player1.best_lap(), False, "right", ("comic sans", 15, "normal"))
+        p1 = self.player1
+        hud["p1 laps"].set(f"{int(p1.score.laps)}/{int(p1.score.total_laps)}")
+        hud["p1 pos"].set(p1.score.pos)
+        hud["p1 lap time"].set(lambda: format_time(p1.timer.lap_time))
+        hud["p1 best"].set(p1.best_lap)
         # ----Player 2--------------------------------------------------------------------------
-        if self.player1.player_num == 2:
-            lr.goto(680,-405)
-            lr.write(f"{int(self.player2.score.laps)}/{int(self.player2.score.total_laps)}", False, "right", ("comic sans", 20, "normal"))
-            lr.goto(680,-485)
-            lr.write(self.player2.score.pos, False, "right", ("comic sans", 20, "normal"))
-            lr.goto(880,-415)
-            lr.write(str(self.player2.timer.lap_time)[:-3], False, "right", ("comic sans", 15, "normal"))
-            lr.goto(880,-495)
-            lr.write(self.player2.best_lap(), False, "right", ("comic sans", 15, "normal"))
+        if p1.player_num == 2:
+            p2 = self.player2
+            hud["p2 laps"].set(f"{int(p2.score.laps)}/{int(p2.score.total_laps)}")
+            hud["p2 pos"].set(p2.score.pos)
+            hud["p2 lap time"].set(lambda: format_time(p2.timer.lap_time))
+            hud["p2 best"].set(p2.best_lap)
 
     def player_collision(self) -> None:
         """
@@ -1814,17 +1469,16 @@ class Updates:
 
     def update(self) -> None:
         """
-        Perform miscellaneous updates for the game.
+        Perform miscellaneous display updates for the game, once per drawn frame.
+        Player collisions are checked every simulation tick with `player_collision()` instead.
 
         Including:
-        - Checking for player collisions
         - Updating the score area
         - Handling the speedometer
         - Updating the timer
 
         This method does not return any value.
         """
-        self.player_collision()
         self.score_area()
         self.spedo()
         self.timer()
@@ -2021,26 +1675,21 @@ class Updates:
         """
         update the coin count display
         """
-        c_trtl.clear()
-        if self.player1.player_num == 1:
-            c_trtl.goto(-800,482.5)
-            c_trtl.write(self.player1.score.coins, False, "center", ("comic sans", 20, "normal"))
-        else:
-            c_trtl.goto(-800,482.5)
-            c_trtl.write(self.player1.score.coins, False, "center", ("comic sans", 20, "normal"))
-            c_trtl.goto(800,482.5)
-            c_trtl.write(self.player2.score.coins, False, "center", ("comic sans", 20, "normal"))
+        self.hud["p1 coins"].set(self.player1.score.coins)
+        if self.player1.player_num == 2:
+            self.hud["p2 coins"].set(self.player2.score.coins)
 
 class Drawing:
     """
     Functions that initiate the drawing of various screens of the game
     """
-    def __init__(self, player1: Player, player2: Player, scr: turtle._Screen) -> None:
+    def __init__(self, player1: Player, player2: Player, scr: turtle._Screen, clock: SimClock, hud: Hud) -> None:
         self.player1 = player1
         self.player2 = player2
         self.scr = scr
         self.bg = Background()
-        self.game_start_time = time.now()
+        self.clock = clock      # game time, only runs while the race is being simulated
+        self.hud = hud          # text on the heads up display
 
     def reset(self) -> None:
         """
@@ -2049,10 +1698,9 @@ class Drawing:
         self.scr.bgcolor("black")
         for turtl in TURTLES:
             turtl.clear()
-        self.player1.turtle.clear()
-        self.player2.turtle.clear()
-        self.player1.turtle.hideturtle()
-        self.player2.turtle.hideturtle()
+        self.hud.clear()
+        self.player1.release()
+        self.player2.release()
 
     def menu(self) -> None:
         """
@@ -2079,6 +1727,7 @@ class Drawing:
         """
         d_trtl.clear()
         m_trtl.clear()
+        self.hud.clear()        # made again on top of the new track
         self.scr.bgcolor("#117c13")
         self.bg.race_track(self.player1, self.player2)
 
@@ -2086,7 +1735,7 @@ class Drawing:
         """
         draws the stats screen at the end of the game
         """
-        self.bg.stats_screen(self.player1, self.player2, self.game_start_time)
+        self.bg.stats_screen(self.player1, self.player2, self.clock.ns)
 
     def game_mode(self) -> None:
         """
@@ -2176,9 +1825,41 @@ class Drawing:
     def sprite_select(self) -> None:
         """
         select the sprite and colour for each player
+        the layout is played back from a display list after the first time, only the purchase labels and coins are written each time
         """
-        t = d_trtl
         self.reset()
+        params = (self.player1.player_num, self.player1.name, self.player2.name)
+        SCREENS.draw("sprite select", params, d_trtl, self._sprite_select)
+        if self.player1.player_num == 1:
+            # purchase button
+            m_trtl.pencolor("#212121")
+            m_trtl.goto(110,-130)
+            m_trtl.write("Purchased".upper(), False, "center", ("comic sans", 35, "bold"))
+            m_trtl.pencolor("white")
+            # coins
+            c_trtl.goto(800,-492.5)
+            c_trtl.write(self.player1.score.coins, False, "center", ("comic sans", 20, "normal"))
+        else:
+            # purchase buttons
+            m_trtl.pencolor("#212121")
+            m_trtl.goto(-155,-125)
+            m_trtl.write("Purchased".upper(), False, "center", ("comic sans", 30, "bold"))
+            m_trtl.pencolor("white")
+            p_trtl.pencolor("#212121")
+            p_trtl.goto(155,-125)
+            p_trtl.write("Purchased".upper(), False, "center", ("comic sans", 30, "bold"))
+            p_trtl.pencolor("white")
+            # coins
+            c_trtl.goto(-800,135)
+            c_trtl.write(self.player1.score.coins, False, "center", ("comic sans", 20, "normal"))
+            c_trtl.goto(800,135)
+            c_trtl.write(self.player2.score.coins, False, "center", ("comic sans", 20, "normal"))
+
+    def _sprite_select(self) -> None:
+        """
+        draws the layout of the sprite selection screen with the turtle
+        """
+        t = d_trtl
         t.pencolor("white")
         t.pu()
         # next button
@@ -2210,10 +1891,6 @@ class Drawing:
             # purchase button
             t.goto(110,-100)
             self.bg.rounded_rectangle(t, 100, 350, 10)
-            m_trtl.pencolor("#212121")
-            m_trtl.goto(110,-130)
-            m_trtl.write("Purchased".upper(), False, "center", ("comic sans", 35, "bold"))
-            m_trtl.pencolor("white")
             # coins
             t.width(2)
             t.goto(825,-475)
@@ -2224,8 +1901,6 @@ class Drawing:
             t.begin_fill()
             t.circle(10, 360)
             t.end_fill()
-            c_trtl.goto(800,-492.5)
-            c_trtl.write(self.player1.score.coins, False, "center", ("comic sans", 20, "normal"))
         else:
             t.goto(0,300)
             t.write("Select Vehicles and Colours", False, "center", ("comic sans", 70, "normal"))
@@ -2257,14 +1932,6 @@ class Drawing:
             self.bg.rounded_rectangle(t, 100, 300, 10)
             t.goto(-160,-100)
             self.bg.rounded_rectangle(t, 100, 300, 10)
-            m_trtl.pencolor("#212121")
-            m_trtl.goto(-155,-125)
-            m_trtl.write("Purchased".upper(), False, "center", ("comic sans", 30, "bold"))
-            m_trtl.pencolor("white")
-            p_trtl.pencolor("#212121")
-            p_trtl.goto(155,-125)
-            p_trtl.write("Purchased".upper(), False, "center", ("comic sans", 30, "bold"))
-            p_trtl.pencolor("white")
             # coins
             # p1
             t.width(2)
@@ -2276,8 +1943,6 @@ class Drawing:
             t.begin_fill()
             t.circle(10, 360)
             t.end_fill()
-            c_trtl.goto(-800,135)
-            c_trtl.write(self.player1.score.coins, False, "center", ("comic sans", 20, "normal"))
             # p2
             t.width(2)
             t.goto(825,150)
@@ -2288,8 +1953,6 @@ class Drawing:
             t.begin_fill()
             t.circle(10, 360)
             t.end_fill()
-            c_trtl.goto(800,135)
-            c_trtl.write(self.player2.score.coins, False, "center", ("comic sans", 20, "normal"))
 
     def coins(self) -> None:
         """
@@ -2344,9 +2007,53 @@ class Drawing:
 class Database:
     """
     Database class
+
+    The players' best times, coins and cars, kept in `db` while the game runs and saved to a store (see racing_game_database.py)
     """
-    def __init__(self) -> None:
+    PAGE_SIZE: int = 9  # leaderboard rows that fit on the screen
+
+    def __init__(self, engine: str = ENGINE, journal: bool = True, shared: bool = SHARED) -> None:
+        """
+        Parameters:
+            engine (str): how the database is stored, "sqlite" or "json". Defaults to `OMEGA_RACE_DATABASE` or "sqlite"
+            journal (bool): whether changes are written to the journal as they happen, or only when the game saves
+            shared (bool): whether other cabinets are using the same database. Defaults to `OMEGA_RACE_SHARED`
+        """
         self.db: dict = {}
+        self.engine = engine
+        self.use_journal = journal
+        self.shared = shared
+        self.store: JsonStore|SqliteStore|None = None   # opened on the first load
+        self.journal: Journal|None = None               # opened with the store
+        self.saved: dict[str, tuple] = {}               # each player as they were last loaded, saved or journaled, to find the ones that changed
+        self.page: int = 0                              # leaderboard page on screen
+        self.page_after: list[tuple[int, str]|None] = [None]   # (best_ms, name) of the player before each page fetched so far
+        self.page_rows: list[tuple[int, str]] = []      # (best_ms, name) of the players on the page on screen
+        self.category: tuple[str, int, str]|None = None # (track, laps, "lap" or "race") leaderboard on screen, None for the best lap of any race
+
+    def _open(self) -> None:
+        """
+        Opens the store and the journal if they aren't already, which replays any changes left from a crash.
+        """
+        if self.store is None:
+            self.store = open_store(self.engine, self.shared)
+            if self.use_journal:
+                self.journal = Journal(self.store)
+
+    def _changed(self, name: str) -> None:
+        """
+        Logs a player's entry in the journal after it has changed.
+        """
+        if self.journal is not None:
+            self.journal.record(name, self.db[name])
+            self.saved[name] = self._snapshot(self.db[name])
+
+    @staticmethod
+    def _snapshot(value: dict) -> tuple:
+        """
+        A copy of a player's entry to compare against later.
+        """
+        return (value["best"], value["coins"], tuple(value["cars"]), tuple((key, times["lap"], times["race"]) for key, times in sorted(value["bests"].items())))
 
     def load(self) -> dict:
         """
@@ -2355,27 +2062,62 @@ class Database:
         Returns:
         dict: the Database
         """
-        try:
-            with open("database.json", "r", encoding="utf-8") as dbfile:
-                self.db = json.load(dbfile)
-                return self.db
-        except FileNotFoundError:
-            with open("database.json", "w", encoding="utf-8") as dbfile:
-                json.dump({}, dbfile)
-            return {}
+        if self.store is not None:
+            self.save()                             # loaded before, changes still in the journal would be lost and then saved over
+        self._open()
+        self.db = self.store.load()
+        for value in self.db.values():
+            value.setdefault("bests", {})          # saved before there were categories
+        self.saved = {name: self._snapshot(value) for name, value in self.db.items()}
+        return self.db
 
     def save(self) -> None:
         """
-        saves the Database
+        saves the players that have changed since the last save
+        anything in the journal is compacted into the store first, so it doesn't overwrite this save later
         """
-        with open("database.json", "w", encoding="utf-8") as dbfile:
-            json.dump(self.db, dbfile)
+        self._open()
+        if self.journal is not None:
+            self.journal.sync()
+        changed = [name for name, value in self.db.items() if self.saved.get(name) != self._snapshot(value)]
+        if not changed:
+            return
+        self.store.save(self.db, changed)
+        for name in changed:
+            self.saved[name] = self._snapshot(self.db[name])
 
-    def create_player(self, player: Player, best: datetime.timedelta|None = None) -> None:
+    def close(self) -> None:
+        """
+        closes the journal and the store, call after the last save
+        """
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+        if self.store is not None:
+            self.store.close()
+            self.store = None
+
+    def refresh(self, player: Player) -> None:
+        """
+        reads a player again from a shared database, to pick up coins, cars and times from other cabinets
+        only that player is read, and nothing is done if the database isn't shared
+        """
+        if not self.shared:
+            return
+        self._open()
+        self.save()                                 # this cabinet's changes are saved first so they aren't lost
+        value = self.store.read(str(player.name))
+        if value is not None:
+            self.db[str(player.name)] = value
+            self.saved[str(player.name)] = self._snapshot(value)
+
+    def create_player(self, player: Player, best: int|None = None) -> None:
         """
         adds a player to the database if it is their first time playing
+        best is their best lap time in nanoseconds, if they have one
         """
-        self.db[str(player.name)] = {"best": str(best), "coins": 0, "cars": ["f1car"]}
+        self.db[str(player.name)] = {"best": best_text(best // 1_000_000) if best is not None else "None", "coins": 0, "cars": ["f1car"], "bests": {}}
+        self._changed(str(player.name))
 
     def check_exist(self, player: Player) -> bool:
         """
@@ -2386,87 +2128,151 @@ class Database:
         self.create_player(player)
         return False
 
-    def new_best(self, player: Player, best_time: datetime.timedelta) -> None:
+    def new_best(self, player: Player, best_time: int, race_time: int|None = None, track: str|None = None) -> None:
         """
-        adds a new best time for a player into the Database
+        adds a new best time (in nanoseconds, saved to the millisecond) for a player into the Database
+        along with the best lap and race time for this track and number of laps
+        race_time is the time to finish every lap, if the player finished the race
+        track is the name of the track, the main race track if not given
         """
+        track = TRACK.name if track is None else track
         if self.check_exist(player):
-            prev_time = pd.to_timedelta(self.db[str(player.name)]["best"] if self.db[str(player.name)]["best"] != "None" else "9:99:99")
-            best_time = best_time if best_time < pd.to_timedelta(prev_time) else prev_time  # check if the new time is a new best
-            self.db[str(player.name)]["best"] = str(best_time)                              # update the db with a new best time
+            prev = best_ms(self.db[str(player.name)]["best"])
+            if prev is None or best_time // 1_000_000 < prev:                               # check if the new time is a new best
+                self.db[str(player.name)]["best"] = best_text(best_time // 1_000_000)       # update the db with a new best time
             self.db[str(player.name)]["coins"] = player.score.coins                         # update the amount of coins
         else:
             self.create_player(player, best_time)
+        bests = self.db[str(player.name)]["bests"].setdefault(category_key(track, player.score.total_laps), {"lap": None, "race": None})
+        for kind, taken in (("lap", best_time), ("race", race_time)):
+            if taken is not None and (bests[kind] is None or taken // 1_000_000 < bests[kind]):     # check if it is a new best for this category
+                bests[kind] = taken // 1_000_000
+        self._changed(str(player.name))
 
-    def get_sorted(self) -> dict:
+    def set_coins(self, name: str, coins: int) -> None:
         """
-        returns a sorted decending version of the Database
+        updates the number of coins a player has, e.g. after collecting one or buying a car
         """
-        time_db = {}
-        for player, value in self.db.items():                                           # get just the times, not the coins or cars
-            time_db[player] = value["best"]
-        sorted_db = dict(sorted(time_db.items(), key=lambda a: a[1], reverse=False))    # sort the times in descending order
-        return sorted_db
+        if name in self.db and self.db[name]["coins"] != coins:
+            self.db[name]["coins"] = coins
+            self._changed(name)
 
     def draw(self) -> None:
         """
-        draws the leaderboard in the leaderboard menu option
+        draws the first page of the leaderboard in the leaderboard menu option
+        """
+        if self.journal is not None:
+            self.journal.sync()                                                         # the store ranks what has been written to it, so wait for the journal to catch up
+        else:
+            self.save()                                                                 # without a journal changes only get to the store when they are saved
+        self.page = 0
+        self.page_after = [None]
+        self.page_rows = self.store.page(None, self.PAGE_SIZE, self.category)
+        self.draw_page()
+
+    def categories(self) -> list[tuple[str, int, str]|None]:
+        """
+        every leaderboard there is, the best lap of any race first then the best lap and race time for each track and number of laps
+        """
+        return [None] + [(track, laps, kind) for track, laps in self.store.categories() for kind in KINDS]
+
+    def next_category(self) -> None:
+        """
+        switches the leaderboard to the next category and draws its first page, only that category's index is read
+        """
+        categories = self.categories()
+        self.category = categories[(categories.index(self.category) + 1) % len(categories)] if self.category in categories else None
+        self.draw()
+
+    def scroll(self, step: int) -> bool:
+        """
+        moves the leaderboard a page up (-1) or down (1), only fetching the page it moves to
+
+        Returns:
+            bool: whether there was a page to move to
+        """
+        page = self.page + step
+        if page < 0 or not self.page_rows:
+            return False
+        if page == len(self.page_after):                                                # first time on this page, it starts after the last player on this one
+            if len(self.page_rows) < self.PAGE_SIZE:                                    # this is the last page
+                return False
+            self.page_after.append(self.page_rows[-1])
+        rows = self.store.page(self.page_after[page], self.PAGE_SIZE, self.category)
+        if not rows:
+            return False
+        self.page, self.page_rows = page, rows
+        self.draw_page()
+        return True
+
+    def draw_page(self) -> None:
+        """
+        draws the current page of the leaderboard, only the players on it are written
         """
         t = d_trtl
+        t.clear()
         t.pu()
         t.goto(0,350)
         t.write("Leaderboard".upper(), False, "center", ("comic sans", 100, "bold"))
-        pos = 0
-        for player, best in self.get_sorted().items():
-            if best != "None":
-                pos += 1
-                best = best[7:-3] # cut off the days (first 7 chars) and microseconds (last 3 chars)
-                t.goto(0, t.ycor()-100)
-                y = t.ycor()
-                match pos:
-                    case 1:             # first
-                        t.goto(0,y+40)
-                        Background().rounded_rectangle(t, 100, 1200, 10, "gold", "gold")
-                        t.goto(-575, y)
-                        t.write("🥇", False, "left", ("comic sans", 50, "normal"))
-                        t.goto(-450, y)
-                        t.write(f"{pos}:", False, "left", ("comic sans", 50, "bold"))
-                        t.goto(-375, y)
-                        t.write(f"{player}", False, "left", ("comic sans", 50, "bold"))
-                        t.goto(550, y)
-                        t.write(f"{best}", False, "right", ("comic sans", 50, "normal"))
-                        t.goto(0, y-10)
-                    case 2:             # second
-                        t.goto(0,y+40)
-                        Background().rounded_rectangle(t, 100, 1200, 10, "silver", "silver")
-                        t.goto(-575, y)
-                        t.write("", False, "left", ("comic sans", 50, "normal"))
-                        t.goto(-450, y)
-                        t.write(f"{pos}:", False, "left", ("comic sans", 50, "normal"))
-                        t.goto(-375, y)
-                        t.write(f"{player}", False, "left", ("comic sans", 50, "normal"))
-                        t.goto(550, y)
-                        t.write(f"{best}", False, "right", ("comic sans", 50, "normal"))
-                        t.goto(0, y-10)
-                    case 3:             # third
-                        t.goto(0,y+40)
-                        Background().rounded_rectangle(t, 100, 1200, 10, "#6E4D25", "#6E4D25")
-                        t.goto(-450, y)
-                        t.write(f"{pos}:", False, "left", ("comic sans", 50, "normal"))
-                        t.goto(-375, y)
-                        t.write(f"{player}", False, "left", ("comic sans", 50, "normal"))
-                        t.goto(550, y)
-                        t.write(f"{best}", False, "right", ("comic sans", 50, "normal"))
-                        t.goto(0, y+15)
-                    case _:             # rest
-                        if t.ycor() > -500:
-                            t.goto(-450, y-10)
-                            t.write(f"{pos}:", False, "left", ("comic sans", 50, "normal"))
-                            t.goto(-375, y)
-                            t.write(f"{player}", False, "left", ("comic sans", 30, "normal"))
-                            t.goto(550, y-10)
-                            t.write(f"{best}", False, "right", ("comic sans", 50, "normal"))
-                            t.goto(0, y+25)
+        t.goto(0, 320)
+        if self.category is None:
+            t.write("best lap of any race", False, "center", ("comic sans", 20, "normal"))
+        else:
+            track, laps, kind = self.category
+            t.write(f"best {kind} - {track}, {laps} lap{'s' if laps != 1 else ''}", False, "center", ("comic sans", 20, "normal"))
+        t.goto(0, 350)
+        pos = self.page * self.PAGE_SIZE
+        for ms, player in self.page_rows:
+            pos += 1
+            best = best_text(ms)[7:-3] # cut off the days (first 7 chars) and microseconds (last 3 chars)
+            t.goto(0, t.ycor()-100)
+            y = t.ycor()
+            match pos:
+                case 1:             # first
+                    t.goto(0,y+40)
+                    Background().rounded_rectangle(t, 100, 1200, 10, "gold", "gold")
+                    t.goto(-575, y)
+                    t.write("🥇", False, "left", ("comic sans", 50, "normal"))
+                    t.goto(-450, y)
+                    t.write(f"{pos}:", False, "left", ("comic sans", 50, "bold"))
+                    t.goto(-375, y)
+                    t.write(f"{player}", False, "left", ("comic sans", 50, "bold"))
+                    t.goto(550, y)
+                    t.write(f"{best}", False, "right", ("comic sans", 50, "normal"))
+                    t.goto(0, y-10)
+                case 2:             # second
+                    t.goto(0,y+40)
+                    Background().rounded_rectangle(t, 100, 1200, 10, "silver", "silver")
+                    t.goto(-575, y)
+                    t.write("", False, "left", ("comic sans", 50, "normal"))
+                    t.goto(-450, y)
+                    t.write(f"{pos}:", False, "left", ("comic sans", 50, "normal"))
+                    t.goto(-375, y)
+                    t.write(f"{player}", False, "left", ("comic sans", 50, "normal"))
+                    t.goto(550, y)
+                    t.write(f"{best}", False, "right", ("comic sans", 50, "normal"))
+                    t.goto(0, y-10)
+                case 3:             # third
+                    t.goto(0,y+40)
+                    Background().rounded_rectangle(t, 100, 1200, 10, "#6E4D25", "#6E4D25")
+                    t.goto(-450, y)
+                    t.write(f"{pos}:", False, "left", ("comic sans", 50, "normal"))
+                    t.goto(-375, y)
+                    t.write(f"{player}", False, "left", ("comic sans", 50, "normal"))
+                    t.goto(550, y)
+                    t.write(f"{best}", False, "right", ("comic sans", 50, "normal"))
+                    t.goto(0, y+15)
+                case _:             # rest
+                    t.goto(-450, y-10)
+                    t.write(f"{pos}:", False, "left", ("comic sans", 50, "normal"))
+                    t.goto(-375, y)
+                    t.write(f"{player}", False, "left", ("comic sans", 30, "normal"))
+                    t.goto(550, y-10)
+                    t.write(f"{best}", False, "right", ("comic sans", 50, "normal"))
+                    t.goto(0, y+25)
+        if self.page_rows:
+            t.goto(0, -500)
+            t.write(f"page {self.page + 1}  -  page up / page down to scroll, tab to change leaderboard", False, "center", ("comic sans", 20, "normal"))
 
     def purchase_car(self, player: Player, car: str) -> None:
         """
@@ -2474,7 +2280,10 @@ class Database:
         
         assume car is a valid car
         """
-        self.db[player.name]["cars"].append(car)
+        if car not in self.db[player.name]["cars"]:
+            self.db[player.name]["cars"].append(car)
+        self.db[player.name]["coins"] = player.score.coins     # what they have left after paying for it
+        self._changed(player.name)
 
 @dataclasses.dataclass
 class _Sub:
@@ -2496,11 +2305,14 @@ class Util:
         self.player2: Player = player2
         self.scr: turtle._Screen = scr
         # variables
-        self.game_start_time: time = time.now()                                     # time the game started
+        self.clock: SimClock = SimClock()                                           # game time, moved on by the game loop every physics tick
+        self.hud: Hud = Hud()                                                       # text on the heads up display, shared by the drawing and updating classes
         self.game_state: str = "not started"                                        # current "state" or "screen" of the game
         self.num_of_players: int = 2                                                # number of players in the game (either 1 or 2)
-        self.coin_frames: int = 0                                                   # amount of frames since the coins were spawned
-        self.coin_list: list[Coin] = [Coin((100*i)-400,-200) for i in range(9)]     # list of coin objects to draw on screen
+        self.coin_time: float = 0                                                   # amount of simulated time (seconds) since the coins were spawned
+        self.coin_list: list[Coin] = [Coin(x, y) for x, y in TRACK.coins]           # list of coin objects to draw on screen
+        player1.clock = self.clock                                                  # ----------
+        player2.clock = self.clock                                                  # both players time their laps on the game clock
         self.cars: dict[str, int] = {"f1car": 0, "ute": 500}#, "": 1000}            # list of vehicle options and their cost
         # index 0 is for player 1, index 1 is for player 2
         self.can_move_next: list[bool] = [True, True]                               # whether the player can move to the next setup screen
@@ -2510,8 +2322,8 @@ class Util:
         self.sub: _Sub = _Sub(
                             bg=Background(),
                             data=Database(),
-                            draw=Drawing(player1, player2, scr),
-                            update=Updates(player1, player2, self.cars)
+                            draw=Drawing(player1, player2, scr, self.clock, self.hud),
+                            update=Updates(player1, player2, self.cars, self.clock, self.hud)
                             )
         # self.bg: Background = Background()
         # self.db: Database = Database()
@@ -2554,11 +2366,10 @@ class Util:
         """
         self.sub.draw.reset()           # black screen with no visible turtles
         for coin in self.coin_list:     # clear the coins
-            coin.turtle.clear()
+            coin.release()
         for player in [wp, nwp]:        # check if the player has a new best lap time
             if player.timer.laps:
-                best = pd.to_timedelta(player.best_lap())
-                self.sub.data.new_best(player, best)
+                self.sub.data.new_best(player, min(player.timer.laps), sum(player.timer.laps) if player.score.won else None)
         self.sub.bg.win_screen(wp, nwp, self.sub.data.db) # draw the win screen
 
     def _end_game(self) -> None:
@@ -2612,6 +2423,8 @@ class Util:
         - "Shift + q" and "Delete" key for quitting the game
         - "r" key for restarting the game
         - Left mouse button click for button functionality
+        - "Page Up" and "Page Down" keys for scrolling the leaderboard
+        - "Tab" key for changing the leaderboard between categories
 
         Shhhhhhhhhhh:
         - "Shift + c" to cheat in money
@@ -2660,8 +2473,42 @@ class Util:
         self.scr.onkey(self.restart, "r")
         self.scr.onkey(self.back_menu, "b")
 
+        self.scr.onkey(self.page_up, "Prior")
+        self.scr.onkey(self.page_down, "Next")
+        self.scr.onkey(self.next_leaderboard, "Tab")
+
         self.scr.onkey(self.cheat, "C")
 
+    def page_up(self) -> None:
+        """
+        Scrolls the leaderboard up a page, if it is open.
+
+        Returns:
+            None
+        """
+        if self.game_state == "leaderboard":
+            self.sub.data.scroll(-1)
+
+    def page_down(self) -> None:
+        """
+        Scrolls the leaderboard down a page, if it is open. The next page is only fetched now.
+
+        Returns:
+            None
+        """
+        if self.game_state == "leaderboard":
+            self.sub.data.scroll(1)
+
+    def next_leaderboard(self) -> None:
+        """
+        Switches the leaderboard to the next category (track, number of laps and lap or race time), if it is open.
+
+        Returns:
+            None
+        """
+        if self.game_state == "leaderboard":
+            self.sub.data.next_category()
+
     def enter(self) -> None:
         """
         Process the enter key press and perform the corresponding action based on the current game state.
@@ -2797,7 +2644,7 @@ class Util:
             if -50 <= y <= 50:
                 if -250 <= x <= 250:
                     # choose player 1 name
-                    name = turtle.textinput("Player ONE", "Enter your player name")
+                    name = self.scr.textinput("Player ONE", "Enter your player name")
                     self.player1.name = name if ((name is not None) and (0 < len(name) <= 10)) else self.player1.name
                     self.scr.listen()
                     self.load_player_data()
@@ -2805,13 +2652,13 @@ class Util:
             if -50 <= y <= 50:
                 if -550 <= x <= -50:
                     # choose player 1 name
-                    name = turtle.textinput("Player ONE", "Enter your player name")
+                    name = self.scr.textinput("Player ONE", "Enter your player name")
                     self.player1.name = name if ((name is not None) and (name != self.player2.name) and (0 < len(name) <= 10)) else self.player1.name
                     self.scr.listen()
                     self.load_player_data()
                 elif 50 <= x <= 550:
                     # choose player 2 name
-                    name = turtle.textinput("Player TWO", "Enter your player name")
+                    name = self.scr.textinput("Player TWO", "Enter your player name")
                     self.player2.name = name if ((name is not None) and (name != self.player1.name) and (0 < len(name) <= 10)) else self.player2.name
                     self.scr.listen()
                     self.load_player_data()
@@ -2934,6 +2781,8 @@ class Util:
         """
         Loads all the coins and cars for the player
         """
+        self.sub.data.refresh(self.player1)         # other cabinets may have changed them
+        self.sub.data.refresh(self.player2)
         self.sub.data.check_exist(self.player1)
         self.sub.data.check_exist(self.player2)
         self.player1.score.coins = self.sub.data.db[self.player1.name]["coins"]
@@ -3022,7 +2871,7 @@ class Util:
             if player.score.coins > cost:                                   # must have enough coins to purchase the car
                 player.score.coins -= cost
                 self.sub.update.purchase_button("purchased", player)
-                self.sub.data.db[player.name]["cars"].append(player.attr.sprite)
+                self.sub.data.purchase_car(player, player.attr.sprite)
                 self.can_move_next[player.num-1] = True
 
     def change_name(self, player: Player) -> None:
@@ -3089,22 +2938,21 @@ class Util:
         for coin in self.coin_list:
             coin.show()
 
-    def coins(self) -> None:
+    def coins(self, dt: float = REFERENCE_DT) -> None:
         """
         Attempts to spawn coins on the screen for the players to collect
-        will only spawn coins if more than 500 frames have passed since the last coin was spawned
+        will only spawn coins if more than `COIN_RESPAWN` (750 reference frames, 12.5 seconds) of game time have passed since the last coin was spawned
         
         Parameters:
-            None
+            dt (float): length of the simulation tick in seconds. Defaults to `REFERENCE_DT`
 
         Returns:
             None
         """
-        if self.coin_frames > 750 and not any(coin.active for coin in self.coin_list):
-            self.coin_frames = 0
+        if self.coin_time > COIN_RESPAWN and not any(coin.active for coin in self.coin_list):
+            self.coin_time = 0
             self.spawn_coins()
-        self.coin_frames += 1
-        self.update_coins()
+        self.coin_time += dt
         self.check_coin_collection()
 
     def update_coins(self) -> None:
@@ -3128,9 +2976,11 @@ class Util:
             if coin.active:
                 if self.player1.check_collision(coin):
                     self.player1.collect_coin(coin)
+                    self.sub.data.set_coins(self.player1.name, self.player1.score.coins)
                     self.sub.update.coins()
                 if self.player2.check_collision(coin):
                     self.player2.collect_coin(coin)
+                    self.sub.data.set_coins(self.player2.name, self.player2.score.coins)
                     self.sub.update.coins()
 
     def setup_turtles(self) -> None:
@@ -3142,18 +2992,14 @@ class Util:
             t.pu()
             t.clear()
         c_trtl.pencolor("white")
-        s_trtl.pencolor("white")
-        t_trtl.pencolor("white")
-        ll_trtl.pencolor("white")
-        lr_trtl.pencolor("white")
 
     def cheat(self) -> None:
         """Shhhhhhhhhhhhhhhh"""
-        player_name = turtle.textinput("Cheat", "Enter your player name")
-        amount = turtle.numinput("Cheat", "Enter the amount of coins to add")
+        player_name = self.scr.textinput("Cheat", "Enter your player name")
+        amount = self.scr.numinput("Cheat", "Enter the amount of coins to add")
         amount = int(amount) if amount is not None else 0
-        self.sub.data.db[player_name]["coins"] += amount
-        self.sub.data.save()
+        if player_name in self.sub.data.db:     # the dialog was cancelled or the player doesn't exist
+            self.sub.data.set_coins(player_name, self.sub.data.db[player_name]["coins"] + amount)
         self.scr.listen()
 
     def restart(self) -> None:
@@ -3169,7 +3015,9 @@ class Util:
         self.game_state = "start"
         self.player1.reset()
         self.player2.reset()
-        self.game_start_time = time.now()
+        for coin in self.coin_list:
+            coin.release()
+        self.clock.reset()
 
 if __name__ == "__main__":
     raise WrongFileError("YOU RAN THE WRONG FILE AGAIN 🤦")
@@ -1,35 +1,564 @@
 """
 Henry Spink, 2/5/24
 Constant and Variables file for game for applied computing 1/2
+
+The screen and turtles are only made the first time they are used, so importing the game's classes
+(for tools, tests or the batch races) doesn't open a window. Set `OMEGA_RACE_GRAPHICS=null`, or call
+`set_backend("null")` before anything is drawn, to swap them for stand-ins that draw nothing (`NullScreen` and `NullTurtle`).
+The stand-ins keep their state like the real ones (where the turtle is, which way it faces, its pen, the canvas items, the shapes),
+so anything the game reads back from them is a real answer. Something the game uses that they don't have is an AttributeError.
 """
 # imports
+import os
+import math
 import turtle
+import _tkinter
+from typing import Callable
+
+# classes
+class NullCanvas:
+    """
+    Stand in for the Tk canvas when there is nothing to draw on.
+    It keeps the items made on it (their type, coordinates and options) but never shows them
+    """
+    _w: str = ".null"                   # Tk's name for the canvas
+
+    def __init__(self) -> None:
+        self.items: dict[int, dict] = {}    # {id: {"type": str, "coords": list[float], "options": dict}} of every item on the canvas
+        self.last_id: int = 0               # id of the newest item, ids are never reused like in Tk
+
+    def new_id(self) -> int:
+        """a fresh item id, also used by the turtles for the stamps and lines they don't really draw"""
+        self.last_id += 1
+        return self.last_id
+
+    def _create(self, kind: str, coords, options: dict) -> int:
+        """adds an item to the canvas"""
+        item = self.new_id()
+        self.items[item] = {"type": kind, "coords": [float(value) for value in coords], "options": dict(options)}
+        return item
+
+    def create_line(self, coords, **options) -> int:
+        """makes a line item"""
+        return self._create("line", coords, options)
+
+    def create_polygon(self, coords, **options) -> int:
+        """makes a polygon item"""
+        return self._create("polygon", coords, options)
+
+    def create_text(self, coords, **options) -> int:
+        """makes a text item"""
+        return self._create("text", coords, options)
+
+    def _find(self, tag_or_id) -> list[int]:
+        """the items with an id or tag, like Tk's tagOrId"""
+        if tag_or_id in self.items:
+            return [tag_or_id]
+        if tag_or_id == "all":
+            return list(self.items)
+        return [item for item, value in self.items.items() if tag_or_id in str(value["options"].get("tags", "")).split()]
+
+    def type(self, tag_or_id) -> str|None:
+        """type of the first item with the id or tag, None if there isn't one"""
+        found = self._find(tag_or_id)
+        return self.items[found[0]]["type"] if found else None
+
+    def coords(self, tag_or_id, *coords) -> list[float]:
+        """gets (or sets, if they are given) the coordinates of an item"""
+        found = self._find(tag_or_id)
+        if coords:
+            flat = coords[0] if len(coords) == 1 else coords
+            for item in found:
+                self.items[item]["coords"] = [float(value) for value in flat]
+        return list(self.items[found[0]]["coords"]) if found else []
+
+    def itemconfigure(self, tag_or_id, **options) -> dict|None:
+        """sets options of the items, or with no options gets them as Tk does: {name: (name, "", "", default, value)}"""
+        found = self._find(tag_or_id)
+        if not options:
+            return {name: (name, "", "", "", value) for name, value in self.items[found[0]]["options"].items()} if found else {}
+        for item in found:
+            self.items[item]["options"].update(options)
+        return None
+
+    itemconfig = itemconfigure
+
+    def delete(self, *tags_or_ids) -> None:
+        """deletes the items"""
+        for tag_or_id in tags_or_ids:
+            for item in self._find(tag_or_id):
+                del self.items[item]
+
+    def tag_raise(self, tag_or_id, above=None) -> None:
+        """would put the items on top, the null canvas doesn't keep an order"""
+
+    def find_all(self) -> tuple[int, ...]:
+        """ids of every item on the canvas"""
+        return tuple(self.items)
+
+class NullScreen:
+    """
+    Stand in for the turtle screen when there is nothing to draw on.
+    It has a `NullCanvas`, remembers its size, colours, registered shapes and key bindings, and never opens a window
+    """
+    xscale: float = 1.0
+    yscale: float = 1.0
+
+    def __init__(self, width: int = 1920, height: int = 1080) -> None:
+        """
+        Parameters:
+            width (int): width of the window in pixels. Defaults to 1920
+            height (int): height of the window in pixels. Defaults to 1080
+        """
+        self.cv = NullCanvas()
+        self.width = width
+        self.height = height
+        self.background: str = "white"
+        self.window_title: str = ""
+        self.delay_value: int = 10
+        self.tracer_value: int = 1
+        self.bindings: dict[tuple[str, object], Callable|None] = {}    # {(event, key or button): function}
+        circle = tuple((round(10 * math.cos(math.radians(angle)), 2), round(10 * math.sin(math.radians(angle)), 2)) for angle in range(0, 360, 18))
+        self._shapes: dict[str, turtle.Shape] = {   # turtle's own shapes, as `TurtleScreen` has them
+            "arrow": turtle.Shape("polygon", ((-10, 0), (10, 0), (0, 10))),
+            "turtle": turtle.Shape("polygon", ((0, 16), (-2, 14), (-1, 10), (-4, 7), (-7, 9), (-9, 8), (-6, 5), (-7, 1), (-5, -3), (-8, -6), (-6, -8), (-4, -5),
+                                               (0, -7), (4, -5), (6, -8), (8, -6), (5, -3), (7, 1), (6, 5), (9, 8), (7, 9), (4, 7), (1, 10), (2, 14))),
+            "circle": turtle.Shape("polygon", circle),
+            "square": turtle.Shape("polygon", ((10, -10), (10, 10), (-10, 10), (-10, -10))),
+            "triangle": turtle.Shape("polygon", ((10, -5.77), (0, 11.55), (-10, -5.77))),
+            "classic": turtle.Shape("polygon", ((0, 0), (-5, -9), (0, -7), (5, -9))),
+            "blank": turtle.Shape("compound"),
+        }
+
+    def setup(self, width: int = 1920, height: int = 1080, startx=None, starty=None) -> None:     # pylint: disable=unused-argument
+        """sets the size of the window"""
+        self.width, self.height = width, height
+
+    def window_width(self) -> int:
+        """width of the game window"""
+        return self.width
+
+    def window_height(self) -> int:
+        """height of the game window"""
+        return self.height
+
+    def getcanvas(self) -> NullCanvas:
+        """the canvas"""
+        return self.cv
+
+    def reset(self) -> None:
+        """would reset every turtle on the screen, the null turtles aren't tracked by the screen"""
+
+    def update(self) -> None:
+        """would redraw the window"""
+
+    def listen(self, xdummy=None, ydummy=None) -> None:
+        """would give the window the keyboard focus"""
+
+    def delay(self, delay: int|None = None) -> int|None:
+        """gets or sets the drawing delay in milliseconds"""
+        if delay is None:
+            return self.delay_value
+        self.delay_value = delay
+        return None
+
+    def tracer(self, n: int|None = None, delay: int|None = None) -> int|None:
+        """gets or sets how often the screen is redrawn"""
+        if n is None:
+            return self.tracer_value
+        self.tracer_value = n
+        if delay is not None:
+            self.delay_value = delay
+        return None
+
+    def title(self, titlestring: str) -> None:
+        """sets the title of the window"""
+        self.window_title = titlestring
+
+    def bgcolor(self, *args) -> str|None:
+        """gets or sets the background colour"""
+        if not args:
+            return self.background
+        self.background = self._colorstr(args)
+        return None
+
+    def _colorstr(self, color) -> str:
+        """a colour as a string Tk understands, (r, g, b) tuples are from 0 to 1 like turtle's default colour mode"""
+        if len(color) == 1:
+            color = color[0]
+        if isinstance(color, str):
+            return color
+        r, g, b = (round(255.0 * value) for value in color)
+        return f"#{r:02x}{g:02x}{b:02x}"
+
+    def register_shape(self, name: str, shape=None) -> None:
+        """adds a shape, a `turtle.Shape` or a tuple of points for a polygon"""
+        self._shapes[name] = shape if isinstance(shape, turtle.Shape) else turtle.Shape("polygon", tuple(shape or ()))
+
+    addshape = register_shape
+
+    def onclick(self, fun: Callable|None, btn: int = 1, add=None) -> None:     # pylint: disable=unused-argument
+        """binds a function to a mouse click"""
+        self.bindings[("click", btn)] = fun
+
+    def onkey(self, fun: Callable|None, key: str) -> None:
+        """binds a function to a key being let go"""
+        self.bindings[("release", key)] = fun
+
+    onkeyrelease = onkey
+
+    def onkeypress(self, fun: Callable|None, key: str|None = None) -> None:
+        """binds a function to a key being pressed"""
+        self.bindings[("press", key)] = fun
+
+    def textinput(self, title: str, prompt: str) -> None:     # pylint: disable=unused-argument
+        """nobody can type into the null screen, so it is the same as cancelling the dialog"""
+
+    def numinput(self, title: str, prompt: str, default=None, minval=None, maxval=None) -> None:     # pylint: disable=unused-argument
+        """nobody can type into the null screen, so it is the same as cancelling the dialog"""
+
+class NullTurtle:
+    """
+    Stand in for a turtle when there is nothing to draw on.
+    It moves, turns and keeps its pen like a turtle in turtle's "standard" mode, but doesn't put anything on the canvas
+    """
+    def __init__(self, screen: NullScreen) -> None:
+        """
+        Parameters:
+            screen (NullScreen): the screen the turtle is on
+        """
+        self.screen = screen
+        self.x: float = 0.0
+        self.y: float = 0.0
+        self.angle: float = 0.0             # heading in degrees, 0 is east and it goes anticlockwise
+        self.shape_name: str = "classic"
+        self.fill_started: bool = False
+        self.items: list = []               # what the turtle has drawn, turtle's own name for it
+        self.stampItems: list = []          # pylint: disable=invalid-name   # ids of its stamps, turtle's own name for it
+        self.currentLineItem: int = screen.cv.new_id()  # pylint: disable=invalid-name   # the line it is drawing, turtle's own name for it
+        self._pen: dict = {"shown": True, "pendown": True, "pencolor": "black", "fillcolor": "black", "pensize": 1, "speed": 3,
+                           "resizemode": "noresize", "stretchfactor": (1.0, 1.0), "shearfactor": 0.0, "outline": 1, "tilt": 0.0}
+
+    # moving
+    def position(self) -> turtle.Vec2D:
+        """position of the turtle"""
+        return turtle.Vec2D(self.x, self.y)
+
+    pos = position
+
+    def xcor(self) -> float:
+        """x coordinate of the turtle"""
+        return self.x
+
+    def ycor(self) -> float:
+        """y coordinate of the turtle"""
+        return self.y
+
+    def heading(self) -> float:
+        """heading of the turtle in degrees"""
+        return self.angle % 360
+
+    def goto(self, x, y: float|None = None) -> None:
+        """moves the turtle to a point, given as x and y or as one (x, y) pair"""
+        if y is None:
+            x, y = x
+        self.x, self.y = float(x), float(y)
+
+    setpos = setposition = goto
+
+    def setx(self, x: float) -> None:
+        """moves the turtle across"""
+        self.x = float(x)
+
+    def sety(self, y: float) -> None:
+        """moves the turtle up or down"""
+        self.y = float(y)
+
+    def forward(self, distance: float) -> None:
+        """moves the turtle the way it is facing"""
+        self.x += distance * math.cos(math.radians(self.angle))
+        self.y += distance * math.sin(math.radians(self.angle))
+
+    fd = forward
+
+    def backward(self, distance: float) -> None:
+        """moves the turtle the opposite way to the way it is facing"""
+        self.forward(-distance)
+
+    bk = back = backward
+
+    def setheading(self, to_angle: float) -> None:
+        """points the turtle a direction in degrees"""
+        self.angle = float(to_angle)
+
+    seth = setheading
+
+    def left(self, angle: float) -> None:
+        """turns the turtle anticlockwise"""
+        self.angle += angle
+
+    lt = left
+
+    def right(self, angle: float) -> None:
+        """turns the turtle clockwise"""
+        self.angle -= angle
+
+    rt = right
+
+    def circle(self, radius: float, extent: float|None = None, steps: int|None = None) -> None:
+        """moves the turtle along an arc, in the same steps as turtle so it ends up in the same place"""
+        if extent is None:
+            extent = 360
+        if steps is None:
+            steps = 1 + int(min(11 + abs(radius) / 6.0, 59.0) * abs(extent) / 360)
+        turn = extent / steps
+        length = 2.0 * radius * math.sin(math.radians(turn / 2))
+        if radius < 0:
+            length, turn = -length, -turn
+        self.left(turn / 2)
+        for _ in range(steps):
+            self.forward(length)
+            self.left(turn)
+        self.left(-turn / 2)
+
+    # pen
+    def pen(self, pen: dict|None = None, **pendict) -> dict|None:
+        """gets the pen's settings, or changes them"""
+        if pen is None and not pendict:
+            return dict(self._pen)
+        self._pen.update(pen or {}, **pendict)
+        return None
+
+    def pendown(self) -> None:
+        """puts the pen down"""
+        self._pen["pendown"] = True
+
+    pd = down = pendown
+
+    def penup(self) -> None:
+        """lifts the pen up"""
+        self._pen["pendown"] = False
+
+    pu = up = penup
+
+    def isdown(self) -> bool:
+        """whether the pen is down"""
+        return self._pen["pendown"]
+
+    def pensize(self, width: float|None = None) -> float|None:
+        """gets or sets the width of the pen"""
+        if width is None:
+            return self._pen["pensize"]
+        self._pen["pensize"] = width
+        return None
+
+    width = pensize
+
+    def speed(self, speed: int|None = None) -> int|None:
+        """gets or sets how fast the turtle would draw"""
+        if speed is None:
+            return self._pen["speed"]
+        self._pen["speed"] = speed
+        return None
+
+    def pencolor(self, *args) -> str|None:
+        """gets or sets the pen colour"""
+        if not args:
+            return self._pen["pencolor"]
+        self._pen["pencolor"] = self.screen._colorstr(args)     # pylint: disable=protected-access
+        return None
+
+    def fillcolor(self, *args) -> str|None:
+        """gets or sets the fill colour"""
+        if not args:
+            return self._pen["fillcolor"]
+        self._pen["fillcolor"] = self.screen._colorstr(args)    # pylint: disable=protected-access
+        return None
+
+    def color(self, *args) -> tuple[str, str]|None:
+        """gets both colours, sets both to one colour, or sets the pen then the fill colour"""
+        if not args:
+            return self._pen["pencolor"], self._pen["fillcolor"]
+        if len(args) == 2:
+            self.pencolor(args[0])
+            self.fillcolor(args[1])
+        else:
+            self.pencolor(*args)
+            self.fillcolor(*args)
+        return None
+
+    def begin_fill(self) -> None:
+        """starts a filled shape"""
+        self.fill_started = True
+
+    def end_fill(self) -> None:
+        """finishes a filled shape"""
+        self.fill_started = False
+
+    def filling(self) -> bool:
+        """whether a filled shape has been started"""
+        return self.fill_started
+
+    # turtle shape
+    def showturtle(self) -> None:
+        """shows the turtle"""
+        self._pen["shown"] = True
+
+    st = showturtle
+
+    def hideturtle(self) -> None:
+        """hides the turtle"""
+        self._pen["shown"] = False
+
+    ht = hideturtle
+
+    def isvisible(self) -> bool:
+        """whether the turtle is showing"""
+        return self._pen["shown"]
+
+    def shape(self, name: str|None = None) -> str|None:
+        """gets or sets the turtle's shape, it has to be registered on the screen"""
+        if name is None:
+            return self.shape_name
+        if name not in self.screen._shapes:     # pylint: disable=protected-access
+            raise turtle.TurtleGraphicsError(f"There is no shape named {name}")
+        self.shape_name = name
+        return None
+
+    def shapesize(self, stretch_wid: float|None = None, stretch_len: float|None = None, outline: float|None = None) -> tuple|None:
+        """gets or sets how much the turtle's shape is stretched"""
+        if stretch_wid is None and stretch_len is None and outline is None:
+            return (*self._pen["stretchfactor"], self._pen["outline"])
+        if stretch_wid is not None:
+            self._pen["stretchfactor"] = (stretch_wid, stretch_len if stretch_len is not None else stretch_wid)
+            self._pen["resizemode"] = "user"
+        if outline is not None:
+            self._pen["outline"] = outline
+        return None
+
+    turtlesize = shapesize
+
+    # drawing
+    def stamp(self) -> int:
+        """would stamp the turtle's shape, gives back an id that `clearstamp()` takes"""
+        item = self.screen.cv.new_id()
+        self.stampItems.append(item)
+        return item
+
+    def clearstamp(self, stampid: int) -> None:
+        """forgets a stamp"""
+        if stampid in self.stampItems:
+            self.stampItems.remove(stampid)
+
+    def write(self, arg, move: bool = False, align: str = "left", font: tuple = ("Arial", 8, "normal")) -> None:     # pylint: disable=unused-argument
+        """would write text where the turtle is"""
+
+    def dot(self, size: int|None = None, *color) -> None:
+        """would draw a dot where the turtle is"""
+
+    def _newLine(self, usePos: bool = True) -> None:     # pylint: disable=invalid-name,unused-argument
+        """would finish the line being drawn and start a new one"""
+
+    def clear(self) -> None:
+        """deletes everything the turtle has drawn"""
+        self.screen.cv.delete(*self.items)
+        self.items = []
+        self.stampItems = []
+
+class Lazy:
+    """
+    Lazy Class
+
+    Takes the place of the screen or a turtle, and only makes it the first time one of its attributes is used
+    """
+    def __init__(self, factory: Callable[[], object]) -> None:
+        """
+        Parameters:
+            factory (Callable[[], object]): makes the screen or turtle
+        """
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_target", None)
+
+    def _resolve(self) -> object:
+        """
+        The real screen or turtle, made if it hasn't been yet.
+
+        Returns:
+            object: the screen or turtle
+        """
+        if self._target is None:
+            object.__setattr__(self, "_target", self._factory())
+        return self._target
+
+    def __getattr__(self, name: str):
+        return getattr(self._resolve(), name)
+
+    def __setattr__(self, name: str, value) -> None:
+        setattr(self._resolve(), name, value)
+
+# functions
+def set_backend(name: str) -> None:
+    """
+    Chooses what the screen and turtles are made with, only affects ones that haven't been made yet.
+
+    Parameters:
+        name (str): "tk" for the game window or "null" for nothing
+
+    Returns:
+        None
+    """
+    global BACKEND      # pylint: disable=global-statement
+    if name not in ("tk", "null"):
+        raise ValueError(f"unknown graphics backend {name!r}, use 'tk' or 'null'")
+    BACKEND = name
+
+def new_screen() -> turtle._Screen|NullScreen:
+    """
+    Makes (or gets, turtle only ever has one) the game window.
+
+    Returns:
+        turtle._Screen|NullScreen: the screen
+    """
+    return NullScreen() if BACKEND == "null" else turtle.Screen()
+
+def new_turtle() -> turtle.Turtle|NullTurtle:
+    """
+    Makes a turtle on the game window.
+
+    Returns:
+        turtle.Turtle|NullTurtle: the turtle
+    """
+    return NullTurtle(SCR._resolve()) if BACKEND == "null" else turtle.Turtle()     # pylint: disable=protected-access
+
+def process_events() -> None:
+    """
+    Handles the key presses, clicks and timers waiting for the game window without redrawing it,
+    for when the game loop is waiting for the next tick or frame. Does nothing with the null backend.
+
+    Returns:
+        None
+    """
+    screen = SCR._resolve()     # pylint: disable=protected-access
+    if isinstance(screen, NullScreen):
+        return
+    app = screen.getcanvas().tk
+    while app.dooneevent(_tkinter.WINDOW_EVENTS | _tkinter.TIMER_EVENTS | _tkinter.DONT_WAIT):     # redrawing is an idle event, so it is left for `SCR.update()`
+        pass
 
 # constants
-GAME_RUNNING: bool = True   # is the game running or not
-d_trtl = turtle.Turtle()    # drawing turtle
-s_trtl = turtle.Turtle()    # updates the score
-t_trtl = turtle.Turtle()    # updates the timer
-ll_trtl = turtle.Turtle()   # left lap turtle
-lr_trtl = turtle.Turtle()   # right lap turtle
-p_trtl = turtle.Turtle()    # pause screen turtle
-m_trtl = turtle.Turtle()    # menu turtle
-n1_trtl = turtle.Turtle()   # speedometer needle turtle
-n2_trtl = turtle.Turtle()   # speedometer needle turtle
-c_trtl = turtle.Turtle()    # coin turtle
-TURTLES = [                 # all the turtles to allow for iteration
+BACKEND: str = os.environ.get("OMEGA_RACE_GRAPHICS", "tk")  # what the screen and turtles are made with, "tk" or "null"
+GAME_RUNNING: bool = True       # is the game running or not
+d_trtl = Lazy(new_turtle)       # drawing turtle
+p_trtl = Lazy(new_turtle)       # pause screen turtle
+m_trtl = Lazy(new_turtle)       # menu turtle
+c_trtl = Lazy(new_turtle)       # coin turtle
+TURTLES = [                     # all the turtles to allow for iteration
             d_trtl,
-            s_trtl,
-            t_trtl,
-            ll_trtl,
-            lr_trtl,
             p_trtl,
             m_trtl,
-            n1_trtl,
-            n2_trtl,
             c_trtl
         ]
-SCR = turtle.Screen()       # game window
+SCR = Lazy(new_screen)          # game window
 
 class WrongFileError(Exception):
     """
@@ -0,0 +1,1088 @@
+"""
+Henry Spink, 2/5/24
+Database storage file for game for applied computing 1/2
+
+Where the player database is kept on disk. `SqliteStore` (the default) keeps the players and their cars in
+`database.db`, so a save only writes the players that changed and the leaderboard is read a page at a time from an index.
+`JsonStore` is the old `database.json` file, set `OMEGA_RACE_DATABASE=json` to keep using it.
+The first time the SQLite store is opened it imports `database.json` if there is one.
+
+Changes made during a game (coins, purchases, new players and bests) go in a `Journal` straight away. A background
+thread appends them to the cabinet's own `database.<host>-<pid>.journal` in batches and every so often compacts them into the store,
+so a crash only loses the last batch and the game loop never waits for the disk. The journal is locked while the game is running,
+so the next cabinet to start can tell a journal left by a crash (which it replays) from one that is still in use (which it leaves alone).
+
+Several cabinets can share one SQLite database (set `OMEGA_RACE_SHARED=1` and point `OMEGA_RACE_DATABASE_PATH` at it).
+Then every save reads the player's record, adds this cabinet's changes to it (coins collected or spent, cars bought, better times)
+and writes it back only if its version hasn't changed in the meantime, trying again if it has. Cabinets only wait for each
+other for the single write, never for a whole save. SQLite's write-ahead log needs the cabinets to be on the same computer,
+it doesn't work over a network share.
+
+Both stores load into and save from the same dict the game uses:
+`{name: {"best": "0 days 00:01:02.345000" or "None", "coins": int, "cars": [str, ...], "bests": {"oval/10": {"lap": ms, "race": ms}, ...}}}`
+"best" is the best lap of any race, "bests" is the best lap and best race time for each track and number of laps (a category).
+"""
+# pylint: disable=line-too-long
+#* imports
+import os
+import glob
+import json
+import socket
+import time
+import uuid
+import bisect
+import queue
+import sqlite3
+import threading
+try:
+    import fcntl
+except ImportError:     # Windows
+    fcntl = None
+    import msvcrt
+from racing_game_sim import format_duration, parse_duration
+
+#* constants
+ENGINE: str = os.environ.get("OMEGA_RACE_DATABASE", "sqlite")  # how the database is stored, "sqlite" or "json"
+SQLITE_PATH: str = os.environ.get("OMEGA_RACE_DATABASE_PATH", "database.db")  # the SQLite database
+SHARED: bool = os.environ.get("OMEGA_RACE_SHARED", "0") == "1"     # whether other cabinets are using the same SQLite database
+RETRIES: int = 20                   # times a shared save is tried again after another cabinet changed the same player
+BUSY_TIMEOUT: int = 5000            # most milliseconds to wait for another cabinet to finish writing
+JSON_PATH: str = "database.json"    # the old JSON database (and the one imported into SQLite)
+JOURNAL_NAME: str = "database.{owner}.journal"     # a cabinet's changes not yet compacted into the store, one JSON object per line
+JOURNAL_PATH: str = "database.journal"  # the journal from before each cabinet had its own, replayed if one is left over
+FSYNC: str = os.environ.get("OMEGA_RACE_FSYNC", "always")   # when the journal is forced to disk: "always" (every batch), "interval" or "never" (left to the OS)
+FSYNC_INTERVAL: float = 1.0         # most seconds between forcing the journal to disk with the "interval" policy
+BATCH_SIZE: int = 64                # most changes written to the journal in one go
+BATCH_DELAY: float = 0.05           # seconds to wait for more changes before writing a batch
+COMPACT_EVERY: int = 500            # changes in the journal before it is compacted into the store
+COMPACT_INTERVAL: float = 30.0      # seconds before changes left in the journal are compacted into the store
+KINDS: tuple[str, ...] = ("lap", "race")    # the best times kept for each category
+SCHEMA_VERSION: int = 4             # bump when the tables change
+SCHEMA: str = """
+CREATE TABLE IF NOT EXISTS players (
+    name TEXT PRIMARY KEY,
+    best_ms INTEGER,
+    coins INTEGER NOT NULL DEFAULT 0,
+    version INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS players_best_ms ON players (best_ms, name) WHERE best_ms IS NOT NULL;
+CREATE TABLE IF NOT EXISTS cars (
+    player TEXT NOT NULL REFERENCES players (name) ON DELETE CASCADE,
+    car TEXT NOT NULL,
+    PRIMARY KEY (player, car)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS bests (
+    player TEXT NOT NULL REFERENCES players (name) ON DELETE CASCADE,
+    track TEXT NOT NULL,
+    laps INTEGER NOT NULL,
+    best_lap_ms INTEGER,
+    best_race_ms INTEGER,
+    PRIMARY KEY (player, track, laps)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS bests_lap ON bests (track, laps, best_lap_ms, player) WHERE best_lap_ms IS NOT NULL;
+CREATE INDEX IF NOT EXISTS bests_race ON bests (track, laps, best_race_ms, player) WHERE best_race_ms IS NOT NULL;
+CREATE TABLE IF NOT EXISTS categories (
+    track TEXT NOT NULL,
+    laps INTEGER NOT NULL,
+    PRIMARY KEY (track, laps)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS journal_applied (
+    journal TEXT NOT NULL,
+    player TEXT NOT NULL,
+    compaction TEXT NOT NULL,
+    PRIMARY KEY (journal, player)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+#* functions
+def best_ms(best: str) -> int|None:
+    """
+    A best time from the database dict in whole milliseconds.
+
+    Parameters:
+        best (str): the time ('0 days 00:01:02.345000') or "None"
+
+    Returns:
+        int|None: the time in milliseconds, or None if the player hasn't got one
+    """
+    return None if best == "None" else parse_duration(best) // 1_000_000
+
+def best_text(ms: int|None) -> str:
+    """
+    A best time in milliseconds as it is kept in the database dict.
+
+    Parameters:
+        ms (int|None): the time in milliseconds, or None
+
+    Returns:
+        str: the time ('0 days 00:01:02.345000') or "None"
+    """
+    return "None" if ms is None else format_duration(ms * 1_000_000)
+
+def category_key(track: str, laps: int) -> str:
+    """
+    The key of a category in a player's "bests".
+
+    Parameters:
+        track (str): name of the track
+        laps (int): laps in the race
+
+    Returns:
+        str: the key, e.g. 'oval/10'
+    """
+    return f"{track}/{laps}"
+
+def split_category(key: str) -> tuple[str, int]:
+    """
+    The track and number of laps from the key of a category.
+
+    Parameters:
+        key (str): the key, e.g. 'oval/10'
+
+    Returns:
+        tuple[str, int]: the track and number of laps
+    """
+    track, laps = key.rsplit("/", 1)
+    return track, int(laps)
+
+def entry_bests(value: dict) -> dict[tuple[str, int, str]|None, int|None]:
+    """
+    Every best time of a player, by the leaderboard they are on.
+
+    Parameters:
+        value (dict): the player's entry in the database
+
+    Returns:
+        dict[tuple[str, int, str]|None, int|None]: milliseconds for each (track, laps, kind), and None for the best lap of any race
+    """
+    bests = {None: best_ms(value["best"])}
+    for key, times in value.get("bests", {}).items():
+        track, laps = split_category(key)
+        for kind in KINDS:
+            bests[(track, laps, kind)] = times.get(kind)
+    return bests
+
+def merge(base: dict|None, ours: dict, theirs: dict) -> dict:
+    """
+    Adds this cabinet's changes to a player's record to another cabinet's changes.
+
+    Parameters:
+        base (dict|None): the player's entry when this cabinet last read or wrote it, None if it never has
+        ours (dict): the player's entry in this cabinet now
+        theirs (dict): the player's entry saved in the database now
+
+    Returns:
+        dict: the entry to save, with both cabinets' coins, cars and best times
+    """
+    base = base or {"best": "None", "coins": 0, "cars": [], "bests": {}}
+    times = [ms for ms in (best_ms(ours["best"]), best_ms(theirs["best"])) if ms is not None]
+    bests = {key: dict(value) for key, value in theirs.get("bests", {}).items()}
+    for key, value in ours.get("bests", {}).items():
+        mine = bests.setdefault(key, {kind: None for kind in KINDS})
+        for kind in KINDS:
+            if value.get(kind) is not None and (mine.get(kind) is None or value[kind] < mine[kind]):
+                mine[kind] = value[kind]
+    return {
+        "best": best_text(min(times) if times else None),
+        "coins": theirs["coins"] + ours["coins"] - base["coins"],      # the coins this cabinet collected or spent since then
+        "cars": theirs["cars"] + [car for car in ours["cars"] if car not in theirs["cars"]],
+        "bests": bests,
+    }
+
+def open_store(engine: str = ENGINE, shared: bool = SHARED) -> "JsonStore|SqliteStore":
+    """
+    Opens the player database.
+
+    Parameters:
+        engine (str): "sqlite" or "json"
+        shared (bool): whether other cabinets are using the same database, only the SQLite store can be shared
+
+    Returns:
+        JsonStore|SqliteStore: the store
+    """
+    if shared and engine != "sqlite":
+        raise ValueError("only the 'sqlite' database engine can be shared between cabinets")
+    match engine:
+        case "sqlite":
+            return SqliteStore(shared=shared)
+        case "json":
+            return JsonStore()
+        case _:
+            raise ValueError(f"unknown database engine {engine!r}, use 'sqlite' or 'json'")
+
+def lock(file) -> bool:
+    """
+    Locks an open file so no other cabinet can, without waiting. The lock goes when the file is closed or the game stops, even if it crashed.
+
+    Parameters:
+        file (TextIO): the file
+
+    Returns:
+        bool: whether it was locked, False if something else has it locked
+    """
+    try:
+        if fcntl is not None:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            file.seek(0)
+            msvcrt.locking(file.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        return False
+    return True
+
+def release(file, path: str) -> None:
+    """
+    Deletes a locked file and closes it. It is deleted before it is closed where the OS allows, so another cabinet can't lock it in between.
+
+    Parameters:
+        file (TextIO): the open, locked file
+        path (str): where it is
+
+    Returns:
+        None
+    """
+    if os.name == "nt":
+        file.close()                # Windows can't delete a file that is open
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+    file.close()
+
+#* classes
+class ConflictError(Exception):
+    """
+    Custom Exception for when other cabinets kept changing a player while this one was trying to save them
+    """
+
+class Ranking:
+    """
+    Ranking Class
+
+    The players with a best time kept sorted as (best_ms, name), fastest first.
+    Updating a player and reading a page are a binary search each, so the leaderboard doesn't have to sort every player
+    """
+    def __init__(self, keys: list[tuple[int, str]]|None = None) -> None:
+        """
+        Parameters:
+            keys (list[tuple[int, str]]|None): (best_ms, name) of the players to rank, in any order
+        """
+        self.keys: list[tuple[int, str]] = sorted(keys or [])      # (best_ms, name) sorted
+        self.best: dict[str, int] = {name: ms for ms, name in self.keys}   # best_ms of each ranked player, to find their key
+
+    def update(self, name: str, ms: int|None) -> None:
+        """
+        Moves a player to where their best time now ranks them.
+
+        Parameters:
+            name (str): the player's name
+            ms (int|None): their best time in milliseconds, or None to take them off
+
+        Returns:
+            None
+        """
+        old = self.best.pop(name, None)
+        if old is not None:
+            del self.keys[bisect.bisect_left(self.keys, (old, name))]
+        if ms is not None:
+            self.best[name] = ms
+            bisect.insort(self.keys, (ms, name))
+
+    def page(self, after: tuple[int, str]|None, limit: int) -> list[tuple[int, str]]:
+        """
+        The next players on the leaderboard.
+
+        Parameters:
+            after (tuple[int, str]|None): the (best_ms, name) of the player before the page, or None for the top
+            limit (int): the most players to return
+
+        Returns:
+            list[tuple[int, str]]: (best_ms, name) of each player, fastest first
+        """
+        start = 0 if after is None else bisect.bisect_right(self.keys, after)
+        return self.keys[start:start + limit]
+
+class JsonStore:
+    """
+    JsonStore Class
+
+    The whole database in one JSON file, read and written in one go
+    """
+    def __init__(self, path: str = JSON_PATH) -> None:
+        """
+        Parameters:
+            path (str): the JSON file
+        """
+        self.path = path
+        self.lock = threading.Lock()    # the journal compacts into the file from its own thread
+        self.rankings: dict[tuple[str, int, str]|None, Ranking] = {}    # a leaderboard for each category, kept up to date as players are saved
+
+    def load(self) -> dict:
+        """
+        Reads every player, making an empty file if there isn't one yet.
+
+        Returns:
+            dict: the database
+        """
+        try:
+            with open(self.path, "r", encoding="utf-8") as dbfile:
+                db = json.load(dbfile)
+        except FileNotFoundError:
+            db = {}
+            self.save(db, [])
+        keys: dict[tuple[str, int, str]|None, list[tuple[int, str]]] = {None: []}
+        for name, value in db.items():
+            for category, ms in entry_bests(value).items():
+                if ms is not None:
+                    keys.setdefault(category, []).append((ms, name))
+        self.rankings = {category: Ranking(category_keys) for category, category_keys in keys.items()}
+        return db
+
+    def _rank(self, name: str, value: dict) -> None:
+        """
+        Moves a player on every leaderboard they are on.
+
+        Parameters:
+            name (str): the player's name
+            value (dict): the player's entry in the database
+
+        Returns:
+            None
+        """
+        for category, ms in entry_bests(value).items():
+            self.rankings.setdefault(category, Ranking()).update(name, ms)
+
+    def save(self, db: dict, changed: list[str]) -> None:
+        """
+        Writes every player, the file can't be changed in place so `changed` is only used to update the ranking.
+
+        Parameters:
+            db (dict): the database
+            changed (list[str]): names of the players that changed since the last save
+
+        Returns:
+            None
+        """
+        with self.lock:
+            self._dump(db)
+            for name in changed:
+                self._rank(name, db[name])
+
+    def _dump(self, db: dict) -> None:
+        """
+        Writes the file to a temporary file first and swaps it in, so a crash part way through leaves the old one.
+
+        Parameters:
+            db (dict): the database
+
+        Returns:
+            None
+        """
+        with open(self.path + ".tmp", "w", encoding="utf-8") as dbfile:
+            json.dump(db, dbfile)
+            dbfile.flush()
+            os.fsync(dbfile.fileno())
+        os.replace(self.path + ".tmp", self.path)
+
+    def apply(self, entries: dict, bases: dict|None = None, journal: str|None = None, compactions: dict|None = None) -> None:   # pylint: disable=unused-argument
+        """
+        Writes changed players from the journal, which means reading and writing the whole file.
+
+        Parameters:
+            entries (dict): the latest entry of each player that changed
+            bases (dict|None): unused, the JSON file can't be shared so saves never need merging
+            journal (str|None): unused, writing a whole entry twice gives the same file so there's nothing to record
+            compactions (dict|None): unused, as for `journal`
+
+        Returns:
+            None
+        """
+        with self.lock:
+            try:
+                with open(self.path, "r", encoding="utf-8") as dbfile:
+                    db = json.load(dbfile)
+            except FileNotFoundError:
+                db = {}
+            db.update(entries)
+            self._dump(db)
+            for name, value in entries.items():
+                self._rank(name, value)
+
+    def page(self, after: tuple[int, str]|None, limit: int, category: tuple[str, int, str]|None = None) -> list[tuple[int, str]]:
+        """
+        The next players on a leaderboard, from its ranking.
+
+        Parameters:
+            after (tuple[int, str]|None): the (best_ms, name) of the player before the page, or None for the top
+            limit (int): the most players to return
+            category (tuple[str, int, str]|None): the (track, laps, kind) leaderboard, or None for the best lap of any race
+
+        Returns:
+            list[tuple[int, str]]: (best_ms, name) of each player, fastest first
+        """
+        with self.lock:
+            return self.rankings.get(category, Ranking()).page(after, limit)
+
+    def categories(self) -> list[tuple[str, int]]:
+        """
+        Every (track, laps) someone has a best time for.
+
+        Returns:
+            list[tuple[str, int]]: the categories, sorted
+        """
+        with self.lock:
+            return sorted({(category[0], category[1]) for category, ranking in self.rankings.items() if category is not None and ranking.keys})
+
+    def base(self, name: str) -> None:     # pylint: disable=unused-argument
+        """the JSON file can't be shared, so saves never need merging"""
+
+    def applied(self, journal: str, name: str) -> None:    # pylint: disable=unused-argument
+        """the journal's whole entries can be written again safely, so which were written isn't recorded"""
+
+    def forget(self, journal: str) -> None:    # pylint: disable=unused-argument
+        """nothing is recorded about journals"""
+
+    def close(self) -> None:
+        """nothing to close, the file is only open while it is being read or written"""
+
+class SqliteStore:
+    """
+    SqliteStore Class
+
+    The database in SQLite, with a row per player and a row per car they own.
+    It uses write-ahead logging so the leaderboard can be read while a save is being written.
+    Every player has a version that goes up each time they are saved, for sharing the database between cabinets
+    """
+    def __init__(self, path: str = SQLITE_PATH, json_path: str = JSON_PATH, shared: bool = False) -> None:
+        """
+        Parameters:
+            path (str): the SQLite database
+            json_path (str): the JSON database to import the first time
+            shared (bool): whether other cabinets are using the same database, so saves are merged into what is there
+        """
+        self.path = path
+        self.shared = shared
+        self.sent: dict[str, dict] = {}    # each player as this cabinet last read or wrote them, to work out its changes when shared
+        self.conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)  # transactions are started by hand, and the journal writes from its own thread
+        self.lock = threading.RLock()   # so only one thread uses the connection at a time
+        self.conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT}")   # wait for other cabinets' writes rather than failing
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")     # with WAL only the last commits can be lost in a power cut, never the file
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+        if "version" not in [column for _, column, *_ in self.conn.execute("PRAGMA table_info(players)")]:     # made before there were versions
+            self.conn.execute("ALTER TABLE players ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+        self.conn.execute("INSERT INTO meta (key, value) VALUES ('schema_version', ?) ON CONFLICT (key) DO UPDATE SET value = excluded.value", (str(SCHEMA_VERSION),))  # the new tables have just been made if they were missing
+        self.import_json(json_path)
+
+    def _meta(self, key: str) -> str|None:
+        """
+        Reads a value from the meta table.
+
+        Parameters:
+            key (str): the key
+
+        Returns:
+            str|None: the value, or None if it isn't set
+        """
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return None if row is None else row[0]
+
+    def import_json(self, json_path: str) -> int:
+        """
+        Copies the players from the old JSON database, only the first time the SQLite database is opened.
+        The JSON file is left where it is as a backup.
+
+        Parameters:
+            json_path (str): the JSON database
+
+        Returns:
+            int: the number of players imported
+        """
+        if self._meta("imported_json") is not None:
+            return 0
+        try:
+            with open(json_path, "r", encoding="utf-8") as dbfile:
+                db = json.load(dbfile)
+        except FileNotFoundError:
+            db = {}
+        self.conn.execute("BEGIN IMMEDIATE")
+        if self._meta("imported_json") is not None:     # another cabinet imported it first
+            self.conn.execute("ROLLBACK")
+            return 0
+        try:
+            self._write(db, db.keys())
+            self.conn.execute("INSERT INTO meta (key, value) VALUES ('imported_json', ?)", (str(len(db)),))
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+        return len(db)
+
+    def load(self) -> dict:
+        """
+        Reads every player.
+
+        Returns:
+            dict: the database
+        """
+        with self.lock:
+            db = {name: {"best": best_text(ms), "coins": coins, "cars": [], "bests": {}} for name, ms, coins in self.conn.execute("SELECT name, best_ms, coins FROM players")}
+            for player, car in self.conn.execute("SELECT player, car FROM cars"):
+                db[player]["cars"].append(car)
+            for player, track, laps, lap, race in self.conn.execute("SELECT player, track, laps, best_lap_ms, best_race_ms FROM bests"):
+                db[player]["bests"][category_key(track, laps)] = {"lap": lap, "race": race}
+            if self.shared:
+                self.sent = {name: json.loads(json.dumps(value)) for name, value in db.items()}
+        return db
+
+    def _read(self, name: str) -> tuple[dict|None, int]:
+        """
+        Reads one player and their version, only the rows for that player are looked at.
+
+        Parameters:
+            name (str): the player's name
+
+        Returns:
+            tuple[dict|None, int]: the player's entry (None if they haven't been saved) and its version
+        """
+        row = self.conn.execute("SELECT best_ms, coins, version FROM players WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            return None, -1
+        ms, coins, version = row
+        value = {"best": best_text(ms), "coins": coins, "cars": [], "bests": {}}
+        value["cars"] = [car for (car,) in self.conn.execute("SELECT car FROM cars WHERE player = ?", (name,))]
+        for track, laps, lap, race in self.conn.execute("SELECT track, laps, best_lap_ms, best_race_ms FROM bests WHERE player = ?", (name,)):
+            value["bests"][category_key(track, laps)] = {"lap": lap, "race": race}
+        return value, version
+
+    def read(self, name: str) -> dict|None:
+        """
+        Reads one player as they are saved now, e.g. after another cabinet has changed them.
+        Changes this cabinet makes after this are added to what was read.
+
+        Parameters:
+            name (str): the player's name
+
+        Returns:
+            dict|None: the player's entry, or None if they haven't been saved
+        """
+        with self.lock:
+            self.conn.execute("BEGIN")      # the player, their cars and their times all from the same moment
+            try:
+                value, _ = self._read(name)
+            finally:
+                self.conn.execute("COMMIT")
+            if value is not None:
+                self.sent[name] = json.loads(json.dumps(value))
+            return value
+
+    def base(self, name: str) -> dict|None:
+        """
+        The player as this cabinet last read or wrote them, what its changes since then are worked out from.
+
+        Parameters:
+            name (str): the player's name
+
+        Returns:
+            dict|None: the player's entry, or None if the database isn't shared or this cabinet hasn't read them
+        """
+        with self.lock:
+            return self.sent.get(name)
+
+    def applied(self, journal: str, name: str) -> str|None:
+        """
+        The last compaction of a journal that was written for a player, so replaying the journal can skip changes that are already saved.
+
+        Parameters:
+            journal (str): the journal's file name
+            name (str): the player's name
+
+        Returns:
+            str|None: the compaction, or None if nothing from the journal has been written for them
+        """
+        with self.lock:
+            row = self.conn.execute("SELECT compaction FROM journal_applied WHERE journal = ? AND player = ?", (journal, name)).fetchone()
+        return None if row is None else row[0]
+
+    def forget(self, journal: str) -> None:
+        """
+        Deletes what was recorded about a journal once it has been deleted.
+
+        Parameters:
+            journal (str): the journal's file name
+
+        Returns:
+            None
+        """
+        with self.lock:
+            self.conn.execute("DELETE FROM journal_applied WHERE journal = ?", (journal,))
+
+    def _mark(self, name: str, journal: str|None, compaction: str|None) -> None:
+        """
+        Records that a journal's compaction has been written for a player, inside the transaction that writes them.
+
+        Parameters:
+            name (str): the player's name
+            journal (str|None): the journal's file name, or None if the player wasn't written from a journal
+            compaction (str|None): the compaction
+
+        Returns:
+            None
+        """
+        if journal is not None:
+            self.conn.execute(
+                "INSERT INTO journal_applied (journal, player, compaction) VALUES (?, ?, ?) "
+                "ON CONFLICT (journal, player) DO UPDATE SET compaction = excluded.compaction",
+                (journal, name, compaction)
+            )
+
+    def _write(self, db: dict, names, journal: str|None = None, compactions: dict|None = None) -> None:
+        """
+        Writes players from the database dict, inside a transaction that has already been started.
+
+        Parameters:
+            db (dict): the database
+            names (Iterable[str]): the players to write
+            journal (str|None): the journal the players are from, if they are
+            compactions (dict|None): the compaction of the journal each player is from
+
+        Returns:
+            None
+        """
+        for name in names:
+            value = db[name]
+            self.conn.execute(
+                "INSERT INTO players (name, best_ms, coins) VALUES (?, ?, ?) "
+                "ON CONFLICT (name) DO UPDATE SET best_ms = excluded.best_ms, coins = excluded.coins, version = version + 1",
+                (name, best_ms(value["best"]), value["coins"])
+            )
+            self._write_rest(name, value)
+            self._mark(name, journal, (compactions or {}).get(name))
+
+    def _write_rest(self, name: str, value: dict) -> None:
+        """
+        Writes a player's cars and best times, inside a transaction that has already been started.
+
+        Parameters:
+            name (str): the player's name
+            value (dict): the player's entry
+
+        Returns:
+            None
+        """
+        self.conn.executemany("INSERT OR IGNORE INTO cars (player, car) VALUES (?, ?)", ((name, car) for car in value["cars"]))
+        self.conn.executemany(
+            "INSERT INTO bests (player, track, laps, best_lap_ms, best_race_ms) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (player, track, laps) DO UPDATE SET best_lap_ms = excluded.best_lap_ms, best_race_ms = excluded.best_race_ms",
+            ((name, *split_category(key), times.get("lap"), times.get("race")) for key, times in value.get("bests", {}).items())
+        )
+        self.conn.executemany("INSERT OR IGNORE INTO categories (track, laps) VALUES (?, ?)", (split_category(key) for key in value.get("bests", {})))
+
+    def _merge_write(self, name: str, value: dict, journal: str|None = None, compaction: str|None = None) -> None:
+        """
+        Saves one player when the database is shared: reads what is saved, adds this cabinet's changes to it
+        and writes it back if no other cabinet has saved the player in the meantime, or tries again if one has.
+        Only the write itself holds SQLite's write lock.
+
+        Parameters:
+            name (str): the player's name
+            value (dict): the player's entry in this cabinet
+            journal (str|None): the journal the player is from, if they are
+            compaction (str|None): the compaction of the journal they are from
+
+        Returns:
+            None
+
+        Raises:
+            ConflictError: if other cabinets kept saving the player `RETRIES` times in a row
+        """
+        for _ in range(RETRIES):
+            theirs, version = self._read(name)
+            merged = value if theirs is None else merge(self.sent.get(name), value, theirs)
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                if theirs is None:
+                    written = self.conn.execute("INSERT INTO players (name, best_ms, coins) VALUES (?, ?, ?) ON CONFLICT (name) DO NOTHING", (name, best_ms(merged["best"]), merged["coins"])).rowcount
+                else:
+                    written = self.conn.execute("UPDATE players SET best_ms = ?, coins = ?, version = version + 1 WHERE name = ? AND version = ?", (best_ms(merged["best"]), merged["coins"], name, version)).rowcount
+                if written:
+                    self._write_rest(name, merged)
+                    self._mark(name, journal, compaction)
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            if not written:                     # another cabinet saved them first, read them again
+                self.conn.execute("ROLLBACK")
+                continue
+            self.conn.execute("COMMIT")
+            self.sent[name] = json.loads(json.dumps(value))
+            return
+        raise ConflictError(f"couldn't save {name!r}, other cabinets kept saving them at the same time")
+
+    def save(self, db: dict, changed: list[str], journal: str|None = None, compactions: dict|None = None) -> None:
+        """
+        Writes only the players that changed, in one transaction.
+        When the database is shared each player is merged and written on their own instead.
+
+        Parameters:
+            db (dict): the database
+            changed (list[str]): names of the players that changed since the last save
+            journal (str|None): the journal the players are from, if they are
+            compactions (dict|None): the compaction of the journal each player is from, recorded with them
+
+        Returns:
+            None
+        """
+        with self.lock:
+            if self.shared:
+                for name in changed:
+                    self._merge_write(name, db[name], journal, (compactions or {}).get(name))
+                return
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._write(db, changed, journal, compactions)
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+
+    def apply(self, entries: dict, bases: dict|None = None, journal: str|None = None, compactions: dict|None = None) -> None:
+        """
+        Writes changed players from the journal, synced to disk straight away as the journal is emptied afterwards.
+        Which compaction of the journal each player came from is written with them, see `applied`.
+
+        Parameters:
+            entries (dict): the latest entry of each player that changed
+            bases (dict|None): each player as this cabinet last read or wrote them before the changes, when replaying the journal after a crash
+            journal (str|None): the journal's file name
+            compactions (dict|None): the compaction of the journal each player is from
+
+        Returns:
+            None
+        """
+        with self.lock:
+            if self.shared:
+                for name, base in (bases or {}).items():
+                    self.sent[name] = base
+            self.conn.execute("PRAGMA synchronous=FULL")
+            try:
+                self.save(entries, list(entries), journal, compactions)
+            finally:
+                self.conn.execute("PRAGMA synchronous=NORMAL")
+
+    def page(self, after: tuple[int, str]|None, limit: int, category: tuple[str, int, str]|None = None) -> list[tuple[int, str]]:
+        """
+        The next players on a leaderboard, read from its best time index starting just after the last page
+        (rather than counting past every player before it).
+
+        Parameters:
+            after (tuple[int, str]|None): the (best_ms, name) of the player before the page, or None for the top
+            limit (int): the most players to return
+            category (tuple[str, int, str]|None): the (track, laps, kind) leaderboard, or None for the best lap of any race
+
+        Returns:
+            list[tuple[int, str]]: (best_ms, name) of each player, fastest first
+        """
+        if category is None:
+            table, column, name, where, args = "players", "best_ms", "name", "", ()
+        else:
+            track, laps, kind = category
+            table, column, name, where, args = "bests", {"lap": "best_lap_ms", "race": "best_race_ms"}[kind], "player", "track = ? AND laps = ? AND ", (track, laps)
+        query = f"SELECT {column}, {name} FROM {table} WHERE {where}{column} IS NOT NULL"
+        if after is not None:
+            query += f" AND ({column}, {name}) > (?, ?)"
+            args += tuple(after)
+        with self.lock:
+            return self.conn.execute(f"{query} ORDER BY {column}, {name} LIMIT ?", (*args, limit)).fetchall()
+
+    def categories(self) -> list[tuple[str, int]]:
+        """
+        Every (track, laps) someone has a best time for.
+
+        Returns:
+            list[tuple[str, int]]: the categories, sorted
+        """
+        with self.lock:
+            return self.conn.execute("SELECT track, laps FROM categories ORDER BY track, laps").fetchall()
+
+    def close(self) -> None:
+        """
+        Closes the connection, which also tidies the write-ahead log into the database file.
+
+        Returns:
+            None
+        """
+        with self.lock:
+            self.conn.close()
+
+class Journal:
+    """
+    Journal Class
+
+    An append-only log of changed players that a background thread writes to disk in batches,
+    and compacts into the store once enough changes have built up (or enough time has passed).
+    Each line is the whole entry of one player. Every cabinet has its own journal, locked for as long as the game is running,
+    and only journals that nobody has locked are replayed, so one cabinet never replays changes another is still journaling.
+    With a shared database the first line for each player after a compaction also has what the player was before,
+    so their changes can still be merged after a crash.
+    Every line says which compaction it will be part of, and the store records the last compaction written for each player
+    in the same transaction as the player. Replaying skips players whose compaction was already written (a crash between
+    writing the store and emptying the journal), so their changes are never merged twice
+    """
+    _STOP = object()    # tells the writer thread to finish
+
+    def __init__(self, store: JsonStore|SqliteStore, directory: str|None = None, fsync: str = FSYNC, fsync_interval: float = FSYNC_INTERVAL,
+                 batch_size: int = BATCH_SIZE, batch_delay: float = BATCH_DELAY, compact_every: int = COMPACT_EVERY, compact_interval: float = COMPACT_INTERVAL) -> None:
+        """
+        Parameters:
+            store (JsonStore|SqliteStore): the store to compact into
+            directory (str|None): the folder the journals are kept in, the store's folder if None
+            fsync (str): when the journal is forced to disk, "always" (every batch), "interval" (at most every `fsync_interval` seconds) or "never" (left to the OS)
+            fsync_interval (float): most seconds between forcing the journal to disk with the "interval" policy
+            batch_size (int): most changes written in one go
+            batch_delay (float): seconds to wait for more changes before writing a batch
+            compact_every (int): changes in the journal before it is compacted into the store
+            compact_interval (float): seconds before changes left in the journal are compacted into the store
+        """
+        if fsync not in ("always", "interval", "never"):
+            raise ValueError(f"unknown fsync policy {fsync!r}, use 'always', 'interval' or 'never'")
+        self.store = store
+        self.directory = os.path.dirname(store.path) if directory is None else directory
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.compact_every = compact_every
+        self.compact_interval = compact_interval
+        self.queue: queue.Queue = queue.Queue()
+        self.pending: dict[str, dict] = {}      # latest entry of each player written to the journal but not yet compacted
+        self.written: int = 0                   # changes written to the journal since it was last compacted
+        self.error: Exception|None = None       # what stopped the writer thread, if anything did
+        self.last_fsync = self.last_compact = time.monotonic()
+        self.file, self.path = self._claim()
+        self.name = os.path.basename(self.path)
+        self.compaction = uuid.uuid4().hex     # the compaction the changes being written now will be part of
+        self.recovered = self.replay()          # changes left over from games that didn't shut down properly
+        self.thread = threading.Thread(target=self._run, name="journal writer", daemon=True)
+        self.thread.start()
+
+    def _claim(self) -> tuple:
+        """
+        Opens and locks this cabinet's journal, named after the computer and process so cabinets never share one.
+        If the name is taken (another journal in the same game) a number is added to it.
+
+        Returns:
+            tuple[TextIO, str]: the journal file and where it is
+        """
+        owner = f"{socket.gethostname()}-{os.getpid()}"
+        number = 0
+        while True:
+            path = os.path.join(self.directory, JOURNAL_NAME.format(owner=owner if number == 0 else f"{owner}-{number}"))
+            file = open(path, "a+", encoding="utf-8")       # pylint: disable=consider-using-with
+            try:
+                claimed = lock(file) and os.path.samestat(os.fstat(file.fileno()), os.stat(path))    # and it wasn't deleted while we were locking it
+            except FileNotFoundError:
+                claimed = False
+            if claimed:
+                return file, path
+            file.close()
+            number += 1
+
+    def replay(self) -> int:
+        """
+        Compacts what is left in the journals of games that didn't shut down properly into the store, and deletes them.
+        That's anything in this cabinet's journal (left by an earlier game with the same process id) and every other journal
+        that isn't locked. A locked journal belongs to a cabinet that is still running, so it is left alone.
+
+        Returns:
+            int: the number of changes replayed
+        """
+        count = self._replay(self.file, self.name)
+        self.store.forget(self.name)            # the journal of an earlier game with the same name
+        paths = set(glob.glob(os.path.join(self.directory, JOURNAL_NAME.format(owner="*")))) | {os.path.join(self.directory, JOURNAL_PATH)}
+        for path in sorted(paths - {self.path}):
+            try:
+                file = open(path, "r+", encoding="utf-8")   # pylint: disable=consider-using-with
+            except FileNotFoundError:
+                continue
+            if not lock(file):                  # its cabinet is still running
+                file.close()
+                continue
+            try:
+                count += self._replay(file, os.path.basename(path))
+            finally:
+                release(file, path)
+            self.store.forget(os.path.basename(path))
+        return count
+
+    def _replay(self, file, name: str) -> int:
+        """
+        Compacts the changes in one journal into the store, then empties it.
+        A line cut short by a crash is skipped, and so are players whose compaction was written to the store already.
+
+        Parameters:
+            file (TextIO): the journal, open and locked
+            name (str): the journal's file name
+
+        Returns:
+            int: the number of changes replayed
+        """
+        entries, bases, compactions, counts = {}, {}, {}, {}
+        file.seek(0)
+        for line in file.read().splitlines():
+            try:
+                change = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            player = change.pop("player")
+            base = change.pop("base", None)
+            compaction = change.pop("compaction", None)
+            if player not in entries:
+                bases[player] = base
+            entries[player] = change
+            compactions[player] = compaction
+            counts[player] = counts.get(player, 0) + 1
+        for player, compaction in compactions.items():
+            if compaction is not None and self.store.applied(name, player) == compaction:    # saved before the crash
+                del entries[player], bases[player], counts[player]
+        if entries:
+            self.store.apply(entries, bases, name, {player: compactions[player] for player in entries})
+        file.seek(0)
+        file.truncate(0)
+        if self.fsync != "never":
+            os.fsync(file.fileno())
+        return sum(counts.values())
+
+    def record(self, name: str, entry: dict) -> None:
+        """
+        Logs a player's entry after it has changed, the write happens on the writer thread.
+
+        Parameters:
+            name (str): the player's name
+            entry (dict): the player's whole entry in the database
+
+        Returns:
+            None
+        """
+        self.queue.put({"player": name, "best": entry["best"], "coins": entry["coins"], "cars": list(entry["cars"]), "bests": {key: dict(times) for key, times in entry.get("bests", {}).items()}})
+
+    def sync(self) -> None:
+        """
+        Waits until everything logged so far has been written and compacted into the store.
+
+        Returns:
+            None
+
+        Raises:
+            Exception: whatever stopped the writer thread, if it has stopped
+        """
+        done = threading.Event()
+        if self.thread.is_alive():
+            self.queue.put(done)
+            while not done.wait(0.1) and self.thread.is_alive():
+                pass
+        if self.error is not None:
+            raise self.error
+
+    def close(self) -> None:
+        """
+        Writes and compacts everything logged so far, stops the writer thread and deletes the journal.
+        If something went wrong it is kept, so the changes in it are replayed next time.
+
+        Returns:
+            None
+        """
+        if self.thread.is_alive():
+            self.queue.put(self._STOP)
+            self.thread.join()
+        if self.error is not None:
+            self.file.close()
+            raise self.error
+        release(self.file, self.path)
+        self.store.forget(self.name)
+
+    def _run(self) -> None:
+        """
+        The writer thread, writes batches of changes and compacts the journal until it is stopped.
+
+        Returns:
+            None
+        """
+        try:
+            while True:
+                timeout = max(0.0, self.last_compact + self.compact_interval - time.monotonic()) if self.pending else None
+                try:
+                    item = self.queue.get(timeout=timeout)
+                except queue.Empty:
+                    self._compact()                 # nothing has changed for a while, tidy up
+                    continue
+                batch = []
+                deadline = time.monotonic() + self.batch_delay
+                while isinstance(item, dict):       # changes, gather more until the batch is full or the delay is up
+                    batch.append(item)
+                    if len(batch) >= self.batch_size:
+                        item = None
+                        break
+                    try:
+                        item = self.queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        item = None
+                self._write(batch)
+                if item is not None or self.written >= self.compact_every or time.monotonic() - self.last_compact >= self.compact_interval:
+                    self._compact()
+                if isinstance(item, threading.Event):
+                    item.set()
+                elif item is self._STOP:
+                    return
+        except Exception as error:                  # pylint: disable=broad-exception-caught
+            self.error = error
+
+    def _write(self, batch: list[dict]) -> None:
+        """
+        Appends a batch of changes to the journal file and forces it to disk if the fsync policy says to.
+
+        Parameters:
+            batch (list[dict]): the changes
+
+        Returns:
+            None
+        """
+        if not batch:
+            return
+        for change in batch:
+            change["compaction"] = self.compaction
+            if change["player"] not in self.pending and self.store.base(change["player"]) is not None:     # first change since the last compaction
+                change["base"] = self.store.base(change["player"])
+        self.file.write("".join(json.dumps(change) + "\n" for change in batch))
+        self.file.flush()
+        now = time.monotonic()
+        if self.fsync == "always" or (self.fsync == "interval" and now - self.last_fsync >= self.fsync_interval):
+            os.fsync(self.file.fileno())
+            self.last_fsync = now
+        self.written += len(batch)
+        for change in batch:
+            self.pending[change["player"]] = {key: value for key, value in change.items() if key not in ("player", "base", "compaction")}
+
+    def _compact(self) -> None:
+        """
+        Writes the latest entry of every player in the journal into the store and empties the journal.
+
+        Returns:
+            None
+        """
+        self.last_compact = time.monotonic()
+        if not self.pending:
+            return
+        self.store.apply(self.pending, None, self.name, {name: self.compaction for name in self.pending})
+        self.compaction = uuid.uuid4().hex
+        self.pending = {}
+        self.written = 0
+        self.file.truncate(0)
+        self.file.seek(0)
+        if self.fsync != "never":
+            os.fsync(self.file.fileno())
@@ -0,0 +1,252 @@
+"""
+Henry Spink, 2/5/24
+Startup profiling file for game for applied computing 1/2
+
+Times each phase of starting the game (run `racing_game.py --profile-startup`), and a benchmark that
+starts the game cold a few times and fails if getting to the first menu frame has got slower than the saved baseline.
+The baseline is saved with the computer and Python it was made on. On a different computer the cold start is compared
+as a multiple of how long Python takes to start, and with no baseline for the backend it fails until one is saved.
+It uses the "null" graphics backend unless told otherwise, as that is the only one with a saved baseline (it runs without a display),
+to benchmark the "tk" backend save a baseline for it first on a computer with a display (`--backend tk --update-baseline`).
+Every cold start gets its own empty track cache, so it includes compiling the track like the first start after an install.
+
+e.g. `py racing_game_profile.py --runs 5` or `py racing_game_profile.py --update-baseline`
+"""
+# pylint: disable=line-too-long
+#* imports
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+from contextlib import contextmanager
+
+#* constants
+GAME: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "racing_game.py")                 # the game to start
+BASELINE: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "startup_baseline.json")      # saved cold start times
+TOLERANCE: float = 0.25     # how much slower than the baseline (as a fraction) the cold start can be before the benchmark fails
+
+#* classes
+class StartupProfile:
+    """
+    StartupProfile Class
+
+    The wall time of each phase of starting the game, measured from when the game started running
+    """
+    def __init__(self, start: float|None = None) -> None:
+        """
+        Parameters:
+            start (float|None): `time.perf_counter()` when the game started. Defaults to now
+        """
+        self.start: float = time.perf_counter() if start is None else start
+        self.phases: dict[str, float] = {}      # seconds spent in each phase, in the order they ran
+        self.marks: dict[str, float] = {}       # seconds from the start to each point in the startup
+
+    @contextmanager
+    def phase(self, name: str):
+        """
+        Times a phase of the startup, e.g. `with profile.phase("setup_screen"): ...`
+        Running the same phase again adds to its time.
+
+        Parameters:
+            name (str): name of the phase
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0) + time.perf_counter() - start
+            self.marks[name] = time.perf_counter() - self.start
+
+    def add(self, name: str, since: float) -> None:
+        """
+        Records a phase that started at `since` and has just finished.
+
+        Parameters:
+            name (str): name of the phase
+            since (float): `time.perf_counter()` when it started
+
+        Returns:
+            None
+        """
+        now = time.perf_counter()
+        self.phases[name] = self.phases.get(name, 0) + now - since
+        self.marks[name] = now - self.start
+
+    def mark(self, name: str) -> float:
+        """
+        Records how long it has been since the game started.
+
+        Parameters:
+            name (str): name of the point in the startup
+
+        Returns:
+            float: seconds since the game started
+        """
+        self.marks[name] = time.perf_counter() - self.start
+        return self.marks[name]
+
+    def report(self) -> dict:
+        """
+        The profile as plain data, for saving as JSON.
+
+        Returns:
+            dict: the phases, marks and which graphics backend was used
+        """
+        return {
+            "backend": os.environ.get("OMEGA_RACE_GRAPHICS", "tk"),
+            "python": sys.version.split()[0],
+            "phases": {name: round(seconds, 6) for name, seconds in self.phases.items()},
+            "marks": {name: round(seconds, 6) for name, seconds in self.marks.items()},
+        }
+
+    def save(self, path: str) -> None:
+        """
+        Saves the profile as JSON.
+
+        Parameters:
+            path (str): where to save it
+
+        Returns:
+            None
+        """
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.report(), file, indent=4)
+
+    def table(self) -> str:
+        """
+        The profile as a table for printing.
+
+        Returns:
+            str: the table
+        """
+        lines = [f"{'phase':<24} {'ms':>9} {'done at ms':>11}"]
+        for name, seconds in self.phases.items():
+            lines.append(f"{name:<24} {seconds * 1000:>9.1f} {self.marks[name] * 1000:>11.1f}")
+        for name, seconds in self.marks.items():
+            if name not in self.phases:
+                lines.append(f"{name:<24} {'':>9} {seconds * 1000:>11.1f}")
+        return "\n".join(lines)
+
+#* functions
+def cold_start(backend: str) -> dict:
+    """
+    Starts the game in a new process with `--profile-startup` and reads its report.
+    It runs in an empty folder with an empty track cache so it starts with no database or compiled track, like a fresh install.
+
+    Parameters:
+        backend (str): graphics backend, "tk" or "null"
+
+    Returns:
+        dict: the startup report (see `StartupProfile.report()`)
+    """
+    with tempfile.TemporaryDirectory() as folder:
+        report = os.path.join(folder, "startup_profile.json")
+        subprocess.run(
+            [sys.executable, GAME, "--profile-startup", "--profile-report", report],
+            cwd=folder,
+            env={**os.environ, "OMEGA_RACE_GRAPHICS": backend, "OMEGA_RACE_TRACK_CACHE": os.path.join(folder, "track_cache")},
+            check=True,
+            stdout=subprocess.DEVNULL
+        )
+        with open(report, encoding="utf-8") as file:
+            return json.load(file)
+
+def interpreter_start(runs: int) -> float:
+    """
+    How long Python itself takes to start and stop on this computer, to compare cold starts on computers of different speeds.
+
+    Parameters:
+        runs (int): number of starts to take the median of
+
+    Returns:
+        float: seconds, the median of the runs
+    """
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+def machine() -> dict:
+    """
+    The computer and Python the benchmark is running on, saved with the baseline.
+
+    Returns:
+        dict: the machine
+    """
+    return {
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count(),
+        "python": f"{platform.python_implementation()} {platform.python_version()}",
+    }
+
+def load_baseline(path: str = BASELINE) -> dict:
+    """
+    Loads the saved cold start times.
+
+    Parameters:
+        path (str): the baseline file
+
+    Returns:
+        dict: for each backend, {"first_menu_frame": seconds, "interpreter": seconds, "machine": dict} (see `main()`)
+    """
+    try:
+        with open(path, encoding="utf-8") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+
+def main() -> int:
+    """
+    Command line entry point, benchmarks the cold start against the baseline.
+
+    Returns:
+        int: 0 if the cold start is within the tolerance of the baseline, 1 if it has regressed, 2 if there is no baseline to compare with
+    """
+    parser = argparse.ArgumentParser(description='cold start benchmark for "omega race"')
+    parser.add_argument("--runs", type=int, default=5, help="number of cold starts to take the median of (default: 5)")
+    parser.add_argument("--backend", choices=["tk", "null"], default=os.environ.get("OMEGA_RACE_GRAPHICS", "null"), help="graphics backend to start the game with (default: null, the only one with a saved baseline)")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help=f"fraction slower than the baseline allowed (default: {TOLERANCE})")
+    parser.add_argument("--baseline", default=BASELINE, help="baseline file (default: startup_baseline.json)")
+    parser.add_argument("--update-baseline", action="store_true", help="save this run as the new baseline")
+    args = parser.parse_args()
+
+    reports = [cold_start(args.backend) for _ in range(args.runs)]
+    median = statistics.median(report["marks"]["first_menu_frame"] for report in reports)
+    for name in reports[0]["phases"]:
+        print(f"{name:<24} {statistics.median(report['phases'][name] for report in reports) * 1000:>9.1f} ms")
+    print(f"{'first_menu_frame':<24} {median * 1000:>9.1f} ms (median of {args.runs} cold starts, {args.backend})")
+
+    interpreter = interpreter_start(args.runs)
+    baseline = load_baseline(args.baseline)
+    if args.update_baseline:
+        baseline[args.backend] = {"first_menu_frame": round(median, 6), "interpreter": round(interpreter, 6), "machine": machine()}
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump(baseline, file, indent=4)
+        print(f"baseline saved to {args.baseline}")
+        return 0
+    saved = baseline.get(args.backend)
+    if not isinstance(saved, dict):             # missing, or saved before the machine was
+        print(f"no baseline for the {args.backend!r} backend in {args.baseline}, run again with --update-baseline to save one", file=sys.stderr)
+        return 2
+    if saved["machine"] == machine():
+        taken, allowed, unit = median, saved["first_menu_frame"], "ms"
+    else:                                       # a different computer, compare against how long Python takes to start on each
+        print(f"the baseline was saved on a different machine ({saved['machine']['platform']}, {saved['machine']['python']}), comparing against Python's own start up time")
+        taken, allowed, unit = median / interpreter, saved["first_menu_frame"] / saved["interpreter"], "x python"
+    scale = 1000 if unit == "ms" else 1
+    if taken > allowed * (1 + args.tolerance):
+        print(f"REGRESSION: {taken * scale:.1f} {unit} is slower than the baseline {allowed * scale:.1f} {unit} (+{args.tolerance:.0%})")
+        return 1
+    print(f"ok: {taken * scale:.1f} {unit}, baseline {allowed * scale:.1f} {unit} (+{args.tolerance:.0%} allowed)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,673 @@
+"""
+Henry Spink, 2/5/24
+Rendering file for game for applied computing 1/2
+
+Retained-mode drawing on the turtle canvas. Turtle's `clear()`, `stamp()` and `write()` delete and remake every canvas item
+each frame, the classes in here make their canvas items once and after that only move or change them
+"""
+# pylint: disable=line-too-long,protected-access
+#* imports
+import math
+import time as timer
+import turtle
+import itertools
+import dataclasses
+from typing import Callable
+from racing_game_constants import SCR, new_turtle
+
+#* constants
+ANCHORS: dict[str, str] = {"left": "sw", "center": "s", "right": "se"}    # canvas anchor for each `turtle.write()` alignment
+SPEED_RANGE: int = 300          # fastest speed on the speedometer dial ("kmph")
+DEGREES_PER_KMPH: float = 0.6   # how far the needle turns for each "kmph", 300 "kmph" is half a turn
+
+#* functions
+def _tcl_word(value) -> str:
+    """
+    Quotes a value so Tcl reads it as one word, by putting a backslash before anything Tcl treats specially.
+    Tuples and lists are turned into a Tcl list first.
+
+    Parameters:
+        value (Any): the value
+
+    Returns:
+        str: the quoted word
+    """
+    if isinstance(value, (tuple, list)):
+        value = " ".join(_tcl_word(part) for part in value)
+    text = str(value)
+    if not text:
+        return "{}"
+    return "".join("\\n" if char == "\n" else "\\" + char if char in ' \t\\{}[]$";' else char for char in text)
+
+#* classes
+class SpriteItems:
+    """
+    SpriteItems Class
+
+    The canvas polygons that draw one sprite, one for each component of its turtle shape.
+    They are made the first time the sprite is drawn and moved to the sprite's position every frame after that,
+    the polygons are only changed when the sprite's shape, colour or size changes
+    """
+    def __init__(self, screen: turtle.TurtleScreen = SCR) -> None:
+        """
+        define variables - nothing is put on the canvas until the sprite is first drawn
+
+        Parameters:
+            screen (turtle.TurtleScreen): the screen to draw on. Defaults to the game window
+        """
+        self.screen = screen
+        self.items: list[int] = []                              # canvas ids of the polygons
+        self.parts: list[tuple[list[float], list[float]]] = []  # the (x, y) points of each polygon, scaled to the sprite's size
+        self.key: tuple|None = None                             # (shape, colour, size) the polygons are set up for
+        self.pose: tuple[float, float, float]|None = None       # (x, y, heading) the polygons were last moved to
+        self.visible: bool = False                              # whether the polygons are showing
+
+    def _colour(self, colour) -> str:
+        """
+        Converts a colour to a string Tk understands, the same way turtle does for stamps.
+
+        Parameters:
+            colour (str|tuple): a colour name or an (r, g, b) tuple
+
+        Returns:
+            str: the colour
+        """
+        return colour if isinstance(colour, str) else self.screen._colorstr(colour)
+
+    def _setup(self, shape: turtle.Shape, colour: str, size: float) -> None:
+        """
+        Makes or reuses a polygon for each component of the shape and sets its colours.
+        Polygon shapes use the sprite's colour, compound shapes have their own colours like with `stamp()`.
+
+        Parameters:
+            shape (turtle.Shape): the registered turtle shape
+            colour (str): the colour of the sprite
+            size (float): the size of the sprite
+
+        Returns:
+            None
+        """
+        canvas = self.screen.cv
+        if shape._type == "compound":
+            components = [(poly, self._colour(fill), self._colour(outline)) for poly, fill, outline in shape._data]
+        else:
+            components = [(shape._data, self._colour(colour), self._colour(colour))]
+        while len(self.items) < len(components):
+            self.items.append(POOL.polygon(self.screen))
+        while len(self.items) > len(components):
+            POOL.release(self.items.pop(), self.screen)
+        self.parts = []
+        for item, (poly, fill, outline) in zip(self.items, components):
+            canvas.itemconfigure(item, fill=fill, outline=outline, width=1)
+            canvas.tag_raise(item)
+            self.parts.append(([x * size for x, _ in poly], [y * size for _, y in poly]))
+        self.pose = None
+
+    def draw(self, shape: str, colour: str, size: float, x: float, y: float, heading: float) -> None:
+        """
+        Draws the sprite, the same as a turtle stamp with `shapesize(size)` at the position and heading.
+        Only moves the polygons if the sprite has moved, so sprites that sit still cost nothing to draw.
+
+        Parameters:
+            shape (str): name of the registered turtle shape
+            colour (str): colour of the sprite
+            size (float): size of the sprite
+            x (float): x coordinate of the sprite
+            y (float): y coordinate of the sprite
+            heading (float): heading of the sprite in degrees
+
+        Returns:
+            None
+        """
+        registered = self.screen._shapes[shape]
+        key = (registered, colour, size)            # the registered shape object changes if the shape is registered again
+        if key != self.key:
+            self._setup(registered, colour, size)
+            self.key = key
+        canvas = self.screen.cv
+        if not self.visible:
+            for item in self.items:
+                canvas.itemconfigure(item, state="normal")
+                canvas.tag_raise(item)
+            self.visible = True
+        if (x, y, heading) == self.pose:
+            return
+        self.pose = (x, y, heading)
+        # same maths as `turtle.RawTurtle._polytrafo()`, with the y axis flipped for the canvas
+        xscale, yscale = self.screen.xscale, self.screen.yscale
+        e0 = math.cos(math.radians(heading))
+        e1 = math.sin(math.radians(heading)) * yscale / xscale
+        length = math.hypot(e0, e1)
+        e0, e1 = e0 / length, e1 / length
+        cx, cy = x * xscale, -y * yscale
+        for item, (xs, ys) in zip(self.items, self.parts):
+            coords = []
+            for px, py in zip(xs, ys):
+                coords.append(cx + e1 * px + e0 * py)
+                coords.append(cy + e0 * px - e1 * py)
+            canvas.coords(item, coords)
+
+    def hide(self) -> None:
+        """
+        Hides the sprite without deleting its polygons, so showing it again is cheap.
+
+        Returns:
+            None
+        """
+        if self.visible:
+            for item in self.items:
+                self.screen.cv.itemconfigure(item, state="hidden")
+            self.visible = False
+
+    def clear(self) -> None:
+        """
+        Gives the sprite's polygons back to the pool, they are borrowed again the next time it is drawn.
+
+        Returns:
+            None
+        """
+        for item in self.items:
+            POOL.release(item, self.screen)
+        self.items = []
+        self.parts = []
+        self.key = None
+        self.pose = None
+        self.visible = False
+
+class HudText:
+    """
+    HudText Class
+
+    One piece of text on the heads up display, kept as a single canvas text item that is only changed when its text changes.
+    It can also be given a refresh interval, so a value that changes every frame (like a timer) is only redrawn a few times a second
+    """
+    def __init__(
+            self,
+            x: float,
+            y: float,
+            align: str = "left",
+            font: tuple = ("Arial", 8, "normal"),
+            colour: str = "white",
+            interval: float = 0,
+            screen: turtle.TurtleScreen = SCR
+        ) -> None:
+        """
+        Parameters:
+            x (float): x coordinate of the text, the same as where a turtle would `write()` it from
+            y (float): y coordinate of the text
+            align (str): "left", "center" or "right", the same as `turtle.write()`
+            font (tuple): (name, size, type) of the font
+            colour (str): colour of the text
+            interval (float): shortest time between redraws in seconds, 0 to redraw whenever the text changes
+            screen (turtle.TurtleScreen): the screen to draw on. Defaults to the game window
+        """
+        self.x = x
+        self.y = y
+        self.align = align
+        self.font = font
+        self.colour = colour
+        self.interval = interval
+        self.screen = screen
+        self.item: int|None = None      # canvas id of the text
+        self.text: str|None = None      # text currently on the canvas
+        self.next_refresh: float = 0    # earliest time the text can be redrawn
+
+    def set(self, value: str|int|Callable[[], str], now: float|None = None) -> bool:
+        """
+        Changes the text, only touching the canvas if it is different to what is already showing.
+
+        Parameters:
+            value (str|int|Callable[[], str]): the new text, or a function that makes it (only called when the field is due a refresh)
+            now (float|None): the current time in seconds from `time.perf_counter()`, looked up if not given
+
+        Returns:
+            bool: True if the canvas was changed, else False
+        """
+        if self.interval:
+            now = timer.perf_counter() if now is None else now
+            if now < self.next_refresh:
+                return False
+            self.next_refresh = now + self.interval
+        text = value() if callable(value) else str(value)
+        if text == self.text:
+            return False
+        canvas = self.screen.cv
+        if self.item is None:   # placed the same way as `turtle.TurtleScreenBase._write()`
+            self.item = canvas.create_text((self.x * self.screen.xscale - 1, -self.y * self.screen.yscale), text=text, anchor=ANCHORS[self.align], fill=self.colour, font=self.font)
+        else:
+            canvas.itemconfigure(self.item, text=text)
+        self.text = text
+        return True
+
+    def clear(self) -> None:
+        """
+        Deletes the text from the canvas, it is made again the next time it is set.
+
+        Returns:
+            None
+        """
+        if self.item is not None:
+            self.screen.cv.delete(self.item)
+        self.item = None
+        self.text = None
+        self.next_refresh = 0
+
+class Needle:
+    """
+    Needle Class
+
+    The needle of a speedometer, kept as a single canvas line from the middle of the dial.
+    The end of the line for every whole speed on the dial is worked out once up front,
+    so moving the needle is a lookup and one `coords()` call, and only happens when the speed changes
+    """
+    def __init__(
+            self,
+            x: float,
+            y: float,
+            length: float = 80,
+            colour: str = "red",
+            width: float = 4,
+            screen: turtle.TurtleScreen = SCR
+        ) -> None:
+        """
+        Parameters:
+            x (float): x coordinate of the middle of the dial
+            y (float): y coordinate of the middle of the dial
+            length (float): length of the needle
+            colour (str): colour of the needle
+            width (float): width of the needle
+            screen (turtle.TurtleScreen): the screen to draw on. Defaults to the game window
+        """
+        self.colour = colour
+        self.width = width
+        self.screen = screen
+        self.item: int|None = None      # canvas id of the line
+        self.speed: int|None = None     # speed the needle is pointing at
+        # canvas coordinates of the needle for each speed, 0 points left and `SPEED_RANGE` points right
+        cx, cy = x * screen.xscale, -y * screen.yscale
+        self.table: list[tuple[float, float, float, float]] = []
+        for speed in range(SPEED_RANGE + 1):
+            angle = math.radians(180 - speed * DEGREES_PER_KMPH)
+            self.table.append((cx, cy, cx + length * math.cos(angle) * screen.xscale, cy - length * math.sin(angle) * screen.yscale))
+
+    def set(self, speed: float, now: float|None = None) -> bool:  # pylint: disable=unused-argument
+        """
+        Points the needle at a speed, only touching the canvas if the whole number speed has changed.
+
+        Parameters:
+            speed (float): the speed, kept inside the dial
+            now (float|None): unused, so the needle can be set the same way as a `HudText`
+
+        Returns:
+            bool: True if the canvas was changed, else False
+        """
+        speed = min(max(int(speed), 0), SPEED_RANGE)
+        if speed == self.speed:
+            return False
+        canvas = self.screen.cv
+        if self.item is None:   # same style as a line drawn by a turtle
+            self.item = canvas.create_line(self.table[speed], fill=self.colour, width=self.width, capstyle="round")
+        else:
+            canvas.coords(self.item, self.table[speed])
+        self.speed = speed
+        return True
+
+    def clear(self) -> None:
+        """
+        Deletes the needle from the canvas, it is made again the next time it is set.
+
+        Returns:
+            None
+        """
+        if self.item is not None:
+            self.screen.cv.delete(self.item)
+        self.item = None
+        self.speed = None
+
+class Hud:
+    """
+    Hud Class
+
+    All the text and needles on the heads up display, by name
+    """
+    def __init__(self) -> None:
+        self.fields: dict[str, HudText|Needle] = {}
+
+    def add(self, name: str, field: HudText|Needle) -> HudText|Needle:
+        """
+        Adds a piece of text or a needle to the display.
+
+        Parameters:
+            name (str): name to look it up by
+            field (HudText|Needle): the text or needle
+
+        Returns:
+            HudText|Needle: the text or needle
+        """
+        self.fields[name] = field
+        return field
+
+    def __getitem__(self, name: str) -> HudText|Needle:
+        return self.fields[name]
+
+    def clear(self) -> None:
+        """
+        Deletes all of the text and needles from the canvas, e.g. when the screen is cleared for a new game.
+
+        Returns:
+            None
+        """
+        for field in self.fields.values():
+            field.clear()
+
+class DisplayList:
+    """
+    DisplayList Class
+
+    Everything a turtle drew on the canvas in one go, saved as a single Tcl script.
+    The first time it is drawn the turtle draws as normal and the canvas items it made are recorded,
+    after that playing the script back makes all of the items again in one call to Tk instead of the thousands of turtle moves it took
+    """
+    _ids = itertools.count()
+
+    def __init__(self, turtl: turtle.RawTurtle) -> None:
+        """
+        Parameters:
+            turtl (turtle.RawTurtle): the turtle that does the drawing
+        """
+        self.turtle = turtl
+        self.tag: str = f"display_list_{next(self._ids)}"   # canvas tag on every item made by playing the script back
+        self.script: str|None = None                        # Tcl commands that make the items, None until recorded
+        self.count: int = 0                                 # number of canvas items in the script
+        self.state: tuple|None = None                       # (position, heading, pen) of the turtle after drawing
+
+    def draw(self, function: Callable[[], None]) -> None:
+        """
+        Draws the display list, recording it with `function` the first time.
+
+        Parameters:
+            function (Callable[[], None]): draws everything with the turtle
+
+        Returns:
+            None
+        """
+        if self.script is None:
+            self.record(function)
+        else:
+            self.replay()
+
+    @staticmethod
+    def _owned(t: turtle.RawTurtle) -> set[int]:
+        """
+        Every canvas item a turtle owns, its lines, fills, text and stamps.
+
+        Parameters:
+            t (turtle.RawTurtle): the turtle
+
+        Returns:
+            set[int]: the canvas ids
+        """
+        owned = {item for item in t.items if isinstance(item, int)}
+        for stamp in t.stampItems:                      # compound shapes stamp a tuple of polygons
+            owned.update(stamp if isinstance(stamp, tuple) else (stamp,))
+        return owned
+
+    def record(self, function: Callable[[], None]) -> None:
+        """
+        Draws with the turtle and saves every canvas item it made as a Tcl command.
+        Only items made by this turtle are saved, anything `function` draws with other turtles is left to be drawn every time.
+
+        Parameters:
+            function (Callable[[], None]): draws everything with the turtle
+
+        Returns:
+            None
+        """
+        t = self.turtle
+        canvas = t.screen.cv
+        before = self._owned(t)
+        first_line = t.currentLineItem                  # turtle keeps drawing into the line it already had
+        function()
+        t._newLine()                                    # finish the last line so it is on the canvas
+        items = sorted((self._owned(t) - before) | {first_line})     # in the order they were made, so they overlap the same way
+        commands = []
+        for item in items:
+            if item == t.currentLineItem:               # empty line turtle will draw into next
+                continue
+            kind = canvas.type(item)
+            coords = canvas.coords(item)
+            if not kind or (kind == "line" and len(coords) < 4):
+                continue
+            options = []
+            for name, config in canvas.itemconfigure(item).items():
+                default, value = config[3], config[4]
+                if name != "tags" and str(value) != str(default):
+                    options.append(f"-{name} {_tcl_word(value)}")
+            commands.append(f"{canvas._w} create {kind} {' '.join(str(coord) for coord in coords)} {' '.join(options)} -tags {self.tag}")
+        self.script = "\n".join(commands)
+        self.count = len(commands)
+        self.state = (t.position(), t.heading(), t.pen())
+
+    def replay(self) -> None:
+        """
+        Makes all of the recorded canvas items again in one Tcl call and puts the turtle back how it was left after drawing.
+        The turtle owns the new items, so `clear()` on the turtle still deletes them.
+
+        Returns:
+            None
+        """
+        t = self.turtle
+        if self.script:
+            t.screen.cv.tk.eval(self.script)
+            t.items.append(self.tag)                    # `clear()` deletes by tag as well as by id
+        position, heading, pen = self.state
+        t.penup()
+        t.goto(position)
+        t.setheading(heading)
+        t.pen(pen)
+
+@dataclasses.dataclass
+class DrawCost:
+    """
+    How many times a screen has been drawn and how long it took
+    """
+    recorded: int = 0           # times it was drawn with the turtle
+    replayed: int = 0           # times it was played back from a display list
+    record_time: float = 0      # total seconds spent drawing with the turtle
+    replay_time: float = 0      # total seconds spent playing back
+    items: int = 0              # canvas items in the last display list
+
+class ScreenCache:
+    """
+    ScreenCache Class
+
+    Display lists for the screens of the game, by the name of the screen and everything the screen depends on.
+    A screen is drawn with the turtle the first time and played back after that, until its parameters change.
+    It also times every draw, so it is the one place to see what each screen costs to draw
+    """
+    def __init__(self, limit: int = 16) -> None:
+        """
+        Parameters:
+            limit (int): most display lists to keep, the least recently drawn is dropped first
+        """
+        self.limit = limit
+        self.lists: dict[tuple, DisplayList] = {}   # display lists by (screen, parameters), least recently drawn first
+        self.costs: dict[str, DrawCost] = {}        # draw costs by screen
+
+    def draw(self, screen: str, params: tuple, turtl: turtle.RawTurtle, function: Callable[[], None]) -> None:
+        """
+        Draws a screen, from its display list if it has been drawn with the same parameters before.
+
+        Parameters:
+            screen (str): name of the screen
+            params (tuple): everything that changes what the screen looks like
+            turtl (turtle.RawTurtle): the turtle that draws the screen
+            function (Callable[[], None]): draws the screen with the turtle
+
+        Returns:
+            None
+        """
+        key = (screen, params)
+        display = self.lists.pop(key, None)
+        if display is not None and display.turtle is not turtl:
+            display = None
+        display = display or DisplayList(turtl)
+        self.lists[key] = display                   # most recently drawn last
+        while len(self.lists) > self.limit:
+            del self.lists[next(iter(self.lists))]
+        cost = self.costs.setdefault(screen, DrawCost())
+        recording = display.script is None
+        start = timer.perf_counter()
+        display.draw(function)
+        taken = timer.perf_counter() - start
+        if recording:
+            cost.recorded += 1
+            cost.record_time += taken
+        else:
+            cost.replayed += 1
+            cost.replay_time += taken
+        cost.items = display.count
+
+    def invalidate(self, screen: str|None = None) -> None:
+        """
+        Forgets the display lists of a screen so it is drawn with the turtle next time.
+
+        Parameters:
+            screen (str|None): name of the screen, or None for every screen
+
+        Returns:
+            None
+        """
+        for key in [key for key in self.lists if screen is None or key[0] == screen]:
+            del self.lists[key]
+
+    def report(self) -> str:
+        """
+        A table of how long each screen has taken to draw.
+
+        Returns:
+            str: the table
+        """
+        lines = [f"{'screen':<16} {'items':>6} {'recorded':>9} {'avg ms':>8} {'replayed':>9} {'avg ms':>8}"]
+        for screen, cost in sorted(self.costs.items()):
+            record_ms = cost.record_time / cost.recorded * 1000 if cost.recorded else math.nan
+            replay_ms = cost.replay_time / cost.replayed * 1000 if cost.replayed else math.nan
+            lines.append(f"{screen:<16} {cost.items:>6} {cost.recorded:>9} {record_ms:>8.2f} {cost.replayed:>9} {replay_ms:>8.2f}")
+        return "\n".join(lines)
+
+class Pool:
+    """
+    Pool Class
+
+    Turtles and canvas polygons that are lent out and reused instead of being made again.
+    Turtles are only made the first time a sprite needs one and polygons given back are hidden and kept,
+    so restarting the game never adds to the number of turtles or canvas items
+    """
+    def __init__(self, screen: turtle.TurtleScreen = SCR) -> None:
+        """
+        Parameters:
+            screen (turtle.TurtleScreen): the screen the turtles and polygons are on. Defaults to the game window
+        """
+        self.screen = screen
+        self.turtles: list[turtle.RawTurtle] = []   # turtles that have been given back
+        self.polygons: list[int] = []               # canvas ids of polygons that have been given back
+        self.made_turtles: int = 0                  # number of turtles ever made
+        self.made_polygons: int = 0                 # number of polygons ever made
+
+    def borrow(self) -> turtle.RawTurtle:
+        """
+        Lends out a hidden turtle with its pen up.
+
+        Returns:
+            turtle.RawTurtle: the turtle
+        """
+        if self.turtles:
+            return self.turtles.pop()
+        self.made_turtles += 1
+        t = new_turtle()
+        self.reset(t)
+        return t
+
+    def reset(self, t: turtle.RawTurtle) -> None:
+        """
+        Puts a turtle back to a blank state, deleting what it has drawn, without making a new one.
+
+        Parameters:
+            t (turtle.RawTurtle): the turtle
+
+        Returns:
+            None
+        """
+        t.clear()
+        t.hideturtle()
+        t.penup()
+
+    def give_back(self, t: turtle.RawTurtle) -> None:
+        """
+        Takes back a turtle to lend out again.
+
+        Parameters:
+            t (turtle.RawTurtle): the turtle
+
+        Returns:
+            None
+        """
+        self.reset(t)
+        self.turtles.append(t)
+
+    def polygon(self, screen: turtle.TurtleScreen|None = None) -> int:
+        """
+        Lends out an empty canvas polygon.
+
+        Parameters:
+            screen (turtle.TurtleScreen|None): the screen it is for. Defaults to the pool's screen
+
+        Returns:
+            int: canvas id of the polygon
+        """
+        if screen in (None, self.screen) and self.polygons:
+            return self.polygons.pop()
+        self.made_polygons += 1
+        return (screen or self.screen).cv.create_polygon((0, 0, 0, 0, 0, 0), fill="", outline="")
+
+    def release(self, item: int, screen: turtle.TurtleScreen|None = None) -> None:
+        """
+        Takes back a canvas polygon, hiding it until it is lent out again.
+
+        Parameters:
+            item (int): canvas id of the polygon
+            screen (turtle.TurtleScreen|None): the screen it is on. Defaults to the pool's screen
+
+        Returns:
+            None
+        """
+        if screen not in (None, self.screen):   # only polygons on the pool's screen are kept
+            screen.cv.delete(item)
+            return
+        self.screen.cv.itemconfigure(item, state="hidden")
+        self.polygons.append(item)
+
+    def live_items(self) -> int:
+        """
+        The number of items on the canvas, for checking nothing is leaking.
+
+        Returns:
+            int: the number of canvas items
+        """
+        return len(self.screen.cv.find_all())
+
+    def report(self) -> str:
+        """
+        A summary of the pool and the canvas.
+
+        Returns:
+            str: the summary
+        """
+        return (
+            f"turtles made: {self.made_turtles} ({len(self.turtles)} free), "
+            f"polygons made: {self.made_polygons} ({len(self.polygons)} free), "
+            f"live canvas items: {self.live_items()}"
+        )
+
+SCREENS = ScreenCache()     # display lists for every screen of the game
+POOL = Pool()               # turtles and polygons lent out to the sprites
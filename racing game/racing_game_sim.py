@@ -0,0 +1,959 @@
+"""
+Henry Spink, 2/5/24
+Headless simulation file for game for applied computing 1/2
+
+Owns the car state, physics, track checks and lap scoring.
+Nothing in here imports turtle/tkinter, so races can be run without a display
+"""
+# pylint: disable=line-too-long
+#* imports
+import re
+import dataclasses
+import math
+from typing import Callable
+from racing_game_track import TRACK, CompiledTrack, resolve_track
+
+#* constants
+SCREEN_WIDTH: int = 1920    # default width of the game window, used for the screen edge collision
+SCREEN_HEIGHT: int = 1080   # default height of the game window, used for the screen edge collision
+TICK_RATE: int = 240        # default number of simulation ticks per second
+MAX_LAG: float = 0.25       # most seconds of game time simulated in one frame, anything longer (e.g. dragging the window) is dropped
+RENDER_RATE: int = 60       # default maximum number of frames drawn per second
+GRASS_DRAG: float = 20      # most speed lost per reference frame on the grass
+GRASS_DEPTH: float = 25     # distance (pixels) onto the grass where the full drag is reached
+REFERENCE_DT: float = 1/60  # length of the frame (in seconds) that the movement constants were tuned for
+COIN_RESPAWN: float = 750 * REFERENCE_DT    # seconds of game time after the last coin was spawned before they come back
+DURATION = re.compile(r"\s*(?:(\d+) days?,? )?(\d+):(\d+):(\d+)(?:\.(\d{1,9}))?\s*")   # "[d day[s][,] ]h:mm:ss[.fff...]"
+
+#* classes
+#?   dataclasses
+@dataclasses.dataclass
+class SpriteAttributes:
+    """
+    defines some visual properties of the sprite
+    """
+    size: float         # size of the sprite
+    color: str          # colour of the sprite
+    shape: str          # shape of the sprite
+    sprite: str         # the sprite of the sprite
+    collision: bool     # whether collision is enabled for the sprite
+
+@dataclasses.dataclass
+class _PlayerScore:
+    """
+    timer and lap counter for the player
+    """
+    total_laps: int             # amount of laps required for a player to win
+    timer: int                  # unused
+    laps: int                   # number of laps completed
+    won: bool                   # whether the player has won or not
+    pos: str                    # position (1st, 2nd, draw)
+    collisions: int             # number of collisions with the other player
+    colliding: bool             # if the player is currently colliding with the other player
+    coins: int                  # number of coins collected
+    lap_markers: list[bool]     # which of the track's checkpoints have been passed this lap
+
+@dataclasses.dataclass
+class Handling:
+    """
+    tuning values for how a car drives, the defaults are the values the game was tuned with
+    """
+    accel: int = 3                      # acceleration factor on the track
+    fast_accel: int = 2                 # acceleration factor on the track once the car is going fast
+    fast_after: int = 500               # `time_accel` (frames of accelerating) where the car counts as going fast
+    grass_accel: int = 1                # acceleration factor on the grass
+    grass_drag: float = GRASS_DRAG      # most speed lost per reference frame on the grass
+    grass_depth: float = GRASS_DEPTH    # distance (pixels) onto the grass where the full drag is reached
+
+@dataclasses.dataclass
+class _Movement:
+    """
+    movement properties for the player
+    """
+    rotating_left: bool     # ----------
+    rotating_right: bool    # keybind properties
+    accelerating: bool      # to define where the player should move
+    decel: bool             # ----------
+    timer: int              # unused
+    time_accel: int         # amount of time the player has been accelerating for (pos direction)
+    time_decel: int         # amount of time the player has been decelerating for (neg direction)
+    accel: int              # acceleration factor
+
+@dataclasses.dataclass
+class _Timer:
+    """
+    extra timing properties, all times are nanoseconds on the car's `SimClock`
+    """
+    start_time: int     # clock reading at the start of the lap
+    end_time: int       # clock reading at the end of the last lap
+    lap_time: int       # time taken so far on the current lap
+    laps: list[int]     # list of all the lap times (index is lap number)
+
+#?   functions
+def off_track(x: float, y: float) -> bool:
+    """
+    Checks if a point is on the main race track or not, using the precomputed track grid.
+
+    Parameters:
+        x (float): x coordinate of the point
+        y (float): y coordinate of the point
+
+    Returns:
+        True if the point is off the track, else False.
+    """
+    return TRACK.off_track(x, y)
+
+def grass_drag(distance: float, drag: float = GRASS_DRAG, depth: float = GRASS_DEPTH) -> float:
+    """
+    How much speed a car loses per reference frame on the grass.
+    Just over the edge of the track barely slows the car down, the drag builds up to `drag` by `depth` pixels in.
+
+    Parameters:
+        distance (float): signed distance from the edge of the track (positive on the grass)
+        drag (float): the most drag. Defaults to `GRASS_DRAG`
+        depth (float): distance onto the grass where the most drag is reached. Defaults to `GRASS_DEPTH`
+
+    Returns:
+        float: the drag
+    """
+    return drag * min(1.0, max(0.0, distance) / depth)
+
+def format_time(ns: int) -> str:
+    """
+    Formats a time from the simulation clock for display, like `str(datetime.timedelta)` cut down to milliseconds.
+
+    Parameters:
+        ns (int): the time in nanoseconds
+
+    Returns:
+        str: the time in the format 'h:mm:ss.mmm'
+    """
+    ms = ns // 1_000_000
+    minutes, ms = divmod(ms, 60_000)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02}:{ms // 1000:02}.{ms % 1000:03}"
+
+def format_duration(ns: int) -> str:
+    """
+    Formats a time for saving in the database, in the same format pandas writes timedeltas in ('0 days 00:01:02.345000'),
+    so times saved by older versions of the game sort and display the same way.
+
+    Parameters:
+        ns (int): the time in nanoseconds
+
+    Returns:
+        str: the time in the format 'd days hh:mm:ss.ffffff'
+    """
+    us = ns // 1000
+    seconds, us = divmod(us, 1_000_000)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    days, hours = divmod(hours, 24)
+    return f"{days} days {hours:02}:{minutes:02}:{seconds:02}.{us:06}"
+
+def parse_duration(text: str) -> int:
+    """
+    Reads a time saved in the database or shown on screen.
+    Understands the pandas format ('0 days 00:01:02.345000'), `str(datetime.timedelta)` ('1 day, 0:01:02.345000')
+    and `format_time()` ('0:01:02.345').
+
+    Parameters:
+        text (str): the time
+
+    Returns:
+        int: the time in nanoseconds
+
+    Raises:
+        ValueError: if the text isn't a time (e.g. "None")
+    """
+    if len(text) == 22 and text.startswith("0 days "):      # fast path, how every time in the database is saved
+        try:
+            return (int(text[7:9]) * 3600 + int(text[10:12]) * 60 + int(text[13:15])) * 1_000_000_000 + int(text[16:22]) * 1000
+        except ValueError:
+            pass
+    match = DURATION.fullmatch(text)
+    if match is None:
+        raise ValueError(f"not a time: {text!r}")
+    days, hours, minutes, seconds, fraction = match.groups()
+    total = ((int(days or 0) * 24 + int(hours)) * 60 + int(minutes)) * 60 + int(seconds)
+    return total * 1_000_000_000 + int((fraction or "").ljust(9, "0"))
+
+def positions(cars: list["Car"]) -> None:
+    """
+    Works out the race position of every car from the number of laps completed.
+    Cars on the same number of laps share a position, and if every car is on the same lap they are all drawing.
+
+    Parameters:
+        cars (list[Car]): the cars in the race
+
+    Returns:
+        None
+    """
+    if len({car.score.laps for car in cars}) <= 1:
+        for car in cars:
+            car.score.pos = "Draw"
+        return
+    suffixes = {1: "st", 2: "nd", 3: "rd"}
+    for car in cars:
+        place = 1 + sum(1 for other in cars if other.score.laps > car.score.laps)
+        suffix = "th" if 10 <= place % 100 <= 20 else suffixes.get(place % 10, "th")
+        car.score.pos = f"{place}{suffix}"
+
+#?   object classes
+class SimClock:
+    """
+    SimClock Class
+
+    Monotonic clock that only moves when the simulation is stepped, so it stops while the game is paused
+    and runs as fast as the simulation does in headless runs. Time is kept as whole nanoseconds
+    """
+    def __init__(self) -> None:
+        self.ns: int = 0    # simulated time since the clock was reset
+
+    def advance(self, dt: float) -> None:
+        """
+        Move the clock forwards by one tick.
+
+        Parameters:
+            dt (float): length of the tick in seconds
+
+        Returns:
+            None
+        """
+        self.ns += round(dt * 1_000_000_000)
+
+    def reset(self) -> None:
+        """
+        Set the clock back to zero.
+
+        Returns:
+            None
+        """
+        self.ns = 0
+
+class Body:
+    """
+    Body Class
+
+    Headless state of a sprite: position, speed, heading and collision with the edge of the screen
+    """
+    def __init__(
+            self,
+            x: float = 0,
+            y: float = 0,
+            heading: float = 90,
+            attributes: SpriteAttributes = SpriteAttributes(
+                                                size=1.0,
+                                                color="white",
+                                                shape="square",
+                                                sprite="square",
+                                                collision=True
+                                                )
+        ):
+        """
+        define variables
+        """
+        self.x = x
+        self.y = y
+        self.dx = 0
+        self.dy = 0
+        self.heading = heading
+        self.attr = attributes
+        self.active = True
+        self.bounds: tuple[float, float] = (SCREEN_WIDTH, SCREEN_HEIGHT)   # (width, height) of the screen the body is kept inside
+        self.prev: tuple[float, float, float] = (x, y, heading)            # (x, y, heading) before the last tick, used to interpolate between ticks when drawing
+
+    def snapshot(self) -> None:
+        """
+        Remembers the current position and heading as the previous state, called at the start of every tick.
+
+        Returns:
+            None
+        """
+        self.prev = (self.x, self.y, self.heading)
+
+    def pose(self, alpha: float = 1.0) -> tuple[float, float, float]:
+        """
+        The position and heading of the body part way between the previous tick and the current one.
+
+        Parameters:
+            alpha (float): how far between the previous state (0) and the current state (1) to go. Defaults to 1
+
+        Returns:
+            tuple[float, float, float]: the interpolated (x, y, heading)
+        """
+        px, py, ph = self.prev
+        return (
+            px + (self.x - px) * alpha,
+            py + (self.y - py) * alpha,
+            ph + (self.heading - ph) * alpha
+        )
+
+    def update(self, dt: float = REFERENCE_DT) -> None:
+        """
+        Updates the location and speed of the body.
+
+        This method is responsible for updating the position of the body based on its current speed (dx, dy).
+        It also performs collision detection and handles collisions with the edges of the screen.
+
+        Parameters:
+            dt (float): length of the tick in seconds. Defaults to `REFERENCE_DT`
+
+        Returns:
+            None
+        """
+        self.snapshot()
+        # movement
+        self.x += self.dx * (dt / REFERENCE_DT)
+        self.y += self.dy * (dt / REFERENCE_DT)
+        # collision detection
+        collided, where = self._check_collision()
+        if collided:
+            match where:
+                case "top":         # collision with top of screen
+                    self.y = 450
+                case "bottom":      # collision with bottom of screen
+                    self.y = -450
+                case "right":       # collision with right side of screen
+                    self.x = 900
+                case "left":        # collision with left side of screen
+                    self.x = -900
+                case _:
+                    pass
+
+    def _check_collision(self) -> tuple[bool, str|None]:
+        """
+        check if body is off the screen
+
+        returns a tuple of (True, "top"|"bottom"|"left"|"right") if colliding
+        or a tuple of (False, "nowhere") if not colliding
+        or a tuple of (False, None) if collision is not enabled for the body
+        """
+        width, height = self.bounds
+        if self.attr.collision:
+            if self.x > (width/2) - (22*self.attr.size):     # right border
+                return (True, "right")
+            if self.x < (width/-2) + (22*self.attr.size):    # left border
+                return (True, "left")
+            if self.y > (height/2) - (22*self.attr.size):    # top border
+                return (True, "top")
+            if self.y < (height/-2) + (22*self.attr.size):   # bottom border
+                return (True, "bottom")
+            return (False, "nowhere")
+        return (False, None)
+
+class Car(Body):
+    """
+    Car Class
+
+    Child class of 'Body', the headless state and physics of a player's car
+    """
+    def __init__(
+            self,
+            x: float = 0,
+            y: float = 0,
+            heading: float = 90,
+            attributes: SpriteAttributes = SpriteAttributes(
+                                                size=1.0,
+                                                color="white",
+                                                shape="circle",
+                                                sprite="circle",
+                                                collision=True
+                                            ),
+            name: str = "PLAYER ONE",
+            num: int = 1,
+            track: CompiledTrack = TRACK,
+            clock: SimClock|None = None,
+            handling: Handling|None = None
+            ) -> None:
+        super().__init__(x=x, y=y, heading=heading, attributes=attributes)
+        self.track = resolve_track(track)                           # the track the car is racing on, loaded now so every tick uses it directly
+        self.clock = clock if clock is not None else SimClock()     # clock used for lap times, shared by every car in a race
+        self.handling = handling if handling is not None else Handling()   # acceleration and grass tuning
+        self.spawn: tuple[float, float, float] = (x, y, heading)   # starting position, used when the car is reset
+        self.score = _PlayerScore(
+                        timer=0,
+                        total_laps=10,
+                        laps=0,
+                        won=False,
+                        pos="Draw",
+                        collisions=0,
+                        colliding=False,
+                        coins=0,
+                        lap_markers=[False] * len(self.track.checkpoints)
+                    )
+        self.movement = _Movement(
+                            rotating_left=False,
+                            rotating_right=False,
+                            accelerating=False,
+                            decel=False,
+                            timer=0,
+                            time_accel=0,
+                            time_decel=0,
+                            accel=2
+                        )
+        self.timer = _Timer(
+                        start_time=self.clock.ns,
+                        end_time=self.clock.ns,
+                        lap_time=0,
+                        laps=[]
+                    )
+        self.name = name            # name of the player
+        self.ax: float = 0          # acceleration delta in the x directio
+        self.ay: float = 0          # accleration delta in the y direction
+        self.speed: float = 0       # speed of the player in "kmph"
+        self.player_num: int = 2    # total number of players playing
+        self.num: int = num         # the player id of this player instance (either 1 or 2)
+
+    def _drive(self, throttle: float, scale: float) -> None:
+        """
+        Eases the velocity of the car towards its heading and moves the car.
+
+        At the reference tick length the velocity is the average of the old velocity and the new one,
+        for other tick lengths the blend is adjusted so the car eases in at the same rate in real time.
+
+        Parameters:
+            throttle (float): how far the car has been accelerating for (`time_accel` or `time_decel`)
+            scale (float): length of the tick as a multiple of `REFERENCE_DT`
+
+        Returns:
+            None
+        """
+        blend = 1 - 0.5 ** scale
+        self.ax += (0.75 * math.sin(math.radians(self.heading)) * throttle - self.ax) * blend
+        self.ay += (-0.75 * math.cos(math.radians(self.heading)) * throttle - self.ay) * blend
+        self.x += self.ax * 0.02 * scale
+        self.y += self.ay * 0.02 * scale
+
+    def _move(self, dt: float = REFERENCE_DT) -> None:
+        """
+        Handles all movement of the car:
+        - turning left/right
+        - moving forwards and backwards
+        - stopping
+
+        Every per tick change is scaled by the length of the tick, so the car drives the same at any tick rate.
+
+        Parameters:
+            dt (float): length of the tick in seconds. Defaults to `REFERENCE_DT`
+
+        Returns:
+        None
+        """
+        scale = dt / REFERENCE_DT
+
+        # respond to keypresses
+        if self.movement.rotating_left:                                                 # turn left
+            self.heading += 2 * scale
+            self.attr.shape = f"{self.attr.sprite}{self.name}left"
+
+        if self.movement.rotating_right:                                                # turn right
+            self.heading -= 2 * scale
+            self.attr.shape = f"{self.attr.sprite}{self.name}right"
+
+        if self.movement.accelerating:                                                  # forwards
+            if self.movement.time_decel < 0:                                            # start accel from reversing
+                self.movement.time_accel = 0                                            # ensure no forwards slipping through
+                self.movement.time_decel += self.movement.accel * 5 * scale
+                self._drive(self.movement.time_decel, scale)
+            else:                                                                       # just accel from stopped
+                self.attr.shape = f"{self.attr.sprite}{self.name}"
+                self.movement.time_decel = 0                                            # ensure no backward slipping through
+                if self.movement.time_accel < 1500:                                     # forward speed capped to 1500
+                    self.movement.time_accel += self.movement.accel * scale
+                self._drive(self.movement.time_accel, scale)
+
+        elif self.movement.decel:                                                       # backwards
+            if self.movement.time_accel > 0:                                            # finish moving forward
+                self.movement.time_decel = 0                                            # ensure no backward slipping through
+                self.movement.time_accel -= self.movement.accel * 5 * scale
+                self._drive(self.movement.time_accel, scale)
+            else:                                                                       # start moving back
+                self.movement.time_accel = 0                                            # ensure no forward slipping through
+                if self.movement.time_decel > -500:                                     # reversing speed capped to 700
+                    self.movement.time_decel -= self.movement.accel * scale
+                self._drive(self.movement.time_decel, scale)
+
+        if self.movement.accelerating and self.movement.decel:                          # both forwards and backwards keys pressed
+            if self.movement.time_accel > 0 and self.movement.time_decel == 0:          # moving forward
+                self.movement.time_accel -= self.movement.accel * 5 * scale
+                if self.movement.time_accel < 5:
+                    self.movement.time_accel = 0                                        # catch edge case where it goes negative
+                self._drive(self.movement.time_accel, scale)
+            elif self.movement.time_decel < 0 and self.movement.time_accel == 0:        # moving backward
+                self.movement.time_decel += self.movement.accel * 5 * scale
+                if self.movement.time_decel > -5:
+                    self.movement.time_decel = 0                                        # catch edge case where it goes positive
+                self._drive(self.movement.time_decel, scale)
+
+        if not self.movement.accelerating and not self.movement.decel:                  # no forwards or backwards - stop movement
+            if self.movement.time_accel > 0 and self.movement.time_decel == 0:          # moving forward
+                self.movement.time_accel -= int(self.movement.accel * 2.5) * scale
+                if self.movement.time_accel < 5:
+                    self.movement.time_accel = 0                                        # catch edge case where it goes negative
+                self._drive(self.movement.time_accel, scale)
+            elif self.movement.time_decel < 0 and self.movement.time_accel == 0:        # moving backward
+                self.movement.time_decel += int(self.movement.accel * 2.5) * scale
+                if self.movement.time_decel > -5:
+                    self.movement.time_decel = 0                                        # catch edge case where it goes positive
+                self._drive(self.movement.time_decel, scale)
+
+    def _collision(self, dt: float = REFERENCE_DT) -> None:
+        """
+        Handles all collision of the car with the screen and track.
+        Does not handle collision with other cars.
+
+        Parameters:
+            dt (float): length of the tick in seconds, used to scale the grass slowdown. Defaults to `REFERENCE_DT`
+        """
+        scale = dt / REFERENCE_DT
+        width, height = self.bounds
+        # collision detection
+        #   with screen edge
+        collided, where = self._check_collision()
+        if collided:
+            self.movement.time_accel = 0
+            self.movement.time_decel = 0
+            match where:
+                case "top":         # collision with top of screen
+                    self.y = (height/2) - (22*self.attr.size)
+                case "bottom":      # collision with bottom of screen
+                    self.y = (-height/2) + (22*self.attr.size)
+                case "right":       # collision with right side of screen
+                    self.x = (width/2) - (22*self.attr.size)
+                case "left":        # collision with left side of screen
+                    self.x = (-width/2) + (22*self.attr.size)
+                case _:
+                    pass
+        #   with track
+        if self._off_track():
+            handling = self.handling
+            drag = grass_drag(self.track.field.distance_at(self.x, self.y), handling.grass_drag, handling.grass_depth) * scale    # the further onto the grass the slower the car gets
+            if self.movement.time_accel > 0 and self.movement.time_decel == 0:      # moving forwards
+                if self.movement.time_accel > 100:
+                    self.movement.time_accel -= drag
+                    self.movement.accel = handling.grass_accel
+            elif self.movement.time_decel < 0 and self.movement.time_accel == 0:    # moving backwards
+                if self.movement.time_decel < -100:
+                    self.movement.time_decel += drag
+                    self.movement.accel = handling.grass_accel
+            else:
+                pass
+        else:                                                                       # definitely on the track and will run every frame
+            if self.movement.time_accel > self.handling.fast_after:                 # slower acceleration after 100"kmph" (500 frames of accelerating)
+                self.movement.accel = self.handling.fast_accel
+            else:
+                self.movement.accel = self.handling.accel
+
+    def _off_track(self) -> bool:
+        """
+        Checks if the car is on the track or not.
+
+        Returns:
+            True if the car is off the track, else False.
+        """
+        return self.track.off_track(self.x, self.y)
+
+    def _win_condition(self) -> None:
+        """
+        Checks if the car has won the race.
+
+        If the number of laps completed by the car is greater than or equal to the total number of laps,
+        sets the `won` attribute of the `score` object to True.
+
+        Returns:
+            None
+        """
+        if self.score.laps >= self.score.total_laps:
+            self.score.won = True
+            return
+
+    def _score(self) -> None:
+        """
+        Update the score/num of laps, and the times for each lap (from the simulation clock).
+
+        It checks if the car's movement this tick crossed any of the track's checkpoints or the finish line, and updates the score accordingly.
+        Checkpoints only count when they are driven through the right way, so reversing back over them (or the finish line) can't make a lap.
+        It also calculates and stores the lap times for the stats screen.
+
+        Returns:
+            None
+        """
+        now = self.clock.ns                                                                 # the clock has already been moved on for this tick
+        x0, y0, _ = self.prev                                                               # where the car was at the start of the tick
+        markers = self.score.lap_markers
+        finished = False
+        for i, gate in enumerate(self.track.checkpoints):
+            way = gate.crossed(x0, y0, self.x, self.y)
+            if way:                                                                         # drove through a checkpoint this tick
+                markers[i] = way > 0                                                        # driving back through a checkpoint takes it away again
+                finished = finished or (gate.finish and way > 0)                            # only crossing the finish line the right way finishes a lap
+        if finished and sum(markers) >= len(markers) - 1:                                   # must get all but one of the checkpoints for a lap to be counted, then cross the finish line
+            self.score.laps += 1
+            self.score.lap_markers = [False] * len(markers)                                 # reset all markers
+            self.timer.end_time = now
+            self.timer.laps.append(now - self.timer.start_time)                             # update list of lap times for stats
+            self.timer.start_time = now
+            self._win_condition()                                                           # check if the car won
+        self.timer.lap_time = now - self.timer.start_time                                   # running lap timer to display while game is running
+
+    def _spedo(self) -> None:
+        """
+        Constantly update the speed value to display on the speedometer.
+
+        This method calculates the speed based on the time acceleration and deceleration values
+        and updates the `speed` attribute of the car. The speed value is rounded to the nearest
+        integer and multiplied by 0.2 to get a psuedo "kilometers per hour" value
+
+        Returns:
+            None
+        """
+        self.speed = round(abs(self.movement.time_accel - self.movement.time_decel) * 0.2)
+
+    def update(self, dt: float = REFERENCE_DT) -> None:
+        """
+        Update the Car to a new state.
+
+        This method performs the following actions:
+        - Moves the car based on input.
+        - Checks if the car has collided with anything.
+        - Updates the score and lap times for the car.
+        - Updates the speedometer value internally.
+
+        Parameters:
+            dt (float): length of the tick in seconds. Defaults to `REFERENCE_DT`
+
+        Returns:
+        None
+        """
+        self.snapshot()     # remember where the car was for drawing in between ticks
+        self._move(dt)      # moved the car based off input
+        self._collision(dt) # checks if the car has collided with anything
+        self._score()       # updates the score and lap times for the car
+        self._spedo()       # updates the speedometer value (internally)
+
+    def touching(self, car: Body) -> bool:
+        """
+        Check if a car is close enough to this car to count as a collision, without changing anything.
+
+        Args:
+            car (Body): The car to check.
+
+        Returns:
+            bool: True if both cars are active, have collision enabled and are within a box 50px by 50px of each other, False otherwise.
+        """
+        x = round(self.x)
+        y = round(self.y)
+        px = round(car.x)
+        py = round(car.y)
+        valid_state = ((car.attr.collision) and (self.attr.collision)) and ((car.active) and (self.active))         # check if both cars are active (rendered on the screen) and have collision enabled
+        return (px-50 <= x <= px+50) and (py-50 <= y <= py+50) and valid_state                                      # collision with a box 50px by 50px around the other car
+
+    def set_colliding(self, colliding: bool) -> None:
+        """
+        Records whether the car is colliding with any other car this tick. Call it once per tick,
+        a collision is only counted when the car starts colliding, not for every tick it stays on top of another car.
+
+        Args:
+            colliding (bool): whether the car is touching any other car.
+
+        Returns:
+            None
+        """
+        if colliding:
+            # need to make something happen when they collide - for now just says hi
+            self.attr.shape = "hi"
+            if not self.score.colliding: # allow for accurate collision count - only goes up by 1 for each collision, doesnt keep going up if they stay ontop of each other
+                self.score.collisions += 1
+        self.score.colliding = colliding
+
+    def player_collision(self, car: Body) -> bool:
+        """
+        Check if a car is colliding with another car, for a race between two cars.
+        With more cars use `touching()` for each of the others and `set_colliding()` once, see `Race.step()`.
+
+        Args:
+            car (Body): The car to check collision with.
+
+        Returns:
+            bool: True if the provided car is colliding with the car, False otherwise.
+        """
+        colliding = self.touching(car)
+        self.set_colliding(colliding)
+        return colliding
+
+    def check_collision(self, body: Body) -> bool:
+        """
+        Check if the car is colliding with a body (e.g. a coin).
+
+        Arguments:
+            body (Body): the body to check
+
+        Returns:
+            bool: whether the car is colliding with the body
+        """
+        if body.attr.collision:                                                             # check that collision is enabled for the given body
+            if (self.x-50 <= body.x <= self.x+50) and (self.y-50 <= body.y <= self.y+50):   # collision with a box 50px by 50px around the body
+                return True
+        return False
+
+    def rotate_left_start(self) -> None:
+        """
+        start turning left
+        """
+        self.movement.rotating_left = True
+
+    def rotate_left_stop(self) -> None:
+        """
+        stop turning left
+        """
+        self.movement.rotating_left = False
+
+    def rotate_right_start(self) -> None:
+        """
+        start turning right
+        """
+        self.movement.rotating_right = True
+
+    def rotate_right_stop(self) -> None:
+        """
+        stop turning right
+        """
+        self.movement.rotating_right = False
+
+    def accelerate_start(self) -> None:
+        """
+        start accelerating
+        """
+        self.movement.accelerating = True
+
+    def accelerate_stop(self) -> None:
+        """
+        stop accelerating
+        """
+        self.movement.accelerating = False
+
+    def decel_start(self) -> None:
+        """
+        start deceling
+        """
+        self.movement.decel = True
+
+    def decel_stop(self) -> None:
+        """
+        stop deceling
+        """
+        self.movement.decel = False
+
+    def best_lap(self) -> str:
+        """
+        Returns the time of the best lap the car has completed, formatted for display.
+
+        Returns:
+            str: The time of the best lap in the format 'h:mm:ss.mmm'.
+                 If no laps have been completed, returns '-         '.
+        """
+        if not self.timer.laps:
+            return "-         "
+        return format_time(min(self.timer.laps))  # millisecond accuracy is fine for display
+
+    def reset(self) -> None:
+        """
+        Reset all values to original state.
+        The car is put back at its spawn point, keeping its attributes, total laps and coins.
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+        self.x, self.y, self.heading = self.spawn
+        self.prev = self.spawn
+        self.dx = 0
+        self.dy = 0
+        self.active = True
+        self.score = _PlayerScore(
+                        timer=0,
+                        total_laps=self.score.total_laps,
+                        laps=0,
+                        won=False,
+                        pos="Draw",
+                        collisions=0,
+                        colliding=False,
+                        coins=self.score.coins,
+                        lap_markers=[False] * len(self.track.checkpoints)
+                    )
+        self.movement = _Movement(
+                            rotating_left=False,
+                            rotating_right=False,
+                            accelerating=False,
+                            decel=False,
+                            timer=0,
+                            time_accel=0,
+                            time_decel=0,
+                            accel=2
+                        )
+        self.timer = _Timer(
+                        start_time=self.clock.ns,
+                        end_time=self.clock.ns,
+                        lap_time=0,
+                        laps=[]
+                    )
+        self.ax = 0
+        self.ay = 0
+        self.speed = 0
+
+class Race:
+    """
+    Race Class
+
+    Runs a race between any number of cars without a display.
+    Each car can be given a driver, a function that is called before every tick to set the car's inputs (for bots and scripted runs).
+    Coins spawn and get collected the same way as in the game
+    """
+    def __init__(self, cars: list[Car], total_laps: int = 10, drivers: dict[str, Callable[[Car, "Race"], None]]|None = None, tick_rate: int = TICK_RATE) -> None:
+        if not cars:
+            raise ValueError("a race needs at least one car")
+        self.cars = cars
+        self.dt: float = 1 / tick_rate                          # length of each tick in seconds
+        self.drivers = drivers if drivers is not None else {}   # car name -> driver function
+        self.ticks: int = 0                                     # number of ticks the race has run for
+        self.clock = SimClock()                                 # race time, shared by every car for their lap times
+        self.coins = [Body(x=x, y=y, heading=0, attributes=SpriteAttributes(size=1.0, color="yellow", shape="circle", sprite="circle", collision=True)) for x, y in cars[0].track.coins]
+        self.coin_time: float = 0                               # seconds since the coins were spawned
+        for car in self.cars:
+            car.score.total_laps = total_laps
+            car.player_num = len(self.cars)
+            car.clock = self.clock
+            car.timer.start_time = self.clock.ns
+
+    def step(self) -> None:
+        """
+        Advance the race by one tick.
+
+        Moves the clock on, runs the drivers, updates every car, checks for collisions between cars, collects coins and updates the race positions.
+
+        Returns:
+            None
+        """
+        self.clock.advance(self.dt)
+        for car in self.cars:
+            driver = self.drivers.get(car.name)
+            if driver is not None:
+                driver(car, self)
+        for car in self.cars:
+            car.update(self.dt)
+        for car in self.cars:
+            car.set_colliding(any(car.touching(other) for other in self.cars if other is not car))
+        self._coins()
+        positions(self.cars)
+        self.ticks += 1
+
+    def _coins(self) -> None:
+        """
+        Respawns the coins once they have all been collected and `COIN_RESPAWN` seconds have passed, and lets the cars collect them.
+        Same rules as `Util.coins()` in the game.
+
+        Returns:
+            None
+        """
+        if self.coin_time > COIN_RESPAWN and not any(coin.active for coin in self.coins):
+            self.coin_time = 0
+            for coin in self.coins:
+                coin.active = True
+        self.coin_time += self.dt
+        for coin in self.coins:
+            for car in self.cars:
+                if coin.active and car.check_collision(coin):
+                    coin.active = False
+                    car.score.coins += 1
+
+    def finished(self) -> bool:
+        """
+        Check if any car has won the race
+
+        Returns:
+            bool: True if a car has won, False otherwise
+        """
+        return any(car.score.won for car in self.cars)
+
+    def run(self, max_ticks: int) -> int:
+        """
+        Run the race until a car wins or the tick limit is reached.
+
+        Parameters:
+            max_ticks (int): the maximum number of ticks to run for
+
+        Returns:
+            int: the number of ticks the race ran for
+        """
+        while self.ticks < max_ticks and not self.finished():
+            self.step()
+        return self.ticks
+
+class FixedTimestep:
+    """
+    FixedTimestep Class
+
+    Accumulates real elapsed time and turns it into a whole number of fixed length simulation ticks,
+    so the game runs the same no matter how fast the computer can draw frames
+    """
+    def __init__(self, tick_rate: int = TICK_RATE, max_lag: float = MAX_LAG) -> None:
+        self.tick_rate = tick_rate      # number of ticks per second
+        self.dt: float = 1 / tick_rate  # length of each tick in seconds
+        self.max_ticks = math.ceil(max_lag * tick_rate)    # most ticks to run in one frame, any more time than that is dropped so a slow frame can't snowball
+        self.accumulator: float = 0     # elapsed time that has not been simulated yet
+        self.last: float|None = None    # timestamp of the previous call to `ticks()`
+
+    def reset(self) -> None:
+        """
+        Forget about any time that has passed, e.g. after a pause or a countdown.
+        The next call to `ticks()` starts timing from scratch.
+
+        Returns:
+            None
+        """
+        self.accumulator = 0
+        self.last = None
+
+    def ticks(self, now: float) -> int:
+        """
+        Works out how many ticks should be simulated this frame.
+
+        Parameters:
+            now (float): the current time in seconds from a monotonic clock (e.g. `time.perf_counter()`)
+
+        Returns:
+            int: the number of ticks to simulate
+        """
+        if self.last is None:
+            self.last = now
+            return 0
+        self.accumulator += now - self.last
+        self.last = now
+        ticks = int(self.accumulator // self.dt)
+        if ticks > self.max_ticks:      # too far behind, drop the extra time instead of trying to catch up
+            self.accumulator = 0
+            return self.max_ticks
+        self.accumulator -= ticks * self.dt
+        return ticks
+
+    def alpha(self) -> float:
+        """
+        How far the real time is between the last simulated tick and the next one,
+        used to interpolate the sprites when drawing a frame.
+
+        Returns:
+            float: a value from 0 (just ticked) to 1 (next tick is due)
+        """
+        return min(1.0, self.accumulator / self.dt)
+
+    def wait_time(self) -> float:
+        """
+        Time until the next tick is due
+
+        Returns:
+            float: the number of seconds until the next tick
+        """
+        return max(0.0, self.dt - self.accumulator)
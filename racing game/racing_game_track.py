@@ -0,0 +1,781 @@
+"""
+Henry Spink, 2/5/24
+Track file for game for applied computing 1/2
+
+Tracks are described by a JSON file in `tracks/` (the centreline as lines and arcs, the width,
+the checkpoint gates, the start grid and where the coins spawn). The description is compiled once into everything the game needs:
+the path `Background._track()` draws, a raster of which pixels are on the track, the signed distance
+to the edge of the track and the checkpoint segments that lap counting checks the cars' movement against.
+The compiled track is cached in `track_cache/` under a hash of the description,
+so loading a track again is a memory-mapped read instead of a recompute
+"""
+# pylint: disable=line-too-long
+#* imports
+import os
+import math
+import json
+import mmap
+import array
+import shutil
+import hashlib
+import tempfile
+import dataclasses
+
+#* constants
+TRACK_DIR: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tracks")         # track descriptions
+CACHE_DIR: str = os.environ.get("OMEGA_RACE_TRACK_CACHE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "track_cache"))    # compiled tracks
+DEFAULT_TRACK: str = os.path.join(TRACK_DIR, "oval.json")   # the main race track
+COMPILER_VERSION: int = 1                                   # change when the compiled format changes so old caches are not used
+GRID_AREA: tuple[int, int, int, int] = (-960, -540, 1921, 1081)     # (x_min, y_min, width, height) of the grid, the whole 1920x1080 screen
+FIELD_CELL: int = 4                                         # distance between cells of the distance field in pixels
+ARC_STEP: float = 5                                         # degrees between points when an arc is turned into lines for drawing
+
+#* functions
+def _polygon_area(points: list[tuple[float, float]]) -> float:
+    """
+    Area of a polygon using the shoelace formula.
+
+    Parameters:
+        points (list[tuple[float, float]]): the corners of the polygon in order
+
+    Returns:
+        float: the area in square pixels
+    """
+    return abs(sum(x1 * y2 - x2 * y1 for (x1, y1), (x2, y2) in zip(points, points[1:] + points[:1]))) / 2
+
+#* classes
+@dataclasses.dataclass
+class Checkpoint:
+    """
+    a gate across the track that cars have to drive through, stored as a segment from one side of the track to the other
+    """
+    name: str           # name of the checkpoint
+    ax: float           # ----------
+    ay: float           # start and end of the gate
+    bx: float           # ----------
+    by: float           # ----------
+    finish: bool        # whether this is the start/finish line
+
+    def __post_init__(self) -> None:
+        self.dx = self.bx - self.ax                                     # ----------
+        self.dy = self.by - self.ay                                     # direction of the gate
+        self.x_min, self.x_max = min(self.ax, self.bx), max(self.ax, self.bx)   # ----------
+        self.y_min, self.y_max = min(self.ay, self.by), max(self.ay, self.by)   # box around the gate, to skip most tests early
+
+    def crossed(self, x0: float, y0: float, x1: float, y1: float) -> int:
+        """
+        Checks if a car moving in a straight line from (x0, y0) to (x1, y1) drove through the gate, and which way.
+        Gates go from the inside edge of the track to the outside, so driving the right way round the track crosses them
+        from left to right looking from the start of the gate to the end.
+        Checking the whole movement instead of where the car ends up means a fast car (or a long tick) can't jump over the gate.
+        Ending exactly on the gate counts, starting on it doesn't, so one crossing is never counted twice.
+
+        Parameters:
+            x0 (float): x coordinate at the start of the tick
+            y0 (float): y coordinate at the start of the tick
+            x1 (float): x coordinate at the end of the tick
+            y1 (float): y coordinate at the end of the tick
+
+        Returns:
+            1 if the movement crosses the gate the right way, -1 if it crosses it backwards, else 0.
+        """
+        if (max(x0, x1) < self.x_min or min(x0, x1) > self.x_max
+            or max(y0, y1) < self.y_min or min(y0, y1) > self.y_max):      # nowhere near the gate
+            return 0
+        mx, my = x1 - x0, y1 - y0
+        denom = mx * self.dy - my * self.dx
+        if denom == 0:                                                      # not moving, or moving along the gate
+            return 0
+        ox, oy = self.ax - x0, self.ay - y0
+        t = (ox * self.dy - oy * self.dx) / denom                           # how far along the movement the crossing is
+        u = (ox * my - oy * mx) / denom                                     # how far along the gate the crossing is
+        if not (0 < t <= 1 and 0 <= u <= 1):
+            return 0
+        return 1 if denom > 0 else -1                                       # the movement is to the right of the gate
+
+class TrackShape:
+    """
+    TrackShape Class
+
+    The exact geometry of a track, every point within half the width of the centreline is on the track.
+    The centreline is a list of pieces, either straight lines or arcs of a circle (angles in degrees, anticlockwise from the x axis)
+    """
+    def __init__(self, centreline: list[dict], width: float) -> None:
+        """
+        Parameters:
+            centreline (list[dict]): the pieces of the centreline in driving order,
+                `{"line": {"from": [x, y], "to": [x, y]}}` or `{"arc": {"centre": [x, y], "radius": r, "start": a, "extent": e}}`
+            width (float): width of the track in pixels
+        """
+        self.half_width = width / 2
+        self.lines: list[tuple[float, float, float, float]] = []            # (ax, ay, bx, by)
+        self.arcs: list[tuple[float, float, float, float, float]] = []      # (cx, cy, radius, start, extent)
+        self.pieces: list[tuple[str, tuple]] = []                           # every piece in driving order
+        for piece in centreline:
+            if "line" in piece:
+                (ax, ay), (bx, by) = piece["line"]["from"], piece["line"]["to"]
+                self.lines.append((ax, ay, bx, by))
+                self.pieces.append(("line", self.lines[-1]))
+            elif "arc" in piece:
+                arc = piece["arc"]
+                self.arcs.append((*arc["centre"], arc["radius"], arc["start"], arc["extent"]))
+                self.pieces.append(("arc", self.arcs[-1]))
+            else:
+                raise ValueError(f"unknown centreline piece: {piece}")
+
+    @staticmethod
+    def _arc_point(arc: tuple, angle: float, radius: float) -> tuple[float, float]:
+        """
+        Point at an angle around the centre of an arc.
+
+        Parameters:
+            arc (tuple): the arc (cx, cy, radius, start, extent)
+            angle (float): angle in degrees
+            radius (float): distance from the centre
+
+        Returns:
+            tuple[float, float]: the point
+        """
+        return (arc[0] + radius * math.cos(math.radians(angle)), arc[1] + radius * math.sin(math.radians(angle)))
+
+    def distance(self, x: float, y: float) -> float:
+        """
+        Distance from a point to the nearest point on the centreline.
+
+        Parameters:
+            x (float): x coordinate of the point
+            y (float): y coordinate of the point
+
+        Returns:
+            float: the distance in pixels
+        """
+        best = math.inf
+        for ax, ay, bx, by in self.lines:
+            dx, dy = bx - ax, by - ay
+            t = min(1, max(0, ((x - ax) * dx + (y - ay) * dy) / ((dx * dx + dy * dy) or 1)))
+            best = min(best, math.hypot(x - ax - t * dx, y - ay - t * dy))
+        for arc in self.arcs:
+            cx, cy, radius, start, extent = arc
+            angle = math.degrees(math.atan2(y - cy, x - cx))
+            sweep = (angle - start) % 360 if extent > 0 else (start - angle) % 360
+            if sweep <= abs(extent):                                # alongside the arc
+                best = min(best, abs(math.hypot(x - cx, y - cy) - radius))
+            else:                                                   # past one of the ends
+                for end in (start, start + extent):
+                    ex, ey = self._arc_point(arc, end, radius)
+                    best = min(best, math.hypot(x - ex, y - ey))
+        return best
+
+    def distance_many(self, x, y):
+        """
+        Vectorised version of `distance()`
+
+        Parameters:
+            x (np.ndarray): x coordinates of the points
+            y (np.ndarray): y coordinates of the points
+
+        Returns:
+            np.ndarray: the distance of each point in pixels
+        """
+        import numpy as np  # pylint: disable=import-outside-toplevel   # only needed for batches, the game runs without NumPy
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        best = np.full(np.broadcast(x, y).shape, np.inf)
+        for ax, ay, bx, by in self.lines:
+            dx, dy = bx - ax, by - ay
+            t = np.clip(((x - ax) * dx + (y - ay) * dy) / ((dx * dx + dy * dy) or 1), 0, 1)
+            best = np.minimum(best, np.hypot(x - ax - t * dx, y - ay - t * dy))
+        for arc in self.arcs:
+            cx, cy, radius, start, extent = arc
+            angle = np.degrees(np.arctan2(y - cy, x - cx))
+            sweep = (angle - start) % 360 if extent > 0 else (start - angle) % 360
+            ends = np.inf
+            for end in (start, start + extent):
+                ex, ey = self._arc_point(arc, end, radius)
+                ends = np.minimum(ends, np.hypot(x - ex, y - ey))
+            best = np.minimum(best, np.where(sweep <= abs(extent), np.abs(np.hypot(x - cx, y - cy) - radius), ends))
+        return best
+
+    def signed_distance(self, x: float, y: float) -> float:
+        """
+        Distance from a point to the nearest edge of the track, negative on the track and positive off it.
+
+        Parameters:
+            x (float): x coordinate of the point
+            y (float): y coordinate of the point
+
+        Returns:
+            float: the signed distance in pixels
+        """
+        return self.distance(x, y) - self.half_width
+
+    def signed_distance_many(self, x, y):
+        """
+        Vectorised version of `signed_distance()`
+
+        Parameters:
+            x (np.ndarray): x coordinates of the points
+            y (np.ndarray): y coordinates of the points
+
+        Returns:
+            np.ndarray: the signed distance of each point in pixels
+        """
+        return self.distance_many(x, y) - self.half_width
+
+    def bounds(self) -> tuple[float, float, float, float]:
+        """
+        Box around everything on the track, arcs are treated as whole circles to keep it simple.
+
+        Returns:
+            tuple[float, float, float, float]: (x_min, y_min, x_max, y_max)
+        """
+        xs, ys = [], []
+        for ax, ay, bx, by in self.lines:
+            xs += [ax, bx]
+            ys += [ay, by]
+        for cx, cy, radius, _, _ in self.arcs:
+            xs += [cx - radius, cx + radius]
+            ys += [cy - radius, cy + radius]
+        return (min(xs) - self.half_width, min(ys) - self.half_width, max(xs) + self.half_width, max(ys) + self.half_width)
+
+    def offset(self, distance: float) -> list[tuple[float, float]]:
+        """
+        The centreline moved sideways, used for the edges of the track and the kerbs.
+
+        Parameters:
+            distance (float): how far to move it, positive is to the left when driving along the track
+
+        Returns:
+            list[tuple[float, float]]: points along the moved line
+        """
+        points = []
+        for kind, piece in self.pieces:
+            if kind == "line":
+                ax, ay, bx, by = piece
+                length = math.hypot(bx - ax, by - ay) or 1
+                nx, ny = -(by - ay) / length * distance, (bx - ax) / length * distance   # left of the direction of travel
+                points += [(ax + nx, ay + ny), (bx + nx, by + ny)]
+            else:
+                _, _, radius, start, extent = piece
+                steps = max(1, math.ceil(abs(extent) / ARC_STEP))
+                radius -= math.copysign(distance, extent)                               # left is outwards on a clockwise arc
+                points += [self._arc_point(piece, start + extent * i / steps, radius) for i in range(steps + 1)]
+        return points
+
+    def path(self, spacing: float = 10) -> list[tuple[float, float]]:
+        """
+        Points along the centreline in driving order, used by bots to follow the track.
+
+        Parameters:
+            spacing (float): rough distance between the points in pixels
+
+        Returns:
+            list[tuple[float, float]]: the points, the last one joins back up to the first
+        """
+        points = []
+        for kind, piece in self.pieces:
+            if kind == "line":
+                ax, ay, bx, by = piece
+                steps = max(1, math.ceil(math.hypot(bx - ax, by - ay) / spacing))
+                points += [(ax + (bx - ax) * i / steps, ay + (by - ay) * i / steps) for i in range(steps)]
+            else:
+                _, _, radius, start, extent = piece
+                steps = max(1, math.ceil(math.radians(abs(extent)) * radius / spacing))
+                points += [self._arc_point(piece, start + extent * i / steps, radius) for i in range(steps)]
+        return points
+
+    def kerbs(self, distance: float, dash: float) -> list[list[tuple[float, float]]]:
+        """
+        Dashes on both sides of every arc, alternating colours are given to them when drawing.
+
+        Parameters:
+            distance (float): distance from the centreline
+            dash (float): rough length of each dash in pixels
+
+        Returns:
+            list[list[tuple[float, float]]]: the points of each dash
+        """
+        dashes = []
+        for arc in self.arcs:
+            _, _, radius, start, extent = arc
+            for side in (radius - distance, radius + distance):
+                count = max(1, round(math.radians(abs(extent)) * side / dash))
+                for i in range(count):
+                    angles = [start + extent * (i + part / 2) / count for part in range(3)]
+                    dashes.append([self._arc_point(arc, angle, side) for angle in angles])
+        return dashes
+
+class TrackGrid:
+    """
+    TrackGrid Class
+
+    Raster of the track with one byte per pixel (1 = on the track, 0 = off the track).
+    The cells can be any buffer (a memory-mapped file from the cache or a bytes object), so single points need no extra libraries,
+    but batches of points can be checked at once with NumPy using `off_track_many()`
+    """
+    def __init__(self, cells, x_min: int, y_min: int, width: int, height: int) -> None:
+        """
+        Parameters:
+            cells (bytes|mmap.mmap): width * height bytes, row major with row 0 at y_min
+            x_min (int): x coordinate of the left most column
+            y_min (int): y coordinate of the bottom row
+            width (int): number of columns
+            height (int): number of rows
+        """
+        self.cells = cells
+        self.x_min = x_min
+        self.y_min = y_min
+        self.width = width
+        self.height = height
+
+    def off_track(self, x: float, y: float) -> bool:
+        """
+        Checks if a point is on the track or not.
+
+        Parameters:
+            x (float): x coordinate of the point
+            y (float): y coordinate of the point
+
+        Returns:
+            True if the point is off the track, else False.
+        """
+        col = round(x) - self.x_min
+        row = round(y) - self.y_min
+        if 0 <= col < self.width and 0 <= row < self.height:
+            return not self.cells[row * self.width + col]
+        return True     # off the edge of the grid
+
+    def array(self):
+        """
+        The grid as a 2D NumPy array (a view, not a copy), indexed [row, column]
+
+        Returns:
+            np.ndarray: array of uint8 with shape (height, width)
+        """
+        import numpy as np  # pylint: disable=import-outside-toplevel   # only needed for batches, the game runs without NumPy
+        return np.frombuffer(self.cells, dtype=np.uint8).reshape(self.height, self.width)
+
+    def off_track_many(self, x, y):
+        """
+        Checks a batch of points at once.
+
+        Parameters:
+            x (np.ndarray): x coordinates of the points
+            y (np.ndarray): y coordinates of the points
+
+        Returns:
+            np.ndarray: boolean array, True where the point is off the track
+        """
+        import numpy as np  # pylint: disable=import-outside-toplevel
+        col = np.rint(x).astype(np.int64) - self.x_min
+        row = np.rint(y).astype(np.int64) - self.y_min
+        inside = (col >= 0) & (col < self.width) & (row >= 0) & (row < self.height)
+        on = np.zeros(np.shape(col), dtype=bool)
+        on[inside] = self.array()[row[inside], col[inside]] != 0
+        return ~on
+
+class TrackField:
+    """
+    TrackField Class
+
+    Signed distance field of the track (see `TrackShape.signed_distance()`), with the direction of the
+    outward normal (pointing away from the track) in every cell. Queries use bilinear interpolation between cells.
+    A single point (`distance_at()`, used by the car every tick it is on the grass) is looked up in plain Python,
+    batches of points (every car or every pixel of an overlay at once) use NumPy arrays made the first time they are needed
+    """
+    def __init__(self, distances, x_min: float, y_min: float, cols: int, rows: int, cell: float) -> None:
+        """
+        Parameters:
+            distances (bytes|mmap.mmap): signed distance at every cell as float32 values, a row at a time from the bottom
+            x_min (float): x coordinate of the left most column
+            y_min (float): y coordinate of the bottom row
+            cols (int): number of columns
+            rows (int): number of rows
+            cell (float): distance between cells in pixels
+        """
+        self.x_min = x_min
+        self.y_min = y_min
+        self.cols = cols
+        self.rows = rows
+        self.cell = cell
+        self.values = memoryview(distances).cast("f")     # without copying it or needing NumPy
+        self._arrays: tuple|None = None
+
+    @property
+    def arrays(self) -> tuple:
+        """
+        The field as NumPy arrays, for batches. They are only made the first time they are asked for.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray]: (distance, normal x, normal y) at every cell, indexed [row, column]
+        """
+        if self._arrays is None:
+            import numpy as np  # pylint: disable=import-outside-toplevel
+            distance = np.frombuffer(self.values, dtype=np.float32).reshape(self.rows, self.cols)
+            grad_y, grad_x = np.gradient(distance, self.cell)
+            length = np.hypot(grad_x, grad_y)
+            length[length == 0] = 1                                 # the ridge in the middle of the track has no direction
+            self._arrays = (distance, (grad_x / length).astype(np.float32), (grad_y / length).astype(np.float32))
+        return self._arrays
+
+    def _sample(self, grids, x, y):
+        """
+        Bilinear interpolation of some of the field's arrays at a batch of points.
+        Points outside of the field use the nearest edge cell.
+
+        Parameters:
+            grids (list[np.ndarray]): arrays to sample, all with the shape of the field
+            x (np.ndarray): x coordinates of the points
+            y (np.ndarray): y coordinates of the points
+
+        Returns:
+            list[np.ndarray]: the interpolated values from each of the arrays
+        """
+        import numpy as np  # pylint: disable=import-outside-toplevel
+        fx = np.clip((np.asarray(x, dtype=np.float64) - self.x_min) / self.cell, 0, self.cols - 1)
+        fy = np.clip((np.asarray(y, dtype=np.float64) - self.y_min) / self.cell, 0, self.rows - 1)
+        col = np.minimum(fx.astype(np.int64), self.cols - 2)
+        row = np.minimum(fy.astype(np.int64), self.rows - 2)
+        tx = fx - col
+        ty = fy - row
+        samples = []
+        for grid in grids:
+            bottom = grid[row, col] * (1 - tx) + grid[row, col + 1] * tx
+            top = grid[row + 1, col] * (1 - tx) + grid[row + 1, col + 1] * tx
+            samples.append(bottom * (1 - ty) + top * ty)
+        return samples
+
+    def distance_many(self, x, y):
+        """
+        Signed distance to the edge of the track for a batch of points (negative on the track).
+
+        Parameters:
+            x (np.ndarray): x coordinates of the points
+            y (np.ndarray): y coordinates of the points
+
+        Returns:
+            np.ndarray: distance of each point in pixels
+        """
+        return self._sample([self.arrays[0]], x, y)[0]
+
+    def normal_many(self, x, y):
+        """
+        Direction away from the track for a batch of points, pointing towards the grass.
+        On the grass it points further away from the track, on the track it points at the nearest edge.
+
+        Parameters:
+            x (np.ndarray): x coordinates of the points
+            y (np.ndarray): y coordinates of the points
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: (x component, y component) of the unit normal at each point
+        """
+        import numpy as np  # pylint: disable=import-outside-toplevel
+        nx, ny = self._sample(self.arrays[1:], x, y)
+        length = np.hypot(nx, ny)
+        length[length == 0] = 1
+        return nx / length, ny / length
+
+    def query(self, x, y):
+        """
+        Distance and normal for a batch of points in one go.
+
+        Parameters:
+            x (np.ndarray): x coordinates of the points
+            y (np.ndarray): y coordinates of the points
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray]: (distance, normal x, normal y) at each point
+        """
+        nx, ny = self.normal_many(x, y)
+        return self.distance_many(x, y), nx, ny
+
+    def distance_at(self, x: float, y: float) -> float:
+        """
+        Signed distance to the edge of the track for a single point, the same as `distance_many()` without NumPy.
+
+        Parameters:
+            x (float): x coordinate of the point
+            y (float): y coordinate of the point
+
+        Returns:
+            float: distance of the point in pixels
+        """
+        fx = min(max((x - self.x_min) / self.cell, 0), self.cols - 1)
+        fy = min(max((y - self.y_min) / self.cell, 0), self.rows - 1)
+        col = min(int(fx), self.cols - 2)
+        row = min(int(fy), self.rows - 2)
+        tx = fx - col
+        ty = fy - row
+        i = row * self.cols + col
+        values = self.values
+        bottom = values[i] * (1 - tx) + values[i + 1] * tx
+        top = values[i + self.cols] * (1 - tx) + values[i + self.cols + 1] * tx
+        return bottom * (1 - ty) + top * ty
+
+class CompiledTrack:
+    """
+    CompiledTrack Class
+
+    Everything the game needs to know about a track, made by `compile_track()` or loaded from the cache by `load_track()`
+    """
+    def __init__(self, meta: dict, cells, distances) -> None:
+        """
+        Parameters:
+            meta (dict): the track description plus the compiled render path and the size of the grid and field
+            cells (bytes|mmap.mmap): the occupancy grid (see `TrackGrid`)
+            distances (bytes|mmap.mmap): the signed distance field as float32 values (see `TrackField`)
+        """
+        self.meta = meta
+        self.name: str = meta["name"]
+        self.shape = TrackShape(meta["centreline"], meta["width"])
+        self.grid = TrackGrid(cells, *meta["grid"])
+        self.checkpoints = [Checkpoint(name=gate["name"], ax=gate["from"][0], ay=gate["from"][1], bx=gate["to"][0], by=gate["to"][1], finish=gate.get("finish", False)) for gate in meta["checkpoints"]]
+        self.finish: Checkpoint = next(gate for gate in self.checkpoints if gate.finish)
+        self.start_grid: list[tuple[float, float, float]] = [tuple(spot) for spot in meta["start_grid"]]   # (x, y, heading) of each car
+        self.coins: list[tuple[float, float]] = [tuple(spot) for spot in meta.get("coins", [])]           # where the coins spawn
+        self.render: dict = meta["render"]
+        self._distances = distances
+        self._field: TrackField|None = None
+
+    def off_track(self, x: float, y: float) -> bool:
+        """
+        Checks if a point is on the track or not, using the grid.
+
+        Parameters:
+            x (float): x coordinate of the point
+            y (float): y coordinate of the point
+
+        Returns:
+            True if the point is off the track, else False.
+        """
+        return self.grid.off_track(x, y)
+
+    def signed_distance(self, x: float, y: float) -> float:
+        """
+        Exact distance from a point to the nearest edge of the track, negative on the track and positive off it.
+
+        Parameters:
+            x (float): x coordinate of the point
+            y (float): y coordinate of the point
+
+        Returns:
+            float: the signed distance in pixels
+        """
+        return self.shape.signed_distance(x, y)
+
+    def signed_distance_many(self, x, y):
+        """
+        Vectorised version of `signed_distance()`
+
+        Parameters:
+            x (np.ndarray): x coordinates of the points
+            y (np.ndarray): y coordinates of the points
+
+        Returns:
+            np.ndarray: the signed distance of each point in pixels
+        """
+        return self.shape.signed_distance_many(x, y)
+
+    @property
+    def field(self) -> TrackField:
+        """
+        The signed distance field of the track, only made the first time it is asked for.
+
+        Returns:
+            TrackField: the field
+        """
+        if self._field is None:
+            x_min, y_min, cols, rows, cell = self.meta["field"]
+            self._field = TrackField(self._distances, x_min, y_min, cols, rows, cell)
+        return self._field
+
+class LazyTrack:
+    """
+    LazyTrack Class
+
+    Takes the place of a compiled track and only loads it (see `load_track()`) the first time one of its attributes is used,
+    so importing the game never compiles a track or writes to the cache
+    """
+    def __init__(self, path: str = DEFAULT_TRACK, cache_dir: str = CACHE_DIR) -> None:
+        """
+        Parameters:
+            path (str): path to the track description. Defaults to the main race track
+            cache_dir (str): folder of compiled tracks
+        """
+        self._path = path
+        self._cache_dir = cache_dir
+        self._track: CompiledTrack|None = None
+
+    def _load(self) -> CompiledTrack:
+        """
+        The compiled track, loaded if it hasn't been yet.
+
+        Returns:
+            CompiledTrack: the track
+        """
+        if self._track is None:
+            self._track = load_track(self._path, self._cache_dir)
+        return self._track
+
+    def __getattr__(self, name: str):
+        if name.startswith("__") or name in ("_path", "_cache_dir", "_track"):     # copy and pickle look for these before __init__ has run
+            raise AttributeError(name)
+        return getattr(self._load(), name)
+
+def _rasterise(shape: TrackShape, area: tuple[int, int, int, int], cell: int) -> tuple[bytes, bytes, tuple]:
+    """
+    Works out the occupancy grid and the signed distance field of a track.
+    Uses NumPy if it is installed, otherwise the field is worked out a cell at a time and only the pixels
+    near the edge of the track are checked exactly (the distance can't change by more than the distance moved,
+    so a pixel near a cell well inside or outside the track is on the same side as that cell).
+
+    Parameters:
+        shape (TrackShape): the track
+        area (tuple[int, int, int, int]): (x_min, y_min, width, height) of the grid
+        cell (int): distance between cells of the field in pixels
+
+    Returns:
+        tuple[bytes, bytes, tuple]: the grid, the field as float32 values and (x_min, y_min, columns, rows, cell) of the field
+    """
+    x_min, y_min, width, height = area
+    cols = math.ceil(width / cell) + 1
+    rows = math.ceil(height / cell) + 1
+    try:
+        import numpy as np  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        distances = array.array("f", (shape.signed_distance(x_min + col * cell, y_min + row * cell) for row in range(rows) for col in range(cols)))
+        margin = cell / math.sqrt(2)                                # furthest a pixel can be from its nearest cell
+        cells = bytearray(width * height)
+        for y in range(height):
+            row = min((y + cell // 2) // cell, rows - 1)
+            for col in range(cols):
+                start = max(col * cell - cell // 2, 0)
+                end = min((col + 1) * cell - cell // 2, width)
+                if start >= end:
+                    continue
+                distance = distances[row * cols + col]
+                if distance < -margin:
+                    cells[y * width + start:y * width + end] = b"\x01" * (end - start)
+                elif distance <= margin:
+                    for x in range(start, end):
+                        cells[y * width + x] = shape.signed_distance(x_min + x, y_min + y) < 0
+        return bytes(cells), distances.tobytes(), (x_min, y_min, cols, rows, cell)
+    xs = x_min + np.arange(width)
+    cells = np.zeros((height, width), dtype=np.uint8)
+    for start in range(0, height, 64):                              # a few rows at a time to keep the memory down
+        ys = y_min + np.arange(start, min(start + 64, height))
+        cells[start:start + len(ys)] = shape.signed_distance_many(xs[np.newaxis, :], ys[:, np.newaxis]) < 0
+    field_x = x_min + np.arange(cols) * cell
+    field_y = y_min + np.arange(rows) * cell
+    distances = shape.signed_distance_many(field_x[np.newaxis, :], field_y[:, np.newaxis]).astype(np.float32)
+    return cells.tobytes(), distances.tobytes(), (x_min, y_min, cols, rows, cell)
+
+def compile_track(description: dict) -> CompiledTrack:
+    """
+    Compiles a track description into the render path, occupancy grid, distance field and checkpoint segments.
+
+    Parameters:
+        description (dict): the track description (see `tracks/oval.json`)
+
+    Returns:
+        CompiledTrack: the compiled track
+    """
+    shape = TrackShape(description["centreline"], description["width"])
+    left = shape.offset(shape.half_width)
+    right = shape.offset(-shape.half_width)
+    outer, inner = (left, right) if _polygon_area(left) > _polygon_area(right) else (right, left)
+    kerbs = description.get("kerbs", {"width": 25, "offset": 10, "dash": 30, "colours": ["red", "white"]})
+    meta = dict(description)
+    meta["version"] = COMPILER_VERSION
+    meta["render"] = {
+        "outer": outer,                                             # outside edge of the track
+        "inner": inner,                                             # inside edge of the track
+        "kerbs": shape.kerbs(shape.half_width + kerbs["offset"], kerbs["dash"]),
+        "kerb_width": kerbs["width"],
+        "kerb_colours": kerbs["colours"],
+        "colours": description.get("colours", {"surface": "#222222", "infield": "grey"}),
+    }
+    cells, distances, meta["field"] = _rasterise(shape, GRID_AREA, FIELD_CELL)
+    meta["grid"] = GRID_AREA
+    return CompiledTrack(meta, cells, distances)
+
+def _map(path: str) -> mmap.mmap:
+    """
+    Memory-maps a file read only.
+
+    Parameters:
+        path (str): path to the file
+
+    Returns:
+        mmap.mmap: the mapped file
+    """
+    with open(path, "rb") as file:
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+def _save(track: CompiledTrack, folder: str) -> None:
+    """
+    Writes a compiled track to the cache. It is written to a temporary folder first and then renamed,
+    so a half written cache is never loaded. The cache is only a speed up, so it failing to save is ignored.
+
+    Parameters:
+        track (CompiledTrack): the compiled track
+        folder (str): where to save it
+
+    Returns:
+        None
+    """
+    temp = None
+    try:
+        os.makedirs(os.path.dirname(folder), exist_ok=True)
+        temp = tempfile.mkdtemp(dir=os.path.dirname(folder))
+        with open(os.path.join(temp, "grid.bin"), "wb") as file:
+            file.write(track.grid.cells)
+        with open(os.path.join(temp, "field.bin"), "wb") as file:
+            file.write(track._distances)     # pylint: disable=protected-access
+        with open(os.path.join(temp, "meta.json"), "w", encoding="utf-8") as file:
+            json.dump(track.meta, file)
+        os.replace(temp, folder)
+    except OSError:
+        if temp is not None:
+            shutil.rmtree(temp, ignore_errors=True)
+
+def load_track(path: str = DEFAULT_TRACK, cache_dir: str = CACHE_DIR) -> CompiledTrack:
+    """
+    Loads a track, from the cache if it has been compiled before, otherwise it is compiled and saved to the cache.
+    The cache is keyed by a hash of the description (and the compiler version), so editing the file recompiles it.
+
+    Parameters:
+        path (str): path to the track description. Defaults to the main race track
+        cache_dir (str): folder of compiled tracks
+
+    Returns:
+        CompiledTrack: the track
+    """
+    with open(path, "rb") as file:
+        source = file.read()
+    key = hashlib.sha256(f"{COMPILER_VERSION}:{GRID_AREA}:{FIELD_CELL}:".encode() + source).hexdigest()
+    folder = os.path.join(cache_dir, key)
+    try:
+        with open(os.path.join(folder, "meta.json"), encoding="utf-8") as file:
+            meta = json.load(file)
+        return CompiledTrack(meta, _map(os.path.join(folder, "grid.bin")), _map(os.path.join(folder, "field.bin")))
+    except (OSError, ValueError, KeyError):    # not compiled yet, or a broken cache
+        track = compile_track(json.loads(source))
+        _save(track, folder)
+        return track
+
+def resolve_track(track: CompiledTrack|LazyTrack) -> CompiledTrack:
+    """
+    The compiled track behind a `LazyTrack`, loading it if it hasn't been yet.
+    Anything that uses a track every tick should keep the result, so it doesn't go through `LazyTrack.__getattr__()` each time.
+
+    Parameters:
+        track (CompiledTrack|LazyTrack): the track
+
+    Returns:
+        CompiledTrack: the compiled track
+    """
+    return track._load() if isinstance(track, LazyTrack) else track   # pylint: disable=protected-access
+
+TRACK = LazyTrack()     # the main race track, loaded the first time it is used
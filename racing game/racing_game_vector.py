@@ -0,0 +1,308 @@
+"""
+Henry Spink, 2/5/24
+Vectorised physics file for game for applied computing 1/2
+
+Struct-of-arrays version of the car physics in `racing_game_sim`,
+one call to `step()` moves every car at once with NumPy instead of looping over `Car` objects
+"""
+# pylint: disable=line-too-long
+#* imports
+import dataclasses
+import numpy as np
+from racing_game_sim import Car, Handling, REFERENCE_DT, SCREEN_WIDTH, SCREEN_HEIGHT
+from racing_game_track import TRACK, CompiledTrack
+
+#* constants
+STRAIGHT: int = 0   # value of `CarArrays.turn` when the car is using its straight sprite
+LEFT: int = 1       # value of `CarArrays.turn` when the car is using its left sprite
+RIGHT: int = 2      # value of `CarArrays.turn` when the car is using its right sprite
+
+#* classes
+@dataclasses.dataclass
+class CarArrays:
+    """
+    state of N cars, every field is an array with one entry per car
+    """
+    x: np.ndarray               # x position
+    y: np.ndarray               # y position
+    heading: np.ndarray         # heading in degrees
+    ax: np.ndarray              # acceleration delta in the x direction
+    ay: np.ndarray              # acceleration delta in the y direction
+    time_accel: np.ndarray      # amount of time the car has been accelerating for (pos direction)
+    time_decel: np.ndarray      # amount of time the car has been decelerating for (neg direction)
+    accel: np.ndarray           # acceleration factor
+    size: np.ndarray            # size of the sprite, used for the screen edge collision
+    collision: np.ndarray       # whether collision is enabled for the car
+    rotating_left: np.ndarray   # ----------
+    rotating_right: np.ndarray  # input flags
+    accelerating: np.ndarray    # to define where the car should move
+    decel: np.ndarray           # ----------
+    turn: np.ndarray            # which sprite the car is using (`STRAIGHT`, `LEFT` or `RIGHT`)
+    speed: np.ndarray           # speed of the car in "kmph"
+    prev_x: np.ndarray          # ----------
+    prev_y: np.ndarray          # state before the last step, used for interpolation
+    prev_heading: np.ndarray    # ----------
+    track_accel: np.ndarray     # ----------
+    fast_accel: np.ndarray      # each car's
+    fast_after: np.ndarray      # `Handling`
+    grass_accel: np.ndarray     # so cars in the same step
+    grass_drag: np.ndarray      # can be tuned differently
+    grass_depth: np.ndarray     # ----------
+
+    def __len__(self) -> int:
+        return len(self.x)
+
+    @classmethod
+    def zeros(cls, n: int, x: float = -45, y: float = 330, heading: float = 90, size: float = 2.0, handling: Handling|None = None) -> "CarArrays":
+        """
+        Creates the state for N stopped cars all at the same position
+
+        Parameters:
+            n (int): number of cars
+            x (float): starting x position. Defaults to the player one start
+            y (float): starting y position. Defaults to the player one start
+            heading (float): starting heading. Defaults to 90
+            size (float): size of the cars. Defaults to 2.0
+            handling (Handling|None): how every car drives. Defaults to the values the game was tuned with
+
+        Returns:
+            CarArrays: the state of the cars
+        """
+        handling = handling if handling is not None else Handling()
+        return cls(
+            x=np.full(n, x, dtype=np.float64),
+            y=np.full(n, y, dtype=np.float64),
+            heading=np.full(n, heading, dtype=np.float64),
+            ax=np.zeros(n),
+            ay=np.zeros(n),
+            time_accel=np.zeros(n),
+            time_decel=np.zeros(n),
+            accel=np.full(n, 2, dtype=np.float64),
+            size=np.full(n, size, dtype=np.float64),
+            collision=np.ones(n, dtype=bool),
+            rotating_left=np.zeros(n, dtype=bool),
+            rotating_right=np.zeros(n, dtype=bool),
+            accelerating=np.zeros(n, dtype=bool),
+            decel=np.zeros(n, dtype=bool),
+            turn=np.zeros(n, dtype=np.int8),
+            speed=np.zeros(n, dtype=np.int64),
+            prev_x=np.full(n, x, dtype=np.float64),
+            prev_y=np.full(n, y, dtype=np.float64),
+            prev_heading=np.full(n, heading, dtype=np.float64),
+            track_accel=np.full(n, handling.accel, dtype=np.float64),
+            fast_accel=np.full(n, handling.fast_accel, dtype=np.float64),
+            fast_after=np.full(n, handling.fast_after, dtype=np.float64),
+            grass_accel=np.full(n, handling.grass_accel, dtype=np.float64),
+            grass_drag=np.full(n, handling.grass_drag, dtype=np.float64),
+            grass_depth=np.full(n, handling.grass_depth, dtype=np.float64)
+        )
+
+    @classmethod
+    def from_cars(cls, cars: list[Car]) -> "CarArrays":
+        """
+        Copies the state of some `Car` objects into arrays
+
+        Parameters:
+            cars (list[Car]): the cars to copy
+
+        Returns:
+            CarArrays: the state of the cars
+        """
+        def field(get, dtype=np.float64) -> np.ndarray:
+            return np.array([get(car) for car in cars], dtype=dtype)
+        def turn(car: Car) -> int:
+            if car.attr.shape.endswith("left"):
+                return LEFT
+            if car.attr.shape.endswith("right"):
+                return RIGHT
+            return STRAIGHT
+        return cls(
+            x=field(lambda car: car.x),
+            y=field(lambda car: car.y),
+            heading=field(lambda car: car.heading),
+            ax=field(lambda car: car.ax),
+            ay=field(lambda car: car.ay),
+            time_accel=field(lambda car: car.movement.time_accel),
+            time_decel=field(lambda car: car.movement.time_decel),
+            accel=field(lambda car: car.movement.accel),
+            size=field(lambda car: car.attr.size),
+            collision=field(lambda car: car.attr.collision, bool),
+            rotating_left=field(lambda car: car.movement.rotating_left, bool),
+            rotating_right=field(lambda car: car.movement.rotating_right, bool),
+            accelerating=field(lambda car: car.movement.accelerating, bool),
+            decel=field(lambda car: car.movement.decel, bool),
+            turn=field(turn, np.int8),
+            speed=field(lambda car: car.speed, np.int64),
+            prev_x=field(lambda car: car.prev[0]),
+            prev_y=field(lambda car: car.prev[1]),
+            prev_heading=field(lambda car: car.prev[2]),
+            track_accel=field(lambda car: car.handling.accel),
+            fast_accel=field(lambda car: car.handling.fast_accel),
+            fast_after=field(lambda car: car.handling.fast_after),
+            grass_accel=field(lambda car: car.handling.grass_accel),
+            grass_drag=field(lambda car: car.handling.grass_drag),
+            grass_depth=field(lambda car: car.handling.grass_depth)
+        )
+
+    def to_cars(self, cars: list[Car]) -> None:
+        """
+        Copies the arrays back into some `Car` objects, e.g. to draw them or score their laps
+
+        Parameters:
+            cars (list[Car]): the cars to update, in the same order as the arrays
+
+        Returns:
+            None
+        """
+        suffix = {STRAIGHT: "", LEFT: "left", RIGHT: "right"}
+        for i, car in enumerate(cars):
+            car.x = float(self.x[i])
+            car.y = float(self.y[i])
+            car.heading = float(self.heading[i])
+            car.ax = float(self.ax[i])
+            car.ay = float(self.ay[i])
+            car.movement.time_accel = float(self.time_accel[i])
+            car.movement.time_decel = float(self.time_decel[i])
+            car.movement.accel = float(self.accel[i])
+            car.speed = int(self.speed[i])
+            car.prev = (float(self.prev_x[i]), float(self.prev_y[i]), float(self.prev_heading[i]))
+            car.attr.shape = f"{car.attr.sprite}{car.name}{suffix[int(self.turn[i])]}"
+
+#* functions
+def off_track(x: np.ndarray, y: np.ndarray, track: CompiledTrack = TRACK) -> np.ndarray:
+    """
+    Vectorised version of `racing_game_sim.off_track()`, one lookup into the track grid for every point
+
+    Parameters:
+        x (np.ndarray): x coordinates of the points
+        y (np.ndarray): y coordinates of the points
+        track (CompiledTrack): the track. Defaults to the main race track
+
+    Returns:
+        np.ndarray: boolean array, True where the point is off the track
+    """
+    return track.grid.off_track_many(x, y)
+
+def _drive(cars: CarArrays, mask: np.ndarray, throttle: np.ndarray, sin_h: np.ndarray, cos_h: np.ndarray, scale: float) -> None:
+    """
+    Vectorised version of `Car._drive()`, only changes the cars where `mask` is True
+
+    Parameters:
+        cars (CarArrays): the cars
+        mask (np.ndarray): which cars to move
+        throttle (np.ndarray): how far each car has been accelerating for
+        sin_h (np.ndarray): sine of each car's heading
+        cos_h (np.ndarray): cosine of each car's heading
+        scale (float): length of the tick as a multiple of `REFERENCE_DT`
+
+    Returns:
+        None
+    """
+    blend = 1 - 0.5 ** scale
+    cars.ax = np.where(mask, cars.ax + (0.75 * sin_h * throttle - cars.ax) * blend, cars.ax)
+    cars.ay = np.where(mask, cars.ay + (-0.75 * cos_h * throttle - cars.ay) * blend, cars.ay)
+    cars.x = np.where(mask, cars.x + cars.ax * 0.02 * scale, cars.x)
+    cars.y = np.where(mask, cars.y + cars.ay * 0.02 * scale, cars.y)
+
+def _move(cars: CarArrays, scale: float) -> None:
+    """
+    Vectorised version of `Car._move()`
+
+    Parameters:
+        cars (CarArrays): the cars
+        scale (float): length of the tick as a multiple of `REFERENCE_DT`
+
+    Returns:
+        None
+    """
+    acc, dec = cars.accelerating, cars.decel
+    # turning
+    cars.heading = cars.heading + 2 * scale * cars.rotating_left - 2 * scale * cars.rotating_right
+    cars.turn = np.where(cars.rotating_right, RIGHT, np.where(cars.rotating_left, LEFT, cars.turn)).astype(np.int8)
+    rad = np.radians(cars.heading)
+    sin_h, cos_h = np.sin(rad), np.cos(rad)
+    # forwards (start accel from reversing / just accel from stopped)
+    from_reverse = acc & (cars.time_decel < 0)
+    from_stop = acc & ~from_reverse
+    cars.time_accel = np.where(from_reverse, 0, cars.time_accel)
+    cars.time_decel = np.where(from_reverse, cars.time_decel + cars.accel * 5 * scale, np.where(from_stop, 0, cars.time_decel))
+    cars.turn = np.where(from_stop, STRAIGHT, cars.turn).astype(np.int8)
+    cars.time_accel = np.where(from_stop & (cars.time_accel < 1500), cars.time_accel + cars.accel * scale, cars.time_accel)
+    # backwards (finish moving forward / start moving back)
+    finish_forward = ~acc & dec & (cars.time_accel > 0)
+    start_back = ~acc & dec & ~finish_forward
+    cars.time_decel = np.where(finish_forward, 0, cars.time_decel)
+    cars.time_accel = np.where(finish_forward, cars.time_accel - cars.accel * 5 * scale, np.where(start_back, 0, cars.time_accel))
+    cars.time_decel = np.where(start_back & (cars.time_decel > -500), cars.time_decel - cars.accel * scale, cars.time_decel)
+    # every branch above moves the car once
+    throttle = np.where(from_reverse | start_back, cars.time_decel, cars.time_accel)
+    _drive(cars, acc | dec, throttle, sin_h, cos_h, scale)
+    # both forwards and backwards pressed, or neither pressed - slow down
+    both = acc & dec
+    neither = ~acc & ~dec
+    slowing = both | neither
+    step = np.where(both, cars.accel * 5, np.trunc(cars.accel * 2.5)) * scale
+    forward = slowing & (cars.time_accel > 0) & (cars.time_decel == 0)
+    backward = slowing & ~forward & (cars.time_decel < 0) & (cars.time_accel == 0)
+    cars.time_accel = np.where(forward, cars.time_accel - step, cars.time_accel)
+    cars.time_accel = np.where(forward & (cars.time_accel < 5), 0, cars.time_accel)     # catch edge case where it goes negative
+    cars.time_decel = np.where(backward, cars.time_decel + step, cars.time_decel)
+    cars.time_decel = np.where(backward & (cars.time_decel > -5), 0, cars.time_decel)   # catch edge case where it goes positive
+    _drive(cars, forward | backward, np.where(forward, cars.time_accel, cars.time_decel), sin_h, cos_h, scale)
+
+def _collision(cars: CarArrays, scale: float, bounds: tuple[float, float], track: CompiledTrack) -> None:
+    """
+    Vectorised version of `Car._collision()`
+
+    Parameters:
+        cars (CarArrays): the cars
+        scale (float): length of the tick as a multiple of `REFERENCE_DT`
+        bounds (tuple[float, float]): (width, height) of the screen
+        track (CompiledTrack): the track
+
+    Returns:
+        None
+    """
+    width, height = bounds
+    margin = 22 * cars.size
+    # with screen edge, checked in the same order as `Body._check_collision()`
+    right = cars.collision & (cars.x > width/2 - margin)
+    left = cars.collision & ~right & (cars.x < -width/2 + margin)
+    top = cars.collision & ~right & ~left & (cars.y > height/2 - margin)
+    bottom = cars.collision & ~right & ~left & ~top & (cars.y < -height/2 + margin)
+    hit = right | left | top | bottom
+    cars.time_accel = np.where(hit, 0, cars.time_accel)
+    cars.time_decel = np.where(hit, 0, cars.time_decel)
+    cars.x = np.where(right, width/2 - margin, np.where(left, -width/2 + margin, cars.x))
+    cars.y = np.where(top, height/2 - margin, np.where(bottom, -height/2 + margin, cars.y))
+    # with track
+    off = off_track(cars.x, cars.y, track)
+    forwards = off & (cars.time_accel > 0) & (cars.time_decel == 0) & (cars.time_accel > 100)
+    backwards = off & (cars.time_decel < 0) & (cars.time_accel == 0) & (cars.time_decel < -100)
+    grass = forwards | backwards
+    drag = cars.grass_drag * np.clip(track.field.distance_many(cars.x, cars.y) / cars.grass_depth, 0, 1) * scale     # same as `racing_game_sim.grass_drag()`
+    cars.time_accel = np.where(forwards, cars.time_accel - drag, cars.time_accel)
+    cars.time_decel = np.where(backwards, cars.time_decel + drag, cars.time_decel)
+    cars.accel = np.where(grass, cars.grass_accel, np.where(off, cars.accel, np.where(cars.time_accel > cars.fast_after, cars.fast_accel, cars.track_accel)))
+
+def step(cars: CarArrays, dt: float = REFERENCE_DT, bounds: tuple[float, float] = (SCREEN_WIDTH, SCREEN_HEIGHT), track: CompiledTrack = TRACK) -> None:
+    """
+    Advance every car by one tick, the same as calling `Car._move()` and `Car._collision()` on each of them.
+    Scoring is left to the caller, and every car drives with its own handling (see `CarArrays`).
+
+    Parameters:
+        cars (CarArrays): the cars
+        dt (float): length of the tick in seconds. Defaults to `REFERENCE_DT`
+        bounds (tuple[float, float]): (width, height) of the screen. Defaults to the default window size
+        track (CompiledTrack): the track. Defaults to the main race track
+
+    Returns:
+        None
+    """
+    scale = dt / REFERENCE_DT
+    cars.prev_x = cars.x.copy()
+    cars.prev_y = cars.y.copy()
+    cars.prev_heading = cars.heading.copy()
+    _move(cars, scale)
+    _collision(cars, scale, bounds, track)
+    cars.speed = np.rint(np.abs(cars.time_accel - cars.time_decel) * 0.2).astype(np.int64)
@@ -0,0 +1,112 @@
+"""
+Henry Spink, 2/5/24
+Database tests file for game for applied computing 1/2
+
+Tests for saving the player database (see racing_game_database.py), run with `python -m pytest` from this folder.
+Each test works in its own empty folder so it never touches the real database.
+"""
+# pylint: disable=line-too-long
+#* imports
+import os
+import sys
+import subprocess
+import types
+import pytest
+
+#* constants
+HERE: str = os.path.dirname(os.path.abspath(__file__))
+ENV: dict[str, str] = {**{key: value for key, value in os.environ.items() if key != "DISPLAY"}, "OMEGA_RACE_GRAPHICS": "null", "PYTHONPATH": HERE}
+os.environ.update(OMEGA_RACE_GRAPHICS="null")
+os.environ.pop("DISPLAY", None)
+from racing_game_classes import Database   # pylint: disable=wrong-import-position
+WRITER: str = """
+import sys
+from racing_game_classes import Database
+db = Database(shared=True)
+db.load()
+for i in range(int(sys.argv[1])):
+    db.set_coins("racer", db.db["racer"]["coins"] + 1)
+    if i % 20 == 19:
+        db.refresh(type("Player", (), {"name": "racer"})())
+db.save()
+db.close()
+"""
+CRASH: str = """
+import os
+import racing_game_database
+from racing_game_classes import Database
+def crash(journal):
+    journal.store.apply(journal.pending, None, journal.name, {name: journal.compaction for name in journal.pending})
+    os._exit(0)     # stops after writing the store, before emptying the journal
+racing_game_database.Journal._compact = crash
+db = Database(shared=True)
+db.load()
+db.set_coins("racer", db.db["racer"]["coins"] + 5)
+db.save()
+"""
+
+#* functions
+@pytest.fixture(autouse=True)
+def folder(tmp_path, monkeypatch):
+    """
+    Runs each test in an empty folder.
+    """
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+def player(coins: int = 0) -> types.SimpleNamespace:
+    """
+    Stands in for a `Player`, with only what the database uses.
+    """
+    return types.SimpleNamespace(name="racer", score=types.SimpleNamespace(coins=coins))
+
+def new_database(coins: int = 0, shared: bool = False) -> Database:
+    """
+    A database with one player in it, saved.
+    """
+    db = Database(shared=shared)
+    db.load()
+    db.create_player(player())
+    db.set_coins("racer", coins)
+    db.save()
+    return db
+
+def test_cabinets_sharing_a_database_add_up_coins():
+    """
+    Several cabinets collecting coins for the same player at the same time, in the same folder, end up with every coin and no more.
+    """
+    new_database(shared=True).close()
+    cabinets, coins = 4, 200
+    writers = [subprocess.Popen([sys.executable, "-c", WRITER, str(coins)], env={**ENV, "OMEGA_RACE_SHARED": "1"}) for _ in range(cabinets)]
+    assert all(writer.wait(timeout=120) == 0 for writer in writers)
+    db = Database(shared=True)
+    assert db.load()["racer"]["coins"] == cabinets * coins
+    db.close()
+    assert not [name for name in os.listdir() if name.endswith(".journal")]
+
+def test_replaying_a_journal_already_written_to_the_store():
+    """
+    A cabinet that crashed after writing its changes to the store but before emptying its journal doesn't get them added again.
+    """
+    new_database(shared=True).close()
+    subprocess.run([sys.executable, "-c", CRASH], env={**ENV, "OMEGA_RACE_SHARED": "1"}, check=True, timeout=60)
+    assert [name for name in os.listdir() if name.endswith(".journal") and os.path.getsize(name)]
+    db = Database(shared=True)
+    assert db.load()["racer"]["coins"] == 5
+    assert db.journal.recovered == 0
+    db.close()
+
+def test_loading_again_keeps_journaled_changes():
+    """
+    Going back to the start screen loads the database again, which mustn't lose a car bought since the last save.
+    """
+    db = new_database(600)
+    db.purchase_car(player(100), "ute")
+    db.load()
+    db.set_coins("racer", db.db["racer"]["coins"] + 1)
+    db.save()
+    db.close()
+    db = Database()
+    assert db.load()["racer"]["coins"] == 101
+    assert db.db["racer"]["cars"] == ["f1car", "ute"]
+    db.close()
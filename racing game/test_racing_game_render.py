@@ -0,0 +1,67 @@
+"""
+Henry Spink, 2/5/24
+Render tests file for game for applied computing 1/2
+
+Tests for drawing the game (see racing_game_render.py), run with `python -m pytest` from this folder.
+They draw on the null graphics backend, which keeps every canvas item without showing a window.
+"""
+# pylint: disable=line-too-long
+#* imports
+import os
+import pytest
+os.environ.update(OMEGA_RACE_GRAPHICS="null")
+os.environ.pop("DISPLAY", None)
+from racing_game_classes import Player, SpriteAttributes, Util     # pylint: disable=wrong-import-position
+from racing_game_constants import SCR                               # pylint: disable=wrong-import-position
+from racing_game_render import POOL                                 # pylint: disable=wrong-import-position
+from racing_game_track import TRACK                                 # pylint: disable=wrong-import-position
+
+#* functions
+@pytest.fixture(autouse=True)
+def folder(tmp_path, monkeypatch):
+    """
+    Runs each test in an empty folder, so the database is made there.
+    """
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+def player(num: int, name: str, colour: str) -> Player:
+    """
+    A player on its spot of the start grid.
+    """
+    x, y, heading = TRACK.start_grid[num - 1]
+    return Player(name=name, num=num, x=x, y=y, heading=heading, attributes=SpriteAttributes(size=2.0, color=colour, shape=f"f1car{name}", sprite="f1car", collision=True))
+
+def test_changing_screens_gives_items_back():
+    """
+    Going through every screen and restarting again and again doesn't add to the canvas, and restarting gives every turtle and polygon back to the pool.
+    """
+    p1, p2 = player(1, "PLAYER ONE", "blue"), player(2, "PLAYER TWO", "orange")
+    util = Util(p1, p2, SCR)
+    util.setup_screen()
+    util.sub.data.load()
+    for p in (p1, p2):
+        p.construct()
+        util.sub.data.check_exist(p)
+    counts = []
+    for _ in range(5):
+        util.sub.draw.menu()
+        util.sub.draw.options()
+        util.sub.draw.reset()
+        util.sub.data.draw()
+        util.sub.draw.game_mode()
+        util.sub.draw.player_names()
+        util.sub.draw.sprite_select()
+        util.sub.update.sprite_menu()
+        util.sub.draw.track()
+        util.spawn_coins()
+        for p in (p1, p2):
+            p.render()
+        util.update_coins()
+        util.sub.draw.stats()
+        util.restart()
+        counts.append(POOL.live_items())
+        assert len(POOL.turtles) == POOL.made_turtles
+        assert len(POOL.polygons) == POOL.made_polygons
+    assert len(set(counts)) == 1
+    util.sub.data.close()
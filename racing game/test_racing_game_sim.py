@@ -0,0 +1,59 @@
+"""
+Henry Spink, 2/5/24
+Simulation tests file for game for applied computing 1/2
+
+Tests for the headless race simulation (see racing_game_sim.py), run with `python -m pytest` from this folder.
+"""
+# pylint: disable=line-too-long
+#* imports
+import os
+import pytest
+os.environ.update(OMEGA_RACE_GRAPHICS="null")
+os.environ.pop("DISPLAY", None)
+from racing_game_sim import Car, Race   # pylint: disable=wrong-import-position
+
+#* functions
+def drive(car: Car, points: list[tuple[float, float]]) -> None:
+    """
+    Moves a car to each point in turn, one tick per point however far apart they are, and scores it.
+    """
+    for x, y in points:
+        car.clock.advance(1 / 60)
+        car.snapshot()
+        car.x, car.y = x, y
+        car._score()     # pylint: disable=protected-access
+
+def test_collisions_counted_once_with_three_cars():
+    """
+    Two cars sitting on top of each other count one collision each for as long as they stay there, a third car far away from them counts none.
+    """
+    cars = [Car(x=-45, y=330, name="one", num=1), Car(x=-45, y=300, name="two", num=2), Car(x=-45, y=-300, name="three", num=3)]
+    race = Race(cars)
+    for _ in range(20):
+        race.step()
+    assert [car.score.collisions for car in cars] == [1, 1, 0]
+    assert [car.score.colliding for car in cars] == [True, True, False]
+
+def test_lap_counted_once_when_a_tick_jumps_a_gate():
+    """
+    A car fast enough to jump clean over a checkpoint and the finish line in one tick still gets exactly one lap.
+    """
+    car = Car(x=-45, y=300)
+    drive(car, [(300, 300), (695, 150), (695, -150), (300, -200), (-300, -200), (-695, -150), (-695, 150), (-300, 300), (300, 300), (400, 300)])
+    assert car.score.laps == 1
+    assert len(car.timer.laps) == 1
+
+def test_reversing_over_the_finish_line_is_not_a_lap():
+    """
+    Driving over the finish line, round to the bottom of the track and back again, then backwards and forwards over the finish line doesn't count a lap.
+    """
+    car = Car(x=-45, y=300)
+    drive(car, [(300, 300), (695, 150), (695, -150), (300, -200), (-300, -200), (300, -200), (695, -150), (695, 150), (300, 300), (-300, 300), (300, 300), (-300, 300)])
+    assert car.score.laps == 0
+
+def test_race_needs_a_car():
+    """
+    A race with no cars is refused straight away, instead of failing later on.
+    """
+    with pytest.raises(ValueError):
+        Race([])
@@ -0,0 +1,56 @@
+"""
+Henry Spink, 2/5/24
+Track tests file for game for applied computing 1/2
+
+Tests for compiling and loading tracks (see racing_game_track.py), run with `python -m pytest` from this folder.
+Each test compiles the track into its own empty folder so it never touches the real cache.
+"""
+# pylint: disable=line-too-long
+#* imports
+import math
+import random
+import pytest
+from racing_game_track import CompiledTrack, DEFAULT_TRACK, FIELD_CELL, GRID_AREA, load_track
+
+#* functions
+@pytest.fixture
+def track(tmp_path) -> CompiledTrack:
+    """
+    The main race track (tracks/oval.json), compiled into an empty cache.
+    """
+    return load_track(DEFAULT_TRACK, str(tmp_path))
+
+def edge_points(track: CompiledTrack, offsets: tuple[float, ...] = (-6, -3, -1.5, 1.5, 3, 6)) -> list[tuple[float, float]]:
+    """
+    Points just inside and just outside both edges of the track, the given distances from the edge along the normal to the centreline.
+    """
+    path = track.shape.path(20)
+    points = []
+    for (x0, y0), (x1, y1) in zip(path, path[1:] + path[:1]):
+        length = math.hypot(x1 - x0, y1 - y0) or 1
+        nx, ny = (y0 - y1) / length, (x1 - x0) / length
+        for side in (-1, 1):
+            for offset in offsets:
+                reach = track.shape.half_width + offset
+                points.append((x0 + side * nx * reach, y0 + side * ny * reach))
+    return points
+
+def test_distance_field_matches_geometry(track):
+    """
+    The distance field agrees with the exact geometry to within half a cell everywhere on the screen,
+    and has the same sign (on or off the track) as it, and as `off_track()`, away from the edge.
+    """
+    rng = random.Random(5)
+    x_min, y_min, width, height = GRID_AREA
+    points = [(rng.uniform(x_min, x_min + width - 1), rng.uniform(y_min, y_min + height - 1)) for _ in range(5000)] + edge_points(track)
+    inside = outside = 0
+    for x, y in points:
+        exact = track.signed_distance(x, y)
+        field = track.field.distance_at(x, y)
+        assert abs(field - exact) <= FIELD_CELL / 2, (x, y)
+        if abs(exact) >= 1.5:
+            assert (field > 0) == (exact > 0), (x, y)
+            assert track.off_track(x, y) == (exact > 0), (x, y)
+            inside += exact < 0
+            outside += exact > 0
+    assert inside > 1000 and outside > 1000     # the sample covers both sides of the edge
@@ -0,0 +1,49 @@
+"""
+Henry Spink, 2/5/24
+Vectorised physics tests file for game for applied computing 1/2
+
+Tests for the NumPy version of the car physics (see racing_game_vector.py), run with `python -m pytest` from this folder.
+"""
+# pylint: disable=line-too-long
+#* imports
+import os
+import pytest
+os.environ.update(OMEGA_RACE_GRAPHICS="null")
+os.environ.pop("DISPLAY", None)
+np = pytest.importorskip("numpy")
+from racing_game_sim import Car, Handling, SpriteAttributes, TICK_RATE     # pylint: disable=wrong-import-position
+from racing_game_vector import CarArrays, step                              # pylint: disable=wrong-import-position
+
+#* functions
+def inputs(num: int, tick: int) -> tuple[bool, bool, bool, bool]:
+    """
+    Scripted (accelerating, braking, turning left, turning right) for a car on a tick, different for every car,
+    so the cars end up on the track, on the grass and against the edges of the screen.
+    """
+    phase = (tick // (40 + 15 * num)) % 4
+    return (phase != 3, phase == 3, phase == 1, phase == 2 and num % 2 == 0)
+
+def test_vector_step_matches_cars():
+    """
+    N cars driven for K ticks with `step()` end up in the same place, with the same heading and speed, as the same cars updated one at a time.
+    """
+    count, ticks, dt = 8, 2000, 1 / TICK_RATE
+    cars = [
+        Car(x=-45 - 30 * i, y=330 - 10 * i, heading=90 - 20 * i, name=f"car{i}", num=i,
+            attributes=SpriteAttributes(size=2.0, color="blue", shape=f"f1carcar{i}", sprite="f1car", collision=True),
+            handling=Handling(accel=2 + i % 3))
+        for i in range(count)
+    ]
+    arrays = CarArrays.from_cars(cars)
+    for tick in range(ticks):
+        for i, car in enumerate(cars):
+            accelerating, decel, left, right = inputs(i, tick)
+            car.movement.accelerating, car.movement.decel, car.movement.rotating_left, car.movement.rotating_right = accelerating, decel, left, right
+            arrays.accelerating[i], arrays.decel[i], arrays.rotating_left[i], arrays.rotating_right[i] = accelerating, decel, left, right
+            car.update(dt)
+        step(arrays, dt)
+    assert arrays.x == pytest.approx([car.x for car in cars], abs=1e-6)
+    assert arrays.y == pytest.approx([car.y for car in cars], abs=1e-6)
+    assert arrays.heading == pytest.approx([car.heading for car in cars], abs=1e-6)
+    assert list(arrays.speed) == [car.speed for car in cars]
+    assert len({(round(car.x), round(car.y)) for car in cars}) == count     # the cars didn't all end up in the same place